@@ -1,29 +1,55 @@
 # Autoclicker.py
 # Hotkey manager rewritten to avoid pywin32 (uses keyboard + pynput)
 
-from pynput.mouse import Button, Controller as MouseController
-from pynput.keyboard import Key, Controller as KeyboardController
-from pynput import mouse as pynput_mouse, keyboard as pynput_keyboard
 import threading
 import time
 import json
-from tkinter import filedialog, messagebox
+import queue
 import os
 import sys
-import ctypes
-from ctypes import wintypes
+import atexit
+import tempfile
+
+try:
+    from .actions import ActionPlan, compile_action_plan, TIMING_INTERVAL, TIMING_DEADLINE
+    from .backends import InputBackend, get_backend
+    from .engine import ClickerEngine, ClickJob
+    from .macro import Macro, MacroRecorder, ReplayJob
+    from .macro_file import MacroFile, FileReplayJob, save_macro
+    from .sequence import ClickSequence, SequenceJob, compile_sequence
+    from .script import Script, ScriptJob, compile_script, load_script
+    from .timing import MISSED_SKIP, MISSED_CATCH_UP
+    from .session_events import start_linux_sources, EVENT_UNLOCK, EVENT_RESUME, EVENT_X_RECONNECT, EVENT_SCREENSAVER_OFF
+except ImportError:
+    from actions import ActionPlan, compile_action_plan, TIMING_INTERVAL, TIMING_DEADLINE
+    from backends import InputBackend, get_backend
+    from engine import ClickerEngine, ClickJob
+    from macro import Macro, MacroRecorder, ReplayJob
+    from macro_file import MacroFile, FileReplayJob, save_macro
+    from sequence import ClickSequence, SequenceJob, compile_sequence
+    from script import Script, ScriptJob, compile_script, load_script
+    from timing import MISSED_SKIP, MISSED_CATCH_UP
+    from session_events import start_linux_sources, EVENT_UNLOCK, EVENT_RESUME, EVENT_X_RECONNECT, EVENT_SCREENSAVER_OFF
 
 _session_monitor_running = False
 _session_monitor_handles = {"hwnd": None, "thread": None, "running": False}
 
-# Try to import keyboard module for global hotkeys (pure-Python fallback)
-try:
-    import keyboard as kb
-    _HAS_KEYBOARD = True
-except Exception:
-    kb = None
-    _HAS_KEYBOARD = False
-    print("Warning: 'keyboard' module not found. Install with `pip install keyboard` for global hotkeys.")
+# keyboard module for global hotkeys (pure-Python fallback), imported on first use by _load_keyboard()
+kb = None
+_HAS_KEYBOARD = None   # None until the import has been attempted
+
+def _load_keyboard():
+    """Import the keyboard module the first time a hotkey needs it. Returns it, or None if unavailable."""
+    global kb, _HAS_KEYBOARD
+    if _HAS_KEYBOARD is None:
+        try:
+            import keyboard
+            kb = keyboard
+            _HAS_KEYBOARD = True
+        except Exception:
+            _HAS_KEYBOARD = False
+            print("Warning: 'keyboard' module not found. Install with `pip install keyboard` for global hotkeys.")
+    return kb
 
 # --- Settings / Persistence helpers ---
 def get_settings_path():
@@ -33,13 +59,126 @@ def get_settings_path():
     os.makedirs(folder, exist_ok=True)
     return os.path.join(folder, "last_settings.json")
 
-def save_last_settings(data):
-    """Automatically save last used settings."""
+# Delay before queued settings are written; a burst of saves inside it becomes one write
+SETTINGS_SAVE_DELAY = 0.5
+# Upper bound on how long a steady stream of saves can postpone the write
+SETTINGS_SAVE_MAX_DELAY = 2.0
+
+
+def _file_mode(path):
+    """
+    Permission bits for a file replacing path: those of the existing file, else its folder's without
+    the execute bits. (Reading the umask would mean briefly changing it for every thread.)
+    """
     try:
-        with open(get_settings_path(), "w") as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        print(f"Failed to save last settings: {e}")
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        return os.stat(os.path.dirname(path) or ".").st_mode & 0o666
+
+def _atomic_write(path, text):
+    """Write text to path via a temp file in the same folder and os.replace, so readers never see a torn file."""
+    folder = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".last_settings-", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the settings file's own permissions
+        os.chmod(tmp, _file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class SettingsPersister:
+    """
+    Write-behind store for last_settings.json. save() only records the latest data and wakes a
+    background thread, which waits until saves have been quiet for `delay` seconds (at most
+    `max_delay` after the first one), then writes atomically. Writes whose content matches what is
+    already on disk are skipped. flush() writes anything pending right away; it runs at exit.
+    """
+
+    def __init__(self, path_func=get_settings_path, delay=SETTINGS_SAVE_DELAY, max_delay=SETTINGS_SAVE_MAX_DELAY):
+        self._path_func = path_func
+        self.delay = delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None        # latest unsaved data
+        self._first_save = 0.0      # monotonic time of the oldest unsaved save()
+        self._last_save = 0.0       # monotonic time of the newest save()
+        self._written = None        # text last written to / read from disk
+        self._thread = None
+        self.writes = 0
+        self.skipped = 0
+
+    def save(self, data):
+        with self._cond:
+            now = time.monotonic()
+            if self._pending is None:
+                self._first_save = now
+            self._pending = data
+            self._last_save = now
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="SettingsWriter", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Write pending settings now, on the calling thread."""
+        self._write_pending()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                while self._pending is not None:
+                    now = time.monotonic()
+                    due = min(self._last_save + self.delay, self._first_save + self.max_delay)
+                    if now >= due:
+                        break
+                    self._cond.wait(due - now)
+            self._write_pending()
+
+    def _write_pending(self):
+        # _pending is taken under the write lock, so a write can never replace a newer one on disk
+        with self._write_lock:
+            with self._cond:
+                data = self._pending
+                self._pending = None
+            if data is None:
+                return
+            try:
+                text = json.dumps(data, indent=4)
+                path = self._path_func()
+                if self._written is None and os.path.exists(path):
+                    with open(path, "r") as f:
+                        self._written = f.read()
+                if text == self._written:
+                    self.skipped += 1
+                    return
+                _atomic_write(path, text)
+                self._written = text
+                self.writes += 1
+            except Exception as e:
+                print(f"Failed to save last settings: {e}")
+
+_settings_persister = SettingsPersister()
+atexit.register(_settings_persister.flush)
+
+def save_last_settings(data):
+    """Queue last used settings to be saved in the background (see SettingsPersister)."""
+    _settings_persister.save(data)
+
+def flush_last_settings():
+    """Write queued settings immediately (e.g. before the window closes)."""
+    _settings_persister.flush()
 
 def load_last_settings():
     """Load last used settings if available."""
@@ -55,6 +194,7 @@ def load_last_settings():
 
 def save_preset(data):
     """Save current settings to a JSON file via file dialog."""
+    from tkinter import filedialog, messagebox
     filepath = filedialog.asksaveasfilename(
         defaultextension=".json",
         filetypes=[("JSON Files", "*.json")],
@@ -71,6 +211,7 @@ def save_preset(data):
 
 def load_preset():
     """Load settings from a JSON file via file dialog."""
+    from tkinter import filedialog, messagebox
     filepath = filedialog.askopenfilename(
         filetypes=[("JSON Files", "*.json")],
         title="Load Preset"
@@ -84,6 +225,14 @@ def load_preset():
         messagebox.showerror("Error", f"Failed to load preset:\n{e}")
         return None
 
+def get_preset_library():
+    """The shared preset library (see preset_library.py), opened on first use."""
+    try:
+        from .preset_library import get_library
+    except ImportError:
+        from preset_library import get_library
+    return get_library()
+
 # --- Interval helper (used by GUI.py) ---
 def get_total_interval_ms_from_vars(interval_vars):
     """
@@ -104,8 +253,49 @@ def validate_int_input(value_if_allowed):
         return False
     return str(value_if_allowed).isdigit()
 
-# --- Clicker logic (unchanged semantic behavior) ---
-is_clicking = False
+# --- Clicker logic (jobs run on a shared ClickerEngine) ---
+_engine = None
+_engine_lock = threading.Lock()
+_click_stats = {"current": None}   # most recent job started through start_clicking
+_engine_process = {"enabled": False, "cpu": None}
+
+def get_engine():
+    """
+    Return the shared engine used by start_clicking (created on first use): a ClickerEngine, or an
+    engine_process.ProcessEngine after use_engine_process(True).
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            if _engine_process["enabled"]:
+                try:
+                    from .engine_process import ProcessEngine
+                except ImportError:
+                    from engine_process import ProcessEngine
+                _engine = ProcessEngine(cpu=_engine_process["cpu"])
+                atexit.register(_engine.shutdown, 1)
+            else:
+                _engine = ClickerEngine()
+        return _engine
+
+def use_engine_process(enabled=True, cpu=None):
+    """
+    Run clicks in a dedicated child process (see engine_process.py), away from the GIL shared with
+    Tk and the hotkey listeners; cpu pins it to one CPU (Linux). Takes effect for the next job; the
+    engine is only switched while no job is running. Returns True if the setting is in effect.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine_process["enabled"] == bool(enabled) and _engine_process["cpu"] == cpu:
+            return True
+        if _engine is not None:
+            if _engine.jobs():
+                return False
+            _engine.shutdown(1)
+            _engine = None
+        _engine_process["enabled"] = bool(enabled)
+        _engine_process["cpu"] = cpu
+        return True
 
 def start_clicking(interval_ms,
                    hotkey=None,
@@ -116,132 +306,177 @@ def start_clicking(interval_ms,
                    x=None,
                    y=None,
                    hold_mode="press",
-                   hold_time=0.05):
+                   hold_time=0.05,
+                   timing=TIMING_INTERVAL,
+                   missed_policy=MISSED_SKIP,
+                   backend=None,
+                   smooth_move=False,
+                   interval_jitter=None,
+                   position_jitter=None,
+                   seed=None,
+                   trigger=None):
     """
-    Start the click/key loop on a background thread.
+    Start a click/key job on the shared engine and return its ClickJob handle.
     - interval_ms: delay between actions in milliseconds (ignored while in hold mode)
     - hotkey: human-readable string like "Key: Ctrl + q" or "Mouse: Left"
-    - on_finish: optional callback invoked when loop naturally finishes (or after release in hold)
+    - on_finish: optional callback invoked when the job naturally finishes, is stopped, or after release in hold
     - repeat_mode: "until_stopped" or "repeat"
+    - timing: "interval" (sleep after each action) or "deadline" (drift-free, period == interval_ms)
+    - missed_policy: "skip" or "catch_up" — how a deadline run handles ticks it fell behind on
+    - backend: input backend name ("pynput", "null", "recording", "xtest") or InputBackend instance; default pynput
+    - smooth_move: glide to the picked position along a humanised path instead of jumping
+    - interval_jitter: randomise each interval: ("uniform", ms) +/- ms, ("normal", ms) standard deviation,
+      ("lognormal", sigma) multiplicative; a {"dist": ..., "amount": ...} dict works too
+    - position_jitter: randomise the picked position per action: ("uniform", px) or ("normal", px)
+    - seed: int seed for reproducible jitter
+    - trigger: a triggers.Trigger (e.g. PixelTrigger) or a preset-style trigger dict; the job then only
+      acts while the trigger matches, polling it in between
+    Several jobs can run at once; each call returns an independent handle with its own stop().
     """
-    global is_clicking
-    is_clicking = True
-    mouse = MouseController()
-
-    def click_loop():
-        i = 0
-        kb_controller = KeyboardController()
-        mouse_controller = MouseController()
-        hold_started = False
-
+    plan = compile_action_plan(interval_ms, hotkey, repeat_mode, repeat_times,
+                               pos_mode, x, y, hold_mode, hold_time,
+                               timing, missed_policy, smooth_move,
+                               interval_jitter, position_jitter, seed)
+    if trigger is not None:
         try:
-            while is_clicking:
-                i += 1
-                hk = hotkey.strip().lower() if hotkey else ""
-
-                # Move mouse if requested
-                if pos_mode == "pick" and x is not None and y is not None:
-                    try:
-                        mouse_controller.position = (int(x), int(y))
-                    except Exception:
-                        pass
+            from .triggers import TriggerClickJob, make_trigger
+        except ImportError:
+            from triggers import TriggerClickJob, make_trigger
+        if isinstance(trigger, dict):
+            trigger = make_trigger(trigger)
+        job = get_engine().submit_job(TriggerClickJob(plan, trigger, on_finish), backend)
+    else:
+        job = get_engine().submit(plan, on_finish, backend)
+    _click_stats["current"] = job
+    return job
+
+def update_clicking(interval_ms,
+                    hotkey=None,
+                    repeat_mode="until_stopped",
+                    repeat_times=1,
+                    pos_mode="current",
+                    x=None,
+                    y=None,
+                    hold_mode="press",
+                    hold_time=0.05,
+                    timing=TIMING_INTERVAL,
+                    missed_policy=MISSED_SKIP,
+                    smooth_move=False,
+                    interval_jitter=None,
+                    position_jitter=None,
+                    seed=None,
+                    job=None):
+    """
+    Retune a running job (default: the most recent start_clicking job) without restarting it.
+    Takes the same parameters as start_clicking(); the job switches to them at its next action.
+    Returns False if there is no running ClickJob to update.
+    """
+    job = job or _click_stats["current"]
+    if not (isinstance(job, ClickJob) or getattr(job, "updatable", False)) or not job.running:
+        return False
+    job.update(compile_action_plan(interval_ms, hotkey, repeat_mode, repeat_times,
+                                   pos_mode, x, y, hold_mode, hold_time,
+                                   timing, missed_policy, smooth_move,
+                                   interval_jitter, position_jitter, seed))
+    return True
 
-                # Mouse actions
-                if "mouse" in hk:
-                    # Check for scroll actions first
-                    if "scroll up" in hk:
-                        try:
-                            mouse_controller.scroll(0, 1)  # Scroll up (positive delta)
-                        except Exception:
-                            pass
-                    elif "scroll down" in hk:
-                        try:
-                            mouse_controller.scroll(0, -1)  # Scroll down (negative delta)
-                        except Exception:
-                            pass
-                    else:
-                        # Handle button clicks
-                        btn = None
-                        if "left" in hk:
-                            btn = Button.left
-                        elif "right" in hk:
-                            btn = Button.right
-                        elif "middle" in hk:
-                            btn = Button.middle
-                        elif "button 4" in hk or "x1" in hk:
-                            btn = Button.x1
-                        elif "button 5" in hk or "x2" in hk:
-                            btn = Button.x2
-
-                        if btn:
-                            if hold_mode == "press":
-                                try:
-                                    mouse_controller.press(btn)
-                                    time.sleep(hold_time)
-                                    mouse_controller.release(btn)
-                                except Exception:
-                                    pass
-                            elif hold_mode == "hold":
-                                def hold_mouse():
-                                    try:
-                                        mouse_controller.press(btn)
-                                        while is_clicking:
-                                            time.sleep(0.01)
-                                    finally:
-                                        try:
-                                            mouse_controller.release(btn)
-                                        except Exception:
-                                            pass
-                                        if on_finish:
-                                            on_finish()
-
-                                threading.Thread(target=hold_mouse, daemon=True).start()
-                                hold_started = True
-                                break
-
-                # Keyboard actions
-                elif hotkey:
-                    try:
-                        key = hotkey.replace("Key:", "").strip()
-                        if "+" in key:
-                            parts = [p.strip() for p in key.replace(" + ", "+").split("+")]
-                            for part in parts:
-                                kb_controller.press(part)
-                            if hold_mode == "press":
-                                time.sleep(hold_time)
-                                for part in reversed(parts):
-                                    kb_controller.release(part)
-                        else:
-                            kb_controller.press(key)
-                            if hold_mode == "press":
-                                time.sleep(hold_time)
-                                kb_controller.release(key)
-
-                        if hold_mode == "hold":
-                            break  # Exit loop after first press in hold mode
-
-                    except Exception as e:
-                        print(f"Key press failed: {str(e)}")
-                        break
+def get_click_stats(job=None):
+    """
+    Return achieved vs requested clicks per second for job (default: the most recent start_clicking job)
+    as a dict with actions, elapsed, requested_cps, achieved_cps and missed; None if nothing has run yet.
+    """
+    job = job or _click_stats.get("current")
+    if not job:
+        return None
+    return job.stats()
 
-                # Repeat termination
-                if repeat_mode == "repeat" and i >= repeat_times:
-                    break
+def start_macro_recording(record_moves=True, stop_key="esc"):
+    """Start recording mouse/keyboard input; returns the MacroRecorder (call .wait() / .stop() for the Macro)."""
+    return MacroRecorder(record_moves=record_moves, stop_key=stop_key).start()
 
-                # Delay between actions (skip when holding)
-                if hold_mode != "hold":
-                    time.sleep(max(0, interval_ms / 1000))
+def replay_macro(macro, speed=1.0, repeat=1, on_finish=None, backend=None):
+    """
+    Replay a recorded Macro on the shared engine and return its job handle.
+    - macro: a Macro, an open MacroFile, or the path of a binary macro file (streamed, not loaded)
+    - speed: 0.5 to 10 (2.0 plays twice as fast)
+    - repeat: number of passes, None = loop until stopped
+    A file opened here from a path is closed when the job finishes. With use_engine_process(True) an
+    open file cannot be sent to the child, so the whole macro is loaded into memory (MacroFile.to_macro)
+    before it is submitted.
+    """
+    opened = isinstance(macro, str)
+    if opened:
+        macro = MacroFile(macro)
+    try:
+        engine = get_engine()
+        if isinstance(macro, MacroFile) and _engine_process["enabled"]:
+            loaded = macro.to_macro()
+            if opened:
+                macro.close()
+            macro, opened = loaded, False
+        if opened:
+            macro_file, caller_on_finish = macro, on_finish
+
+            def on_finish():
+                # Runs on the engine thread after the job's last read from the mapping
+                macro_file.close()
+                if caller_on_finish:
+                    caller_on_finish()
+
+        job_cls = FileReplayJob if isinstance(macro, MacroFile) else ReplayJob
+        job = engine.submit_job(job_cls(macro, speed, repeat, on_finish), backend)
+    except Exception:
+        if opened:
+            macro.close()
+        raise
+    _click_stats["current"] = job
+    return job
 
-        finally:
-            if on_finish and not hold_started:
-                on_finish()
+def start_sequence(points, repeat=None, timing=TIMING_INTERVAL, on_finish=None, backend=None, smooth_move=False):
+    """
+    Run a multi-point click sequence on the shared engine and return its job handle.
+    - points: a ClickSequence, or a list of points for compile_sequence() (dicts with x, y, action, hold_ms, delay_ms)
+    - repeat: number of passes over the sequence, None = until stopped
+    - timing: "interval" or "deadline", as for start_clicking
+    - smooth_move: glide between points along humanised paths instead of jumping
+    """
+    if not isinstance(points, ClickSequence):
+        points = compile_sequence(points)
+    job = get_engine().submit_job(SequenceJob(points, repeat, timing, on_finish, smooth_move=smooth_move), backend)
+    _click_stats["current"] = job
+    return job
 
-    threading.Thread(target=click_loop, daemon=True).start()
+def run_script(script, repeat=1, on_finish=None, backend=None):
+    """
+    Run a click script (see script.py) on the shared engine and return its job handle.
+    - script: a compiled Script, script text, or the path of a script file
+    - repeat: number of passes over the script, None = until stopped
+    Compiled scripts are cached by content, so starting the same script again does not reparse it.
+    """
+    if not isinstance(script, Script):
+        script = load_script(script) if "\n" not in script and os.path.isfile(script) else compile_script(script)
+    job = get_engine().submit_job(ScriptJob(script, repeat, on_finish), backend)
+    _click_stats["current"] = job
+    return job
 
-def stop_clicking():
-    """Signal the click loop (and any holder threads) to stop."""
-    global is_clicking
-    is_clicking = False
+def start_control_server(path=None):
+    """
+    Serve the control protocol (control.py) for the shared engine from a daemon thread, so other local
+    processes can start, stop and retune jobs. Returns the ControlServer (close() stops it).
+    Raises OSError if the socket cannot be opened.
+    """
+    try:
+        from .control import ControlServer
+    except ImportError:
+        from control import ControlServer
+    return ControlServer(get_engine(), path).start()
+
+def stop_clicking(job=None):
+    """Stop the given job, or every job on the shared engine (releasing anything held down)."""
+    if job is not None:
+        job.stop()
+    elif _engine is not None:
+        _engine.stop_all()
 
 # --- Hotkey conversion helpers (display <-> normalized) ---
 def convert_to_keyboard_format(hotkey_string):
@@ -303,38 +538,293 @@ def convert_to_display_format(hotkey_string):
 
 # --- New hotkey manager (keyboard + pynput mouse) ---
 
-# Storage for registered handlers
-_keyboard_handlers = {}   # normalized_kb_format -> {'handler': id, 'callback': cb, 'display': display}
-_mouse_handlers = {}      # display like "Mouse: Left" -> callback
+def canonical_hotkey(display_hotkey):
+    """
+    Canonical registry key for a hotkey display string: keyboard format for keys ("Key: Ctrl + Q" -> "ctrl+q"),
+    "mouse: <button>" lower-cased with single spaces for mouse buttons ("Mouse:  Left" -> "mouse: left").
+    """
+    display_hotkey = display_hotkey.strip()
+    if display_hotkey.lower().startswith("mouse:"):
+        return "mouse: " + " ".join(display_hotkey[6:].split()).lower()
+    return convert_to_keyboard_format(display_hotkey)
+
 _mouse_listener = None
 _mouse_listener_lock = threading.Lock()
 
+# Mouse buttons that can act as hotkeys (pynput Button member name, display string)
+_MOUSE_BUTTON_NAMES = (("left", "Mouse: Left"), ("right", "Mouse: Right"), ("middle", "Mouse: Middle"),
+                       ("x1", "Mouse: Button 4"), ("x2", "Mouse: Button 5"))
+
+HOTKEY_QUEUE_SIZE = 16      # pending hotkey events before new ones are dropped
+HOTKEY_DEBOUNCE = 0.25      # seconds; repeated triggers of the same hotkey inside this window are ignored
+
+class HotkeyDispatcher:
+    """
+    Runs hotkey callbacks on one long-lived worker thread fed by a bounded queue.
+    submit() never blocks the listener thread: when the queue is full the event is dropped.
+    Repeated triggers of the same hotkey within the debounce window are collapsed.
+    """
+
+    def __init__(self, maxsize=HOTKEY_QUEUE_SIZE, debounce=HOTKEY_DEBOUNCE):
+        self.debounce = debounce
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize)
+        self._last = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, key, callback):
+        """Queue callback for hotkey key. Returns False if the event was dropped."""
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+        try:
+            self._queue.put_nowait((key, callback, time.monotonic()))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="HotkeyDispatcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        last = self._last
+        while True:
+            key, callback, t = self._queue.get()
+            # Debounce on the time the event happened, so a backlog collapses too
+            if t - last.get(key, float("-inf")) < self.debounce:
+                continue
+            last[key] = t
+            try:
+                callback()
+            except Exception as e:
+                print(f"Hotkey callback for {key} failed: {e}")
+
+_hotkey_dispatcher = HotkeyDispatcher()
+
+# Event a HotkeyRegistry reports to its watchers after every add/remove
+EVENT_CHANGED = "changed"
+
+def _keyboard_handle_alive(handler):
+    """True if the keyboard module still knows handler. Without access to its table, assume it does."""
+    if handler is None:
+        return False
+    hotkeys = getattr(kb, "_hotkeys", None)
+    if hotkeys is None:
+        return True
+    try:
+        return handler in hotkeys
+    except TypeError:
+        return True
+
+class HotkeyRegistry:
+    """
+    Thread-safe table of registered global hotkeys.
+    Entries are indexed by canonical form ("ctrl+q", "mouse: left"), by display label and by case-folded
+    display label, so lookup and removal are O(1) whichever spelling the caller uses.
+    Keyboard entries keep their keyboard-module handle; refresh() re-registers only the handles that are
+    stale, hooking the replacement before unhooking the old one so a hotkey is never left unbound.
+    Callbacks run on the HotkeyDispatcher worker, which also collapses the double trigger that can happen
+    while an old and a new hook briefly overlap.
+    """
+
+    def __init__(self, dispatcher=None):
+        self.dispatcher = dispatcher or _hotkey_dispatcher
+        self.mouse_callbacks = {}   # canonical mouse key -> callback, read without locking by the mouse listener
+        self._lock = threading.RLock()
+        self._entries = {}          # canonical -> entry
+        self._by_display = {}       # display label -> canonical
+        self._by_folded = {}        # case-folded display label -> canonical
+        self._watchers = []         # called with EVENT_CHANGED after every add/remove (outside the lock)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, display_hotkey):
+        return self.find(display_hotkey) is not None
+
+    def _canonical_of(self, display_hotkey):
+        display_hotkey = display_hotkey.strip()
+        canonical = self._by_display.get(display_hotkey)
+        if canonical is None:
+            canonical = canonical_hotkey(display_hotkey)
+            if canonical not in self._entries:
+                canonical = self._by_folded.get(display_hotkey.casefold())
+        return canonical
+
+    def find(self, display_hotkey):
+        """Return the entry registered under any spelling of display_hotkey, or None."""
+        if not display_hotkey:
+            return None
+        with self._lock:
+            canonical = self._canonical_of(display_hotkey)
+            return self._entries.get(canonical) if canonical is not None else None
+
+    def entries(self):
+        """Snapshot of all entries."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def displays(self):
+        """Display labels of all registered hotkeys."""
+        with self._lock:
+            return [entry['display'] for entry in self._entries.values()]
+
+    def add_watcher(self, watcher):
+        """Call watcher(EVENT_CHANGED) after every add/remove, e.g. HotkeyHealthMonitor.notify."""
+        self._watchers.append(watcher)
+
+    def _changed(self):
+        for watcher in self._watchers:
+            try:
+                watcher(EVENT_CHANGED)
+            except Exception as e:
+                print(f"Hotkey registry watcher failed: {e}")
+
+    def _hook(self, canonical, callback):
+        """Register canonical with the keyboard module; the callback is handed to the dispatcher."""
+        submit = self.dispatcher.submit
+        callback = callback or (lambda: None)
+        return kb.add_hotkey(canonical, lambda: submit(canonical, callback))
+
+    @staticmethod
+    def _unhook(handler):
+        if handler is None:
+            return
+        try:
+            kb.remove_hotkey(handler)
+        except Exception:
+            pass
+
+    def _drop(self, entry):
+        """Remove entry from all indexes (lock held)."""
+        canonical = entry['canonical']
+        del self._entries[canonical]
+        if self._by_display.get(entry['display']) == canonical:
+            del self._by_display[entry['display']]
+        folded = entry['display'].casefold()
+        if self._by_folded.get(folded) == canonical:
+            del self._by_folded[folded]
+        if entry['type'] == 'mouse':
+            self.mouse_callbacks.pop(canonical, None)
+
+    def add(self, display_hotkey, callback=None):
+        """
+        Register (or replace) a hotkey. Returns its entry, a dict with type, canonical, display, callback,
+        handler and stale, or None if it could not be registered.
+        """
+        display_hotkey = display_hotkey.strip()
+        canonical = canonical_hotkey(display_hotkey)
+        kind = 'mouse' if canonical.startswith("mouse:") else 'keyboard'
+        if kind == 'keyboard' and _load_keyboard() is None:
+            print(f"keyboard module not available — cannot register hotkey {display_hotkey}")
+            return None
+
+        with self._lock:
+            handler = None
+            if kind == 'keyboard':
+                try:
+                    handler = self._hook(canonical, callback)
+                except Exception as e:
+                    print(f"Fallback keyboard registration failed for {display_hotkey}: {e}")
+                    return None
+            old = self._entries.get(canonical)
+            if old is not None:
+                self._drop(old)
+                if old['type'] == 'keyboard':
+                    self._unhook(old['handler'])
+            entry = {'type': kind, 'canonical': canonical, 'display': display_hotkey,
+                     'callback': callback, 'handler': handler, 'stale': False}
+            self._entries[canonical] = entry
+            self._by_display[display_hotkey] = canonical
+            self._by_folded[display_hotkey.casefold()] = canonical
+            if kind == 'mouse':
+                self.mouse_callbacks[canonical] = callback
+        self._changed()
+        return entry
+
+    def remove(self, display_hotkey):
+        """Unregister a hotkey by any spelling of its display string. Returns True if one was removed."""
+        if not display_hotkey:
+            return False
+        with self._lock:
+            entry = self.find(display_hotkey)
+            if entry is None:
+                return False
+            self._drop(entry)
+            if entry['type'] == 'keyboard' and kb:
+                self._unhook(entry['handler'])
+        self._changed()
+        return True
+
+    def invalidate(self):
+        """Mark every keyboard handle stale, e.g. after the OS dropped the hooks on lock or suspend."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry['type'] == 'keyboard':
+                    entry['stale'] = True
+
+    def stale_entries(self):
+        """Keyboard entries whose handle is marked stale or no longer known to the keyboard module."""
+        with self._lock:
+            return [entry for entry in self._entries.values()
+                    if entry['type'] == 'keyboard' and (entry['stale'] or not _keyboard_handle_alive(entry['handler']))]
+
+    def refresh(self, invalidate=False):
+        """
+        Re-register stale keyboard hotkeys in one batch under the lock: all replacement hooks are added
+        first, then the old handles are removed. Returns the number of hotkeys re-registered.
+        """
+        if _load_keyboard() is None:
+            return 0
+        with self._lock:
+            if invalidate:
+                self.invalidate()
+            fresh = []
+            for entry in self.stale_entries():
+                try:
+                    fresh.append((entry, self._hook(entry['canonical'], entry['callback'])))
+                except Exception as e:
+                    print(f"Failed to re-register fallback hotkey {entry['display']}: {e}")
+            for entry, handler in fresh:
+                self._unhook(entry['handler'])
+                entry['handler'] = handler
+                entry['stale'] = False
+            return len(fresh)
+
+_hotkeys = HotkeyRegistry()
+
 def _ensure_mouse_listener():
     """Ensure a single global mouse listener is running to dispatch mouse button hotkeys."""
     global _mouse_listener
     with _mouse_listener_lock:
         if _mouse_listener and _mouse_listener.running:
             return
-        # Start a listener that checks presses and calls matching callbacks
+        from pynput import mouse as pynput_mouse
+
+        # Buttons mapped to registry keys once (Button.x1/x2 do not exist on every platform)
+        button_keys = {
+            getattr(pynput_mouse.Button, name): canonical_hotkey(display)
+            for name, display in _MOUSE_BUTTON_NAMES
+            if hasattr(pynput_mouse.Button, name)
+        }
+        # Runs for every mouse event system-wide: two dict lookups, then hand off to the dispatcher
+        handlers = _hotkeys.mouse_callbacks
+        submit = _hotkey_dispatcher.submit
+
         def on_click(x, y, button, pressed):
             if not pressed:
                 return
-            # Map Button to display string
-            btn_map = {
-                Button.left: "Mouse: Left",
-                Button.right: "Mouse: Right",
-                Button.middle: "Mouse: Middle",
-                Button.x1: "Mouse: Button 4",
-                Button.x2: "Mouse: Button 5"
-            }
-            disp = btn_map.get(button)
-            if disp and disp in _mouse_handlers:
-                try:
-                    cb = _mouse_handlers[disp]
-                    if cb:
-                        threading.Thread(target=cb, daemon=True).start()
-                except Exception:
-                    pass
+            key = button_keys.get(button)
+            if key is None:
+                return
+            cb = handlers.get(key)
+            if cb:
+                submit(key, cb)
 
         _mouse_listener = pynput_mouse.Listener(on_click=on_click)
         _mouse_listener.daemon = True
@@ -347,127 +837,28 @@ def start_global_hotkey_listener(display_hotkey="F6", toggle_callback=None):
     """
     if not display_hotkey:
         return None
-
-    display_hotkey = display_hotkey.strip()
-    # Mouse handler
-    if display_hotkey.lower().startswith("mouse:"):
-        # normalize display to canonical casing
-        disp = display_hotkey
-        # register in mouse handlers dict
-        _mouse_handlers[disp] = toggle_callback
+    entry = _hotkeys.add(display_hotkey, toggle_callback)
+    if entry is not None and entry['type'] == 'mouse':
         _ensure_mouse_listener()
-        return {'type': 'mouse', 'display': disp, 'callback': toggle_callback}
-
-    # Keyboard handler
-    if not _HAS_KEYBOARD or not kb:
-        print(f"keyboard module not available — cannot register hotkey {display_hotkey}")
-        return None
-
-    try:
-        kb_format = convert_to_keyboard_format(display_hotkey)
-        # Remove existing if present
-        if kb_format in _keyboard_handlers:
-            try:
-                kb.remove_hotkey(_keyboard_handlers[kb_format]['handler'])
-            except Exception:
-                pass
-            del _keyboard_handlers[kb_format]
-
-        # Use keyboard.add_hotkey — it returns an internal handler that can be removed by remove_hotkey
-        handler = kb.add_hotkey(kb_format, toggle_callback if toggle_callback else (lambda: None))
-        _keyboard_handlers[kb_format] = {'handler': handler, 'callback': toggle_callback, 'display': display_hotkey}
-        return _keyboard_handlers[kb_format]
-    except Exception as e:
-        print(f"Fallback keyboard registration failed for {display_hotkey}: {e}")
-        return None
+    return entry
 
 def remove_global_hotkey(display_hotkey="F6"):
     """
     Remove a previously registered hotkey by display string. Returns True if removed.
     """
-    if not display_hotkey:
-        return False
-    display_hotkey = display_hotkey.strip()
-
-    # Mouse remove
-    if display_hotkey.lower().startswith("mouse:"):
-        if display_hotkey in _mouse_handlers:
-            del _mouse_handlers[display_hotkey]
-            return True
-        # try case-insensitive find
-        for k in list(_mouse_handlers.keys()):
-            if k.lower() == display_hotkey.lower():
-                del _mouse_handlers[k]
-                return True
-        return False
-
-    # Keyboard remove
-    if not _HAS_KEYBOARD or not kb:
-        return False
-
-    kb_fmt = convert_to_keyboard_format(display_hotkey)
-    # try exact match
-    if kb_fmt in _keyboard_handlers:
-        try:
-            kb.remove_hotkey(_keyboard_handlers[kb_fmt]['handler'])
-        except Exception:
-            pass
-        del _keyboard_handlers[kb_fmt]
-        return True
+    return _hotkeys.remove(display_hotkey)
 
-    # try match by display label
-    for k, v in list(_keyboard_handlers.items()):
-        if v.get('display') == display_hotkey:
-            try:
-                kb.remove_hotkey(v['handler'])
-            except Exception:
-                pass
-            del _keyboard_handlers[k]
-            return True
-
-    # try case-insensitive compare
-    for k, v in list(_keyboard_handlers.items()):
-        if v.get('display', '').lower() == display_hotkey.lower():
-            try:
-                kb.remove_hotkey(v['handler'])
-            except Exception:
-                pass
-            del _keyboard_handlers[k]
-            return True
-
-    return False
+def refresh_stale_hotkeys():
+    """Re-register only the keyboard hotkeys whose handle went stale. Returns how many were re-registered."""
+    return _hotkeys.refresh()
 
 def re_register_all_hotkeys():
     """
-    Re-register all currently stored hotkeys (useful after a transient platform event).
-    For keyboard: reconstruct registrations from stored snapshot.
+    Restore keyboard hotkeys after a transient platform event (session unlock, resume), treating every
+    handle as stale. Replacement hooks are added before the old ones are removed.
     For mouse: listener persists.
     """
-    if not _HAS_KEYBOARD or not kb:
-        # keyboard module unavailable — nothing to re-register
-        return
-
-    # Snapshot current (display, callback) pairs
-    snapshot = []
-    for fmt, info in list(_keyboard_handlers.items()):
-        snapshot.append((info.get('display'), info.get('callback')))
-
-    # Remove everything
-    for fmt, info in list(_keyboard_handlers.items()):
-        try:
-            kb.remove_hotkey(info['handler'])
-        except Exception:
-            pass
-    _keyboard_handlers.clear()
-
-    # Re-register
-    for display, callback in snapshot:
-        try:
-            kb_format = convert_to_keyboard_format(display)
-            handler = kb.add_hotkey(kb_format, callback if callback else (lambda: None))
-            _keyboard_handlers[kb_format] = {'handler': handler, 'callback': callback, 'display': display}
-        except Exception as e:
-            print(f"Failed to re-register fallback hotkey {display}: {e}")
+    return _hotkeys.refresh(invalidate=True)
 
 # --- Hotkey capture for GUI (Tkinter based) ---
 def start_hotkey_capture(root, on_selected):
@@ -566,22 +957,93 @@ def start_hotkey_capture(root, on_selected):
     root.bind("<MouseWheel>", on_mouse_scroll)
 
 # --- Position picker (pynput based) ---
-def pick_position_blocking(root, prompt_message=None):
+DEFAULT_REFRESH_HZ = 60   # preview rate when the display refresh rate cannot be queried
+
+def get_display_refresh_ms():
+    """Milliseconds per frame of the primary display (Windows VREFRESH), 1000 / DEFAULT_REFRESH_HZ elsewhere."""
+    hz = 0
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            user32 = ctypes.windll.user32
+            hdc = user32.GetDC(0)
+            hz = ctypes.windll.gdi32.GetDeviceCaps(hdc, 116)   # VREFRESH
+            user32.ReleaseDC(0, hdc)
+        except Exception:
+            hz = 0
+    if hz <= 1:   # 0/1 mean "hardware default"
+        hz = DEFAULT_REFRESH_HZ
+    return max(1, int(1000 / hz))
+
+def get_pixel_colour(x, y):
+    """Colour of the screen pixel at (x, y) as "#rrggbb", or None where it cannot be read (Windows GDI only)."""
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+        user32 = ctypes.windll.user32
+        hdc = user32.GetDC(0)
+        bgr = ctypes.windll.gdi32.GetPixel(hdc, int(x), int(y))
+        user32.ReleaseDC(0, hdc)
+    except Exception:
+        return None
+    if bgr < 0 or bgr == 0xFFFFFFFF:   # CLR_INVALID (off screen)
+        return None
+    return f"#{bgr & 0xFF:02x}{(bgr >> 8) & 0xFF:02x}{(bgr >> 16) & 0xFF:02x}"
+
+def pick_position_blocking(root, prompt_message=None, on_preview=None, sample_colour=False):
     """
     Hide root, wait for a mouse click or Esc, restore root and return (x, y) tuple.
     Returns None if cancelled. Blocking - run this from a worker thread if you don't want to freeze UI.
+    The calling thread sleeps on an Event set by the listeners, so waiting costs no CPU.
+    on_preview(x, y, colour) is called on the Tk thread while the cursor moves, at most once per display
+    frame (moves in between are coalesced into the latest position). colour is "#rrggbb" when
+    sample_colour is set and the platform supports it, else None.
     """
+    from pynput import mouse as pynput_mouse, keyboard as pynput_keyboard
+
     pos = {"x": None, "y": None, "cancel": False}
+    done = threading.Event()
+    preview = {"pos": None, "scheduled": False}
+    preview_lock = threading.Lock()
+    frame_ms = get_display_refresh_ms()
+
+    def show_preview():
+        # Tk thread: one update per frame with the newest position
+        with preview_lock:
+            preview["scheduled"] = False
+            latest = preview["pos"]
+        if latest is None or done.is_set():
+            return
+        x, y = latest
+        colour = get_pixel_colour(x, y) if sample_colour else None
+        try:
+            on_preview(x, y, colour)
+        except Exception as e:
+            print(f"Position preview failed: {e}")
+
+    def on_move(x, y):
+        with preview_lock:
+            preview["pos"] = (int(x), int(y))
+            if preview["scheduled"]:
+                return
+            preview["scheduled"] = True
+        try:
+            root.after(frame_ms, show_preview)
+        except Exception:
+            pass
 
     def on_click(x, y, button, pressed):
         if pressed:
             pos["x"], pos["y"] = x, y
+            done.set()
             return False
 
     def on_key_press(key):
         try:
             if key == pynput_keyboard.Key.esc:
                 pos["cancel"] = True
+                done.set()
                 return False
         except Exception:
             pass
@@ -590,14 +1052,13 @@ def pick_position_blocking(root, prompt_message=None):
     if prompt_message:
         print(prompt_message)
 
-    mouse_listener = pynput_mouse.Listener(on_click=on_click)
+    mouse_listener = pynput_mouse.Listener(on_move=on_move if on_preview else None, on_click=on_click)
     key_listener = pynput_keyboard.Listener(on_press=on_key_press)
     mouse_listener.start()
     key_listener.start()
 
-    # Wait until either listener stops
-    while mouse_listener.is_alive() and key_listener.is_alive():
-        time.sleep(0.01)
+    # Wait until either listener reports a result
+    done.wait()
 
     mouse_listener.stop()
     key_listener.stop()
@@ -612,6 +1073,82 @@ def pick_position_blocking(root, prompt_message=None):
         return (int(pos["x"]), int(pos["y"]))
     return None
 
+# --- Hotkey health monitor (event driven) ---
+HOTKEY_SETTLE_DELAY = 0.25   # seconds to let the desktop settle after unlock/resume before re-hooking
+
+# Platform events after which every keyboard handle is assumed stale
+_INVALIDATING_EVENTS = frozenset((EVENT_UNLOCK, EVENT_RESUME, EVENT_X_RECONNECT, EVENT_SCREENSAVER_OFF))
+
+class HotkeyHealthMonitor:
+    """
+    Keeps the hotkey registry's keyboard registrations alive without polling. The worker thread blocks on
+    a condition variable until notify() is called by a registry mutation or a platform event source, then
+    repairs what is stale: after a registry change only dead handles, after unlock/resume/X reconnect all of
+    them (in one batch, see HotkeyRegistry.refresh). Events that arrive together are handled in one pass.
+    """
+
+    def __init__(self, registry, settle_delay=HOTKEY_SETTLE_DELAY):
+        self.registry = registry
+        self.settle_delay = settle_delay
+        self.sources = []      # platform event sources started for this monitor (each has stop())
+        self.repairs = 0       # hotkeys re-registered so far
+        self._cond = threading.Condition()
+        self._pending = set()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="HotkeyHealthMonitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        for source in self.sources:
+            try:
+                source.stop()
+            except Exception:
+                pass
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def notify(self, event):
+        """Report an event (EVENT_CHANGED or a session_events EVENT_*). Safe from any thread."""
+        with self._cond:
+            self._pending.add(event)
+            self._cond.notify()
+
+    def _run(self):
+        cond = self._cond
+        while True:
+            with cond:
+                while self._running and not self._pending:
+                    cond.wait()
+                if not self._running:
+                    return
+                events, self._pending = self._pending, set()
+            invalidate = not events.isdisjoint(_INVALIDATING_EVENTS)
+            if invalidate and self.settle_delay:
+                time.sleep(self.settle_delay)
+            try:
+                self.repairs += self.registry.refresh(invalidate=invalidate)
+            except Exception as e:
+                print(f"Hotkey repair failed: {e}")
+
+_hotkey_monitor = None
+
+def get_hotkey_monitor():
+    """Return the running HotkeyHealthMonitor for the global hotkey registry (started on first use)."""
+    global _hotkey_monitor
+    with _mouse_listener_lock:
+        if _hotkey_monitor is None:
+            _hotkey_monitor = HotkeyHealthMonitor(_hotkeys).start()
+            _hotkeys.add_watcher(_hotkey_monitor.notify)
+        return _hotkey_monitor
 
 _session_monitor_running = False
 _session_monitor_handles = {"hwnd": None, "thread": None, "running": False}
@@ -619,8 +1156,9 @@ _session_monitor_handles = {"hwnd": None, "thread": None, "running": False}
 def start_session_monitor():
     """
     Start a lightweight session monitor that listens for Windows lock/unlock events
-    (WM_WTSSESSION_CHANGE). On unlock we call re_register_all_hotkeys() to restore
-    keyboard registrations. Silent auto-repair (Option A).
+    (WM_WTSSESSION_CHANGE) on Windows, or for X server reconnects, screensaver and logind lock/resume
+    signals on Linux (see session_events.py), and hands them to the hotkey health monitor, which restores
+    keyboard registrations on unlock/resume. Nothing polls: an idle clicker has no periodic wakeups.
     """
     global _session_monitor_running, _session_monitor_handles
 
@@ -628,24 +1166,19 @@ def start_session_monitor():
         return
     _session_monitor_running = True
 
-    # Only available on Windows
+    monitor = get_hotkey_monitor()
+
+    if sys.platform.startswith("linux"):
+        monitor.sources.extend(start_linux_sources(monitor.notify))
+        return
+
+    # Only available on Windows; other platforms rely on registry changes alone
     if sys.platform != "win32":
-        # Fallback: keep the old simple poll monitor to at least try re-registering periodically
-        def fallback_monitor():
-            last_snapshot = None
-            while True:
-                try:
-                    current_keys = sorted([v.get('display', '') for v in _keyboard_handlers.values()])
-                    if current_keys != last_snapshot:
-                        time.sleep(0.5)
-                        re_register_all_hotkeys()
-                        last_snapshot = current_keys
-                    time.sleep(3)
-                except Exception:
-                    time.sleep(2)
-        threading.Thread(target=fallback_monitor, daemon=True).start()
         return
 
+    import ctypes
+    from ctypes import wintypes
+
     user32 = ctypes.windll.user32
     wtsapi32 = ctypes.windll.wtsapi32
     kernel32 = ctypes.windll.kernel32
@@ -684,14 +1217,9 @@ def start_session_monitor():
                 if msg == WM_WTSSESSION_CHANGE:
                     try:
                         ev = int(wparam)
-                        # On unlock, rebuild hotkeys quietly
+                        # On unlock, let the health monitor rebuild hotkeys quietly
                         if ev == WTS_SESSION_UNLOCK:
-                            # small delay to allow desktop to settle
-                            time.sleep(0.25)
-                            try:
-                                re_register_all_hotkeys()
-                            except Exception:
-                                pass
+                            monitor.notify(EVENT_UNLOCK)
                     except Exception:
                         pass
                     return 0
@@ -740,7 +1268,7 @@ def start_session_monitor():
         try:
             # BOOL WTSRegisterSessionNotification(HWND hWnd, DWORD dwFlags)
             res = wtsapi32.WTSRegisterSessionNotification(hwnd, NOTIFY_FOR_THIS_SESSION)
-            # res==0 -> failure, but we can still run a periodic re-register fallback
+            # res==0 -> failure: no unlock events, registry changes still trigger repairs
         except Exception:
             res = 0
 
@@ -776,25 +1304,10 @@ def start_session_monitor():
     _session_monitor_handles["thread"] = t
     t.start()
 
-    # Also keep a tiny fallback poll to ensure re-register if anything odd happens
-    def poll_fallback():
-        last_snapshot = None
-        while True:
-            try:
-                current_keys = sorted([v.get('display', '') for v in _keyboard_handlers.values()])
-                if current_keys != last_snapshot:
-                    time.sleep(0.5)
-                    re_register_all_hotkeys()
-                    last_snapshot = current_keys
-                time.sleep(3)
-            except Exception:
-                time.sleep(2)
-
-    threading.Thread(target=poll_fallback, daemon=True).start()
 # Provide module-level names expected by GUI.py:
-# start_clicking, stop_clicking, start_global_hotkey_listener, remove_global_hotkey,
+# start_clicking, update_clicking, stop_clicking, start_global_hotkey_listener, remove_global_hotkey,
 # start_hotkey_capture, pick_position_blocking, validate_int_input,
-# get_total_interval_ms_from_vars, save_preset, load_preset, save_last_settings, load_last_settings,
-# convert_to_display_format, start_session_monitor
+# get_total_interval_ms_from_vars, save_preset, load_preset, save_last_settings, load_last_settings, flush_last_settings,
+# get_preset_library, convert_to_display_format, start_session_monitor
 
 # End of file
@@ -8,19 +8,21 @@ try:
         start_clicking, stop_clicking,
         start_global_hotkey_listener, remove_global_hotkey, start_hotkey_capture,
         pick_position_blocking, validate_int_input, get_total_interval_ms_from_vars,
-        save_preset, load_preset,save_last_settings, load_last_settings, convert_to_display_format
+        save_preset, load_preset,save_last_settings, load_last_settings, convert_to_display_format,
+        get_click_stats, flush_last_settings, get_preset_library, update_clicking, use_engine_process
     )
 except (ImportError, ValueError):
     from Autoclicker import (
         start_clicking, stop_clicking,
         start_global_hotkey_listener, remove_global_hotkey, start_hotkey_capture,
         pick_position_blocking, validate_int_input, get_total_interval_ms_from_vars,
-        save_preset, load_preset,save_last_settings, load_last_settings, convert_to_display_format
+        save_preset, load_preset,save_last_settings, load_last_settings, convert_to_display_format,
+        get_click_stats, flush_last_settings, get_preset_library, update_clicking, use_engine_process
     )
 
 root = tk.Tk()
 root.title("Auto Clicker")
-root.geometry("415x400")
+root.geometry("415x465")
 root.resizable(False, False)
 
 # === Settings Button ===
@@ -32,14 +34,14 @@ def toggle_settings():
         frame_settings.pack_forget()
         btn_settings.config(text="Settings")
         settings_visible["state"] = False
-        root.geometry("415x400")
-        root.geometry("415x400") # Adjusted size
+        root.geometry("415x465")
+        root.geometry("415x465") # Adjusted size
     else:
         frame_settings.pack(fill="x", padx=10, pady=5, after=frame_settings_button)
         btn_settings.config(text="Hide Settings")
         settings_visible["state"] = True
-        root.geometry("415x480")
-        root.geometry("415x520") # Adjusted size
+        root.geometry("415x575")
+        root.geometry("415x615") # Adjusted size
 
 frame_settings_button = ttk.Frame(root)
 frame_settings_button.pack(fill="x", padx=10, pady=3)
@@ -151,6 +153,29 @@ def set_f6_hotkey():
 
 ttk.Button(frame_settings, text="Set", width=8, command=set_f6_hotkey).grid(row=1, column=2, padx=5, pady=3)
 
+# Drift-free timing: fire on absolute deadlines so the period stays exactly the interval
+precise_timing_var = tk.BooleanVar(value=False)
+ttk.Checkbutton(
+    frame_settings,
+    text="Drift-free timing",
+    variable=precise_timing_var
+).grid(row=2, column=0, sticky="w", padx=5, pady=3)
+
+# Smooth move: glide to the picked position along a humanised path instead of jumping
+smooth_move_var = tk.BooleanVar(value=False)
+ttk.Checkbutton(
+    frame_settings,
+    text="Smooth move",
+    variable=smooth_move_var
+).grid(row=2, column=1, sticky="w", padx=5, pady=3)
+
+# Click in a separate process, so window and hotkey activity cannot delay clicks
+engine_process_var = tk.BooleanVar(value=False)
+ttk.Checkbutton(
+    frame_settings,
+    text="Separate click process",
+    variable=engine_process_var
+).grid(row=3, column=0, columnspan=2, sticky="w", padx=5, pady=3)
 
 
 def save_settings():
@@ -167,12 +192,15 @@ def save_settings():
         "hotkey": selected_hotkey["key"],
         "youtube_pause_enabled": youtube_pause_var.get(),
         "f6_hotkey": f6_hotkey_var.get(),
-        "pin_enabled": pin_var.get()
+        "pin_enabled": pin_var.get(),
+        "timing": "deadline" if precise_timing_var.get() else "interval",
+        "smooth_move": smooth_move_var.get(),
+        "engine_process": engine_process_var.get()
     }
     save_last_settings(data)
 
 
-clicker_running = {"active": False}
+clicker_running = {"active": False, "run": 0}   # run: id of the latest start, so a late on_finish of an older job is ignored
 
 def toggle_clicker():
     """Called by global hotkey (configurable, default F6)."""
@@ -181,45 +209,74 @@ def toggle_clicker():
     else:
         on_click_start()
 
-# Initialize F6 hotkey (will be updated from settings if available)
-start_global_hotkey_listener(f6_hotkey_var.get(), toggle_clicker)
-
-def on_click_start():
-    clicker_running["active"] = True
-    interval_ms = get_total_interval_ms()
-
-    # disable UI (keeps Stop enabled)
-    set_running_mode(True)
-
-    # optional: keep explicit states for start/stop buttons consistent
-    btn_start.config(state="disabled")
-    btn_stop.config(state="normal")
-
+def click_params():
+    """start_clicking()/update_clicking() arguments from the current widget values."""
     mode = repeat_var.get()
     count = int(spin_times.get()) if mode == "repeat" else 1
 
-    pos_mode = pos_var.get()
-    x = x_var.get()
-    y = y_var.get()
-
     try:
         hold_time_ms = float(hold_time_var.get()) if hold_time_var.get() else 50
     except Exception:
         hold_time_ms = 50
 
-    start_clicking(
-        interval_ms,
+    return dict(
         hotkey=selected_hotkey["key"],
-        on_finish=on_click_stop_done,
         repeat_mode=mode,
         repeat_times=count,
-        pos_mode=pos_mode,
-        x=x,
-        y=y,
+        pos_mode=pos_var.get(),
+        x=x_var.get(),
+        y=y_var.get(),
         hold_mode=hold_mode_var.get(),
-        hold_time=hold_time_ms / 1000
+        hold_time=hold_time_ms / 1000,
+        timing="deadline" if precise_timing_var.get() else "interval",
+        smooth_move=smooth_move_var.get()
     )
 
+def on_click_start():
+    clicker_running["active"] = True
+    interval_ms = get_total_interval_ms()
+
+    # disable UI (keeps Stop enabled)
+    set_running_mode(True)
+
+    # optional: keep explicit states for start/stop buttons consistent
+    btn_start.config(state="disabled")
+    btn_stop.config(state="normal")
+
+    if not use_engine_process(engine_process_var.get()):
+        from tkinter import messagebox
+        messagebox.showwarning("Separate click process",
+                               "Other click jobs are still running, so the click process setting will "
+                               "take effect once they have stopped. This run uses the current engine.")
+    clicker_running["run"] += 1
+    run = clicker_running["run"]
+    # on_finish runs on the engine (or engine process reader) thread; Tk is only touched from the main loop
+    start_clicking(interval_ms, on_finish=lambda: root.after(0, on_click_stop_done, run), **click_params())
+    schedule_stats_refresh()
+
+# Interval, click action, hold time and position stay editable while running; edits are sent to the
+# running job (after a short pause in typing) and take effect at its next click, without a restart.
+LIVE_UPDATE_MS = 150
+
+live_update = {"pending": None}
+
+def schedule_live_update(*args):
+    if not clicker_running["active"]:
+        return
+    if live_update["pending"] is not None:
+        root.after_cancel(live_update["pending"])
+    live_update["pending"] = root.after(LIVE_UPDATE_MS, apply_live_update)
+
+def apply_live_update():
+    live_update["pending"] = None
+    # Nothing to send while the hotkey entry shows the capture prompt
+    if not clicker_running["active"] or is_listening_for_hotkey["active"]:
+        return
+    try:
+        update_clicking(get_total_interval_ms(), **click_params())
+    except Exception as e:
+        print(f"Live update failed: {e}")
+
 def on_click_stop():
     clicker_running["active"] = False
     stop_clicking()
@@ -228,15 +285,21 @@ def on_click_stop():
     set_running_mode(False)   # re-enable UI
 
     save_settings()
+    refresh_stats()
 
     
 
-def on_click_stop_done():
+def on_click_stop_done(run=None):
+    # A job stopped by hand can finish after the next one started; only the current run resets the UI
+    if run is not None and run != clicker_running["run"]:
+        return
+    clicker_running["active"] = False
     set_running_mode(False)
     btn_start.config(state="normal")
     btn_stop.config(state="disabled")
 
     save_settings()
+    refresh_stats()
 
 # ==== Click Interval ====
 frame_interval = ttk.LabelFrame(root, text="Click interval")
@@ -348,11 +411,37 @@ ttk.Label(frame_repeat, text="ms").grid(row=0, column=5, sticky="w", padx=(2, 5)
 ttk.Radiobutton(frame_repeat, text="Hold down", variable=hold_mode_var, value="hold").grid(row=1, column=3, columnspan=3, sticky="w", padx=(20, 5))
 
 # ==== Cursor Position ====
+PICK_PREVIEW_OFFSET = 16   # px between the cursor and the coordinate preview
+
 def pick_position():
     """Run blocking pick on a worker thread and update UI via root.after."""
+    preview = {"win": None, "label": None}
+
+    def show_preview(x, y, colour):
+        # Small floating label next to the cursor; root itself is hidden while picking
+        if preview["win"] is None:
+            win = tk.Toplevel(root)
+            win.overrideredirect(True)
+            win.attributes("-topmost", True)
+            preview["label"] = tk.Label(win, padx=4, pady=1, relief="solid", borderwidth=1, compound="left")
+            preview["label"].pack()
+            preview["win"] = win
+        text = f"{x}, {y}"
+        if colour:
+            text += f"  {colour}"
+            preview["label"].config(text=text, bg=colour,
+                                    fg="black" if sum(int(colour[i:i + 2], 16) for i in (1, 3, 5)) > 382 else "white")
+        else:
+            preview["label"].config(text=text)
+        preview["win"].geometry(f"+{x + PICK_PREVIEW_OFFSET}+{y + PICK_PREVIEW_OFFSET}")
+
     def worker():
-        res = pick_position_blocking(root, prompt_message="Click anywhere to set position, or press Esc to cancel...")
+        res = pick_position_blocking(root, prompt_message="Click anywhere to set position, or press Esc to cancel...",
+                                     on_preview=show_preview, sample_colour=True)
         def apply_result():
+            if preview["win"] is not None:
+                preview["win"].destroy()
+                preview["win"] = None
             if res is None:
                 return
             x_val, y_val = res
@@ -373,7 +462,8 @@ ttk.Radiobutton(frame_cursor, text="Current location", variable=pos_var, value="
 ttk.Radiobutton(frame_cursor, text="Pick location", variable=pos_var, value="pick").grid(row=0, column=1, sticky="w", padx=5)
 
 # Add Pick button next to radio buttons
-ttk.Button(frame_cursor, text="Pick", command=pick_position, width=8).grid(row=0, column=2, sticky="w", padx=5)
+btn_pick = ttk.Button(frame_cursor, text="Pick", command=pick_position, width=8)
+btn_pick.grid(row=0, column=2, sticky="w", padx=5)
 
 ttk.Label(frame_cursor, text="X").grid(row=0, column=3)
 entry_x = tk.Entry(frame_cursor, width=5, textvariable=x_var)
@@ -392,8 +482,9 @@ btn_start.grid(row=0, column=0, padx=5, pady=5)
 btn_stop = ttk.Button(frame_buttons, text=f"Stop ({f6_hotkey_var.get()})", width=18, command=on_click_stop, state="disabled")
 btn_stop.grid(row=0, column=1, padx=5, pady=5)
 
-def on_save_preset():
-    data = {
+def preset_data():
+    """Current settings in the Save Preset JSON shape."""
+    return {
         "interval": {lbl: interval_vars[i].get() for i, lbl in enumerate(interval_labels)},
         "repeat_mode": repeat_var.get(),
         "repeat_count": repeat_count.get(),
@@ -404,13 +495,8 @@ def on_save_preset():
         "y": y_var.get(),
         "hotkey": selected_hotkey["key"]
     }
-    save_preset(data)
-
-def on_load_preset():
-    preset = load_preset()
-    if not preset:
-        return
 
+def apply_preset(preset):
     for i, lbl in enumerate(interval_labels):
         interval_vars[i].set(preset["interval"].get(lbl, "0"))
     repeat_var.set(preset.get("repeat_mode", "until_stopped"))
@@ -424,12 +510,99 @@ def on_load_preset():
     if selected_hotkey["key"]:
         hotkey_var.set(selected_hotkey["key"])
 
+def on_save_preset():
+    save_preset(preset_data())
+
+def on_load_preset():
+    preset = load_preset()
+    if not preset:
+        return
+    apply_preset(preset)
+
 btn_save_preset = ttk.Button(frame_buttons, text="Save Preset", width=18, command=on_save_preset)
 btn_save_preset.grid(row=1, column=0, padx=5, pady=2)
 
 btn_load_preset = ttk.Button(frame_buttons, text="Load Preset", width=18, command=on_load_preset)
 btn_load_preset.grid(row=1, column=1, padx=5, pady=2)
 
+# Preset library: pick a saved preset by name (type to filter, most recently used first)
+LIBRARY_LIST_LIMIT = 50
+
+library_var = tk.StringVar()
+
+def refresh_library_list():
+    try:
+        names = get_preset_library().names(library_var.get().strip(), limit=LIBRARY_LIST_LIMIT)
+    except Exception as e:
+        print(f"Preset library unavailable: {e}")
+        names = []
+    combo_library["values"] = names
+
+def on_library_selected(event=None):
+    name = library_var.get().strip()
+    if not name:
+        return
+    try:
+        apply_preset(get_preset_library().get(name))
+    except KeyError:
+        return
+    except Exception as e:
+        from tkinter import messagebox
+        messagebox.showerror("Error", f"Failed to load preset:\n{e}")
+
+def on_library_save():
+    name = library_var.get().strip()
+    if not name:
+        from tkinter import messagebox
+        messagebox.showinfo("Preset Library", "Type a name for the preset first.")
+        return
+    try:
+        get_preset_library().save(name, preset_data())
+    except Exception as e:
+        from tkinter import messagebox
+        messagebox.showerror("Error", f"Failed to save preset:\n{e}")
+
+combo_library = ttk.Combobox(frame_buttons, textvariable=library_var, width=17, postcommand=refresh_library_list)
+combo_library.grid(row=2, column=0, padx=5, pady=2)
+combo_library.bind("<<ComboboxSelected>>", on_library_selected)
+combo_library.bind("<Return>", on_library_selected)
+
+ttk.Button(frame_buttons, text="Save to Library", width=18, command=on_library_save).grid(row=2, column=1, padx=5, pady=2)
+
+# ==== Stats ====
+# Refreshed from telemetry a few times per second while running; never touched by the click thread.
+STATS_REFRESH_MS = 250
+
+frame_stats = ttk.Frame(root)
+frame_stats.pack(fill="x", padx=10)
+
+stats_var = tk.StringVar(value="Clicks: 0")
+ttk.Label(frame_stats, textvariable=stats_var, anchor="center").pack(fill="x")
+
+stats_refresh = {"pending": None}
+
+def refresh_stats():
+    """Update the stats line from the current (or last) job's telemetry."""
+    stats = get_click_stats()
+    if not stats:
+        return
+    stats_var.set(
+        f"Clicks: {stats['count']}   CPS: {stats['current_cps']:.1f} / {stats['requested_cps']:.1f}   "
+        f"Jitter p50/p99: {stats['jitter_p50_ms']:.2f}/{stats['jitter_p99_ms']:.2f} ms   "
+        f"Missed: {stats['missed'] + stats['late']}"
+    )
+
+def schedule_stats_refresh():
+    """Refresh the stats line every STATS_REFRESH_MS while the clicker is running."""
+    if stats_refresh["pending"] is not None:
+        return
+    def tick():
+        stats_refresh["pending"] = None
+        refresh_stats()
+        if clicker_running["active"]:
+            schedule_stats_refresh()
+    stats_refresh["pending"] = root.after(STATS_REFRESH_MS, tick)
+
 # Helpers to disable/enable all interactive widgets except the Stop button
 def set_running_mode(running: bool):
     """
@@ -438,6 +611,9 @@ def set_running_mode(running: bool):
     """
     def recurse(widget):
         for child in widget.winfo_children():
+            # Stats stay readable and live-tunable settings stay editable while running
+            if child is frame_stats or child in live_widgets:
+                continue
             # Ensure the Stop button remains enabled while running
             if child is btn_stop:
                 try:
@@ -452,11 +628,20 @@ def set_running_mode(running: bool):
                     pass
             recurse(child)
     recurse(root)
+    # The position stays editable while running, but picking grabs the mouse the job is clicking with
+    btn_pick.config(state="disabled" if running else "normal")
+
+# Widgets left enabled by set_running_mode (see schedule_live_update)
+live_widgets = (frame_interval, frame_options, frame_cursor, spin_hold)
+
+for var in interval_vars + [hotkey_var, hold_time_var, pos_var, x_var, y_var]:
+    var.trace_add("write", schedule_live_update)
 
 # Prevent window close while running; allow close when stopped
 def _on_close():
     if clicker_running.get("active"):
         return
+    flush_last_settings()
     root.destroy()
 
 root.protocol("WM_DELETE_WINDOW", _on_close)
@@ -478,8 +663,27 @@ if last_settings:
     youtube_pause_var.set(last_settings.get("youtube_pause_enabled", False))
     f6_hotkey_var.set(last_settings.get("f6_hotkey", "F6"))
     pin_var.set(last_settings.get("pin_enabled", False))
+    precise_timing_var.set(last_settings.get("timing", "interval") == "deadline")
+    smooth_move_var.set(last_settings.get("smooth_move", False))
+    engine_process_var.set(last_settings.get("engine_process", False))
     toggle_pin()
-    update_f6_hotkey()
+    btn_start.config(text=f"Start ({f6_hotkey_var.get()})")
+    btn_stop.config(text=f"Stop ({f6_hotkey_var.get()})")
+
+# Global hotkey listeners start after the first paint, so loading them never delays the window
+def start_listeners():
+    global current_f6_hotkey
+    current_f6_hotkey = f6_hotkey_var.get().strip() or "F6"
+    start_global_hotkey_listener(current_f6_hotkey, toggle_clicker)
+
+first_map = {"done": False}
+
+def on_first_map(event):
+    if first_map["done"] or event.widget is not root:
+        return
+    first_map["done"] = True
+    root.after_idle(start_listeners)
 
+root.bind("<Map>", on_first_map, add="+")
 
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,11 @@
+# __main__.py
+# python -m autoclicker: headless command line entry point (see cli.py)
+
+import sys
+
+try:
+    from .cli import main
+except ImportError:
+    from cli import main
+
+sys.exit(main())
@@ -0,0 +1,172 @@
+# actions.py
+# Action plans: run parameters parsed once into immutable objects the click engine executes
+
+from collections import namedtuple
+
+try:
+    from .timing import MISSED_SKIP
+except ImportError:
+    from timing import MISSED_SKIP
+
+# --- Action plans (compiled once per run) ---
+ACTION_NONE = "none"
+ACTION_MOUSE = "mouse"
+ACTION_SCROLL = "scroll"
+ACTION_KEY = "key"
+
+# Scheduling modes
+TIMING_INTERVAL = "interval"  # sleep interval_ms after each action (period = interval + action time)
+TIMING_DEADLINE = "deadline"  # fire on absolute deadlines, period = interval exactly
+
+ActionPlan = namedtuple("ActionPlan", [
+    "kind",          # one of ACTION_NONE / ACTION_MOUSE / ACTION_SCROLL / ACTION_KEY
+    "press_seq",     # canonical button/key names in press order (resolved by the backend once per job)
+    "release_seq",   # the same names in release order
+    "scroll_delta",  # (dx, dy) for scroll actions
+    "position",      # (x, y) to move to before every action, or None
+    "hold",          # True when the action is held down until stopped
+    "hold_time",     # seconds between press and release in press mode
+    "interval",      # seconds between actions
+    "repeat_times",  # number of actions to perform, None = until stopped
+    "timing",        # TIMING_INTERVAL or TIMING_DEADLINE
+    "missed_policy", # what a deadline run does with missed ticks (timing.MISSED_*)
+    "smooth_move",   # glide to position along a humanised path instead of jumping (see paths.py)
+    "interval_jitter",  # (dist, amount) randomising each interval, or None (see jitter.py)
+    "position_jitter",  # (dist, amount) randomising the position per action, or None
+    "seed",          # int seed for reproducible jitter, None = random
+])
+
+# Jitter distributions (sampled by jitter.py)
+DIST_UNIFORM = "uniform"      # interval +/- amount ms, or offset +/- amount px
+DIST_NORMAL = "normal"        # standard deviation amount (ms or px)
+DIST_LOGNORMAL = "lognormal"  # interval * exp(N(0, amount)): median unchanged, long tail of slow clicks
+INTERVAL_DISTS = (DIST_UNIFORM, DIST_NORMAL, DIST_LOGNORMAL)
+POSITION_DISTS = (DIST_UNIFORM, DIST_NORMAL)
+
+def parse_jitter(spec, allowed=INTERVAL_DISTS):
+    """
+    Normalise a jitter spec to (dist, amount) or None. Accepts None, (dist, amount) or
+    {"dist": dist, "amount": amount} (the form stored in presets).
+    """
+    if not spec:
+        return None
+    if isinstance(spec, dict):
+        dist, amount = spec.get("dist"), spec.get("amount", 0)
+    else:
+        dist, amount = spec
+    if dist not in allowed:
+        raise ValueError(f"Unknown jitter distribution: {dist!r} (available: {', '.join(allowed)})")
+    amount = float(amount)
+    if amount < 0:
+        raise ValueError(f"Jitter amount must not be negative, got {amount}")
+    return (dist, amount) if amount else None
+
+# Names that differ between Tk keysyms / display strings and the canonical (pynput Key member) names
+_KEY_ALIASES = {
+    "control": "ctrl",
+    "win": "cmd",
+    "windows": "cmd",
+    "command": "cmd",
+    "meta": "cmd",
+    "return": "enter",
+    "escape": "esc",
+    "prior": "page_up",
+    "next": "page_down",
+    "pageup": "page_up",
+    "pagedown": "page_down",
+    "print": "print_screen",
+    "del": "delete",
+    "ins": "insert",
+}
+
+def canonical_key(name):
+    """
+    Normalise a key name like "Ctrl", "F6", "Return" or "q" to its canonical form ("ctrl", "f6", "enter", "q").
+    Single characters are kept as-is (case matters for typed characters).
+    """
+    name = name.strip()
+    if len(name) == 1:
+        return name
+    lowered = name.lower()
+    return _KEY_ALIASES.get(lowered, lowered)
+
+def _mouse_button_name(hk):
+    """Map a lowercased "mouse: ..." hotkey to a canonical button name, or None."""
+    if "left" in hk:
+        return "left"
+    if "right" in hk:
+        return "right"
+    if "middle" in hk:
+        return "middle"
+    if "button 4" in hk or "x1" in hk:
+        return "x1"
+    if "button 5" in hk or "x2" in hk:
+        return "x2"
+    return None
+
+def compile_action_plan(interval_ms,
+                        hotkey=None,
+                        repeat_mode="until_stopped",
+                        repeat_times=1,
+                        pos_mode="current",
+                        x=None,
+                        y=None,
+                        hold_mode="press",
+                        hold_time=0.05,
+                        timing=TIMING_INTERVAL,
+                        missed_policy=MISSED_SKIP,
+                        smooth_move=False,
+                        interval_jitter=None,
+                        position_jitter=None,
+                        seed=None):
+    """
+    Parse the run parameters once into an immutable ActionPlan.
+    Takes the same arguments as start_clicking(); the click loop only executes the result.
+    """
+    hk = hotkey.strip().lower() if hotkey else ""
+    kind = ACTION_NONE
+    press_seq = ()
+    scroll_delta = (0, 0)
+
+    if "mouse" in hk:
+        if "scroll up" in hk:
+            kind = ACTION_SCROLL
+            scroll_delta = (0, 1)   # Scroll up (positive delta)
+        elif "scroll down" in hk:
+            kind = ACTION_SCROLL
+            scroll_delta = (0, -1)  # Scroll down (negative delta)
+        else:
+            btn = _mouse_button_name(hk)
+            if btn:
+                kind = ACTION_MOUSE
+                press_seq = (btn,)
+    elif hotkey:
+        key = hotkey.replace("Key:", "").strip()
+        parts = [p.strip() for p in key.replace(" + ", "+").split("+")] if "+" in key else [key]
+        kind = ACTION_KEY
+        press_seq = tuple(canonical_key(p) for p in parts if p)
+
+    position = None
+    if pos_mode == "pick" and x is not None and y is not None:
+        try:
+            position = (int(x), int(y))
+        except (TypeError, ValueError):
+            position = None
+
+    return ActionPlan(
+        kind=kind,
+        press_seq=press_seq,
+        release_seq=tuple(reversed(press_seq)),
+        scroll_delta=scroll_delta,
+        position=position,
+        hold=(hold_mode == "hold"),
+        hold_time=max(0.0, float(hold_time or 0)),
+        interval=max(0.0, interval_ms / 1000),
+        repeat_times=repeat_times if repeat_mode == "repeat" else None,
+        timing=timing if timing == TIMING_DEADLINE else TIMING_INTERVAL,
+        missed_policy=missed_policy,
+        smooth_move=bool(smooth_move),
+        interval_jitter=parse_jitter(interval_jitter, INTERVAL_DISTS),
+        position_jitter=parse_jitter(position_jitter, POSITION_DISTS),
+        seed=None if seed is None else int(seed),
+    )
@@ -0,0 +1,339 @@
+# backends.py
+# Input backends: what the click engine uses to actually move, click, scroll and type
+
+import threading
+import time
+
+# Recorded operation names (RecordingBackend.events)
+OP_MOVE = "move"
+OP_PRESS_BUTTON = "press_button"
+OP_RELEASE_BUTTON = "release_button"
+OP_SCROLL = "scroll"
+OP_PRESS_KEY = "press_key"
+OP_RELEASE_KEY = "release_key"
+
+
+class InputBackend:
+    """
+    Interface between the click engine and the OS input layer.
+    Buttons and keys arrive as canonical names from actions.py ("left", "x1", "ctrl", "f6", "q") and are
+    resolved once per job through resolve_button()/resolve_key(); the press/release methods then only
+    ever see the resolved objects. flush() is called at the end of every engine step.
+    """
+
+    name = "base"
+
+    def resolve_button(self, name):
+        return name
+
+    def resolve_key(self, name):
+        return name
+
+    def position(self):
+        """Current cursor position as (x, y), or None if the backend cannot tell (smooth moves then jump)."""
+        return None
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def press_button(self, button):
+        raise NotImplementedError
+
+    def release_button(self, button):
+        raise NotImplementedError
+
+    def scroll(self, dx, dy):
+        raise NotImplementedError
+
+    def press_key(self, key):
+        raise NotImplementedError
+
+    def release_key(self, key):
+        raise NotImplementedError
+
+    def flush(self):
+        """Push any queued input to the OS. Backends that act immediately leave this as a no-op."""
+
+    def close(self):
+        """Release OS resources held by the backend."""
+
+
+class PynputBackend(InputBackend):
+    """Default backend: pynput mouse/keyboard controllers."""
+
+    name = "pynput"
+
+    def __init__(self):
+        from pynput.mouse import Button, Controller as MouseController
+        from pynput.keyboard import Key, Controller as KeyboardController
+        self._buttons = Button
+        self._keys = Key
+        self._mouse = MouseController()
+        self._keyboard = KeyboardController()
+        self.press_button = self._mouse.press
+        self.release_button = self._mouse.release
+        self.scroll = self._mouse.scroll
+        self.press_key = self._keyboard.press
+        self.release_key = self._keyboard.release
+
+    def resolve_button(self, name):
+        return getattr(self._buttons, name)
+
+    def resolve_key(self, name):
+        if len(name) == 1:
+            return name
+        if name.startswith("<") and name.endswith(">") and name[1:-1].isdigit():
+            # Raw virtual key code (see macro.key_name)
+            from pynput.keyboard import KeyCode
+            return KeyCode.from_vk(int(name[1:-1]))
+        key = self._keys.__members__.get(name)
+        # Unknown names are passed through unchanged; the controller reports the failure on press
+        return key if key is not None else name
+
+    def position(self):
+        return self._mouse.position
+
+    def move(self, x, y):
+        self._mouse.position = (x, y)
+
+
+class NullBackend(InputBackend):
+    """Accepts every call and does nothing. Used to measure the engine's own overhead and for headless runs."""
+
+    name = "null"
+
+    def move(self, x, y):
+        pass
+
+    def press_button(self, button):
+        pass
+
+    def release_button(self, button):
+        pass
+
+    def scroll(self, dx, dy):
+        pass
+
+    def press_key(self, key):
+        pass
+
+    def release_key(self, key):
+        pass
+
+
+class RecordingBackend(InputBackend):
+    """
+    Records every call as (perf_counter_ns timestamp, op, args) without touching real input.
+    Used by the benchmark harness and for checking what a job would do.
+    """
+
+    name = "recording"
+
+    def __init__(self):
+        self.events = []
+        self.cursor = None     # last position passed to move()
+        self._lock = threading.Lock()
+        self._now = time.perf_counter_ns
+
+    def _record(self, op, args):
+        event = (self._now(), op, args)
+        with self._lock:
+            self.events.append(event)
+
+    def position(self):
+        return self.cursor
+
+    def move(self, x, y):
+        self.cursor = (x, y)
+        self._record(OP_MOVE, (x, y))
+
+    def press_button(self, button):
+        self._record(OP_PRESS_BUTTON, button)
+
+    def release_button(self, button):
+        self._record(OP_RELEASE_BUTTON, button)
+
+    def scroll(self, dx, dy):
+        self._record(OP_SCROLL, (dx, dy))
+
+    def press_key(self, key):
+        self._record(OP_PRESS_KEY, key)
+
+    def release_key(self, key):
+        self._record(OP_RELEASE_KEY, key)
+
+    def timestamps(self, op=None):
+        """Timestamps (ns) of all recorded events, or only those of the given op."""
+        with self._lock:
+            return [t for t, o, _ in self.events if op is None or o == op]
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+
+# X keysym names for canonical key names that differ from them (see actions.canonical_key)
+_X_KEYSYM_NAMES = {
+    "ctrl": "Control_L", "ctrl_l": "Control_L", "ctrl_r": "Control_R",
+    "alt": "Alt_L", "alt_l": "Alt_L", "alt_r": "Alt_R", "alt_gr": "ISO_Level3_Shift",
+    "shift": "Shift_L", "shift_l": "Shift_L", "shift_r": "Shift_R",
+    "cmd": "Super_L", "cmd_l": "Super_L", "cmd_r": "Super_R",
+    "enter": "Return", "esc": "Escape", "space": "space", "tab": "Tab",
+    "backspace": "BackSpace", "delete": "Delete", "insert": "Insert",
+    "home": "Home", "end": "End", "page_up": "Prior", "page_down": "Next",
+    "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+    "caps_lock": "Caps_Lock", "num_lock": "Num_Lock", "scroll_lock": "Scroll_Lock",
+    "print_screen": "Print", "pause": "Pause", "menu": "Menu",
+}
+
+# X core pointer buttons; 4-7 are the scroll wheel (up, down, left, right)
+_X_BUTTONS = {"left": 1, "middle": 2, "right": 3, "x1": 8, "x2": 9}
+_X_SCROLL_UP, _X_SCROLL_DOWN, _X_SCROLL_LEFT, _X_SCROLL_RIGHT = 4, 5, 6, 7
+
+
+class XTestBackend(InputBackend):
+    """
+    Linux/X11 backend that talks to the XTest extension directly through one persistent display
+    connection. Calls only queue requests in Xlib's output buffer; flush() (called by the engine at the
+    end of every step) sends them in one write, so "move then click" costs one flush instead of three
+    separate pynput round trips. Use from a single thread (the engine's worker).
+    display: X display name, defaults to $DISPLAY (e.g. ":99" for an Xvfb server).
+    Note: characters are sent by keycode, so uppercase letters need an explicit "shift" in the combo.
+    """
+
+    name = "xtest"
+
+    def __init__(self, display=None):
+        import ctypes
+        import ctypes.util
+
+        libx11_path = ctypes.util.find_library("X11")
+        libxtst_path = ctypes.util.find_library("Xtst")
+        if not libx11_path or not libxtst_path:
+            raise OSError("XTest backend needs libX11 and libXtst")
+        self._x11 = x11 = ctypes.CDLL(libx11_path)
+        self._xtst = xtst = ctypes.CDLL(libxtst_path)
+
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XFlush.argtypes = [ctypes.c_void_p]
+        x11.XStringToKeysym.restype = ctypes.c_ulong
+        x11.XStringToKeysym.argtypes = [ctypes.c_char_p]
+        x11.XKeysymToKeycode.restype = ctypes.c_ubyte
+        x11.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        xtst.XTestQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        xtst.XTestFakeKeyEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XQueryPointer.argtypes = ([ctypes.c_void_p, ctypes.c_ulong] + [ctypes.POINTER(ctypes.c_ulong)] * 2
+                                      + [ctypes.POINTER(ctypes.c_int)] * 4 + [ctypes.POINTER(ctypes.c_uint)])
+
+        self._display = x11.XOpenDisplay(display.encode() if display else None)
+        if not self._display:
+            raise OSError(f"Cannot open X display {display or '$DISPLAY'}")
+        dummy = [ctypes.c_int() for _ in range(4)]
+        if not xtst.XTestQueryExtension(self._display, *[ctypes.byref(d) for d in dummy]):
+            x11.XCloseDisplay(self._display)
+            self._display = None
+            raise OSError("X server does not support the XTEST extension")
+
+        # Bind the hot calls once; every call below only appends to Xlib's request buffer
+        self._motion = xtst.XTestFakeMotionEvent
+        self._button = xtst.XTestFakeButtonEvent
+        self._key = xtst.XTestFakeKeyEvent
+        self._flush = x11.XFlush
+        self._ctypes = ctypes
+        self._root = x11.XDefaultRootWindow(self._display)
+
+    def resolve_button(self, name):
+        return _X_BUTTONS[name]
+
+    def resolve_key(self, name):
+        if len(name) == 1:
+            code = ord(name)
+            # Latin-1 keysyms equal the code point; other Unicode characters use the 0x01000000 range
+            keysym = code if code < 0x100 else 0x01000000 | code
+        elif name.startswith("<") and name.endswith(">") and name[1:-1].isdigit():
+            # Raw key code recorded by pynput, which on X11 is the keysym
+            keysym = int(name[1:-1])
+        else:
+            keysym_name = _X_KEYSYM_NAMES.get(name)
+            if keysym_name is None:
+                keysym_name = name.upper() if name[0] == "f" and name[1:].isdigit() else name
+            keysym = self._x11.XStringToKeysym(keysym_name.encode())
+        keycode = self._x11.XKeysymToKeycode(self._display, keysym) if keysym else 0
+        if not keycode:
+            raise ValueError(f"No X keycode for key {name!r}")
+        return keycode
+
+    def position(self):
+        # Round trip to the server (flushes queued requests first); only used before a smooth move
+        c = self._ctypes
+        root, child = c.c_ulong(), c.c_ulong()
+        x, y, wx, wy = c.c_int(), c.c_int(), c.c_int(), c.c_int()
+        mask = c.c_uint()
+        if not self._x11.XQueryPointer(self._display, self._root, c.byref(root), c.byref(child),
+                                       c.byref(x), c.byref(y), c.byref(wx), c.byref(wy), c.byref(mask)):
+            return None
+        return (x.value, y.value)
+
+    def move(self, x, y):
+        self._motion(self._display, -1, x, y, 0)
+
+    def press_button(self, button):
+        self._button(self._display, button, True, 0)
+
+    def release_button(self, button):
+        self._button(self._display, button, False, 0)
+
+    def scroll(self, dx, dy):
+        display = self._display
+        button = _X_SCROLL_UP if dy > 0 else _X_SCROLL_DOWN
+        for _ in range(abs(dy)):
+            self._button(display, button, True, 0)
+            self._button(display, button, False, 0)
+        button = _X_SCROLL_RIGHT if dx > 0 else _X_SCROLL_LEFT
+        for _ in range(abs(dx)):
+            self._button(display, button, True, 0)
+            self._button(display, button, False, 0)
+
+    def press_key(self, key):
+        self._key(self._display, key, True, 0)
+
+    def release_key(self, key):
+        self._key(self._display, key, False, 0)
+
+    def flush(self):
+        self._flush(self._display)
+
+    def close(self):
+        if self._display:
+            self._flush(self._display)
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+BACKENDS = {
+    PynputBackend.name: PynputBackend,
+    NullBackend.name: NullBackend,
+    RecordingBackend.name: RecordingBackend,
+    XTestBackend.name: XTestBackend,
+}
+
+
+def get_backend(backend=None):
+    """
+    Return an InputBackend. Accepts an existing instance, a registered name ("pynput", "null",
+    "recording", "xtest") or None for the default pynput backend.
+    """
+    if backend is None:
+        backend = PynputBackend.name
+    if isinstance(backend, InputBackend):
+        return backend
+    try:
+        return BACKENDS[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown input backend: {backend!r} (available: {', '.join(BACKENDS)})")
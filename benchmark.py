@@ -0,0 +1,143 @@
+# benchmark.py
+# Benchmark harness for the click engine hot path (no real input is sent).
+#
+#   python benchmark.py                      # 1 ms, 10 ms and 100 ms intervals, both timing modes
+#   python benchmark.py --duration 10 --intervals 5 20 --timing deadline
+#   python benchmark.py --watch 200 --region 0 0 16 16   # pixel trigger poll cost (needs a display, e.g. Xvfb)
+
+import argparse
+import sys
+import time
+
+try:
+    from .actions import compile_action_plan, TIMING_INTERVAL, TIMING_DEADLINE
+    from .backends import RecordingBackend, OP_PRESS_BUTTON
+    from .engine import ClickerEngine
+except ImportError:
+    from actions import compile_action_plan, TIMING_INTERVAL, TIMING_DEADLINE
+    from backends import RecordingBackend, OP_PRESS_BUTTON
+    from engine import ClickerEngine
+
+DEFAULT_INTERVALS_MS = (1, 10, 100)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(interval_ms, timing, duration, hold_ms=0.0):
+    """
+    Run one left-click job against a RecordingBackend for duration seconds.
+    Returns a dict with throughput, period error statistics (ms) and CPU time per click (us).
+    """
+    backend = RecordingBackend()
+    engine = ClickerEngine(backend=backend)
+    plan = compile_action_plan(interval_ms, "Mouse: Left", hold_time=hold_ms / 1000, timing=timing)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    job = engine.submit(plan)
+    time.sleep(duration)
+    job.stop()
+    job.wait(1)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    engine.shutdown(1)
+
+    presses = backend.timestamps(OP_PRESS_BUTTON)
+    periods_ms = [(b - a) / 1e6 for a, b in zip(presses, presses[1:])]
+    errors = sorted(abs(p - interval_ms) for p in periods_ms)
+    clicks = len(presses)
+    return {
+        "interval_ms": interval_ms,
+        "timing": timing,
+        "clicks": clicks,
+        "requested_cps": 1000.0 / interval_ms if interval_ms > 0 else 0.0,
+        "achieved_cps": clicks / wall if wall > 0 else 0.0,
+        "mean_period_ms": sum(periods_ms) / len(periods_ms) if periods_ms else 0.0,
+        "mean_error_ms": sum(errors) / len(errors) if errors else 0.0,
+        "p99_error_ms": _percentile(errors, 99),
+        "cpu_us_per_click": cpu / clicks * 1e6 if clicks else 0.0,
+        "missed": job.stats()["missed"],
+    }
+
+
+def run_watch(poll_hz, region, duration, capture=None):
+    """
+    Poll a PixelTrigger on region at poll_hz for duration seconds (a colour that never matches, so it
+    only watches). Returns checks per second, the unchanged-frame share and CPU use in % of one core.
+    """
+    try:
+        from .triggers import PixelTrigger, TriggerClickJob
+    except ImportError:
+        from triggers import PixelTrigger, TriggerClickJob
+    trigger = PixelTrigger(region, (1, 2, 3), poll_hz=poll_hz, min_pixels=region[2] * region[3] + 1,
+                           capture=capture)
+    engine = ClickerEngine(backend=RecordingBackend())
+    plan = compile_action_plan(100, "Mouse: Left")
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    job = engine.submit_job(TriggerClickJob(plan, trigger))
+    time.sleep(duration)
+    checks, unchanged = trigger.checks, trigger.unchanged
+    job.stop()
+    job.wait(1)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    engine.shutdown(1)
+    return {
+        "poll_hz": poll_hz,
+        "checks_per_s": checks / wall if wall > 0 else 0.0,
+        "unchanged_pct": 100.0 * unchanged / checks if checks else 0.0,
+        "cpu_pct": 100.0 * cpu / wall if wall > 0 else 0.0,
+    }
+
+
+def format_results(results):
+    header = (f"{'interval':>9} {'timing':>9} {'clicks':>7} {'req cps':>8} {'act cps':>8} "
+              f"{'mean err':>9} {'p99 err':>9} {'cpu/click':>10} {'missed':>7}")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['interval_ms']:>7g}ms {r['timing']:>9} {r['clicks']:>7} {r['requested_cps']:>8.1f} "
+            f"{r['achieved_cps']:>8.1f} {r['mean_error_ms']:>7.3f}ms {r['p99_error_ms']:>7.3f}ms "
+            f"{r['cpu_us_per_click']:>8.1f}us {r['missed']:>7}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the click engine against a recording backend.")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per case (default 2)")
+    parser.add_argument("--intervals", type=float, nargs="+", default=DEFAULT_INTERVALS_MS,
+                        help="intervals in ms (default 1 10 100)")
+    parser.add_argument("--timing", choices=(TIMING_INTERVAL, TIMING_DEADLINE, "both"), default="both")
+    parser.add_argument("--hold-ms", type=float, default=0.0, help="press-to-release time in ms (default 0)")
+    parser.add_argument("--watch", type=float, metavar="HZ",
+                        help="benchmark a pixel trigger polling the screen at HZ instead of clicking")
+    parser.add_argument("--region", type=int, nargs=4, default=(0, 0, 16, 16), metavar=("X", "Y", "W", "H"),
+                        help="capture region for --watch (default 0 0 16 16)")
+    parser.add_argument("--capture", help="capture backend for --watch (default: native, then mss)")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        r = run_watch(args.watch, tuple(args.region), args.duration, args.capture)
+        print(f"{r['poll_hz']:g} Hz requested: {r['checks_per_s']:.1f} checks/s, "
+              f"{r['unchanged_pct']:.0f}% unchanged frames, CPU {r['cpu_pct']:.1f}% of one core")
+        return 0
+
+    timings = (TIMING_INTERVAL, TIMING_DEADLINE) if args.timing == "both" else (args.timing,)
+    results = []
+    for interval in args.intervals:
+        for timing in timings:
+            results.append(run_case(interval, timing, args.duration, args.hold_ms))
+    print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+# capture.py
+# Screen capture of one small rectangle into a buffer that is reused for every frame. Used by the
+# pixel/template triggers (see triggers.py), which poll the same region many times per second.
+#
+# Backends, in order of preference:
+#   xshm - X11 MIT-SHM: the server writes straight into shared memory (works under Xvfb too)
+#   gdi  - Windows BitBlt into a DIB section
+#   mss  - the optional mss package, anywhere it runs
+# Every backend returns 32-bit BGRX rows of `stride` bytes, top row first.
+
+import sys
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    np = None
+    _HAS_NUMPY = False
+
+# X11 constants
+_ZPIXMAP = 2
+_ALL_PLANES = 0xFFFFFFFFFFFFFFFF
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+
+
+class RegionCapture:
+    """
+    Base class: grab() captures the region (x, y, width, height) and returns a memoryview of the
+    frame buffer, valid until the next grab(). array() returns the last frame as a (height, width, 4)
+    uint8 NumPy view of the same memory (no copy); it needs NumPy.
+    """
+
+    name = None
+
+    def __init__(self, region):
+        x, y, width, height = (int(v) for v in region)
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Empty capture region: {region!r}")
+        self.region = (x, y, width, height)
+        self.width = width
+        self.height = height
+        self.stride = width * 4
+        self._view = None
+        self._array = None
+
+    def grab(self):
+        raise NotImplementedError
+
+    def array(self):
+        if self._array is None:
+            if not _HAS_NUMPY:
+                raise RuntimeError("RegionCapture.array() needs NumPy")
+            rows = np.frombuffer(self._view, dtype=np.uint8).reshape(self.height, self.stride)
+            self._array = rows[:, :self.width * 4].reshape(self.height, self.width, 4)
+        return self._array
+
+    def pixel(self, px, py):
+        """(r, g, b) of the last frame at region-relative (px, py)."""
+        i = py * self.stride + px * 4
+        b, g, r = self._view[i], self._view[i + 1], self._view[i + 2]
+        return (r, g, b)
+
+    def close(self):
+        self._array = None
+        self._view = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _ximage_struct(ctypes):
+    """ctypes layout of the leading fields of Xlib's XImage (the ones read here)."""
+    class XImage(ctypes.Structure):
+        _fields_ = [
+            ("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+            ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+            ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int), ("bitmap_pad", ctypes.c_int),
+            ("depth", ctypes.c_int), ("bytes_per_line", ctypes.c_int), ("bits_per_pixel", ctypes.c_int),
+        ]
+    return XImage
+
+
+class XShmCapture(RegionCapture):
+    """
+    X11 capture through MIT-SHM: one shared memory XImage sized to the region, refilled in place by
+    XShmGetImage. Falls back to XGetImage (a copy per frame) when the server has no MIT-SHM, e.g. over
+    a remote connection. display: X display name, defaults to $DISPLAY.
+    """
+
+    name = "xshm"
+
+    def __init__(self, region, display=None):
+        super().__init__(region)
+        import ctypes
+        import ctypes.util
+
+        libx11_path = ctypes.util.find_library("X11")
+        libxext_path = ctypes.util.find_library("Xext")
+        if not libx11_path:
+            raise OSError("X11 capture needs libX11")
+        self._ctypes = c = ctypes
+        self._x11 = x11 = ctypes.CDLL(libx11_path)
+        XImage = _ximage_struct(ctypes)
+        ximage_p = ctypes.POINTER(XImage)
+
+        x11.XOpenDisplay.restype = c.c_void_p
+        x11.XOpenDisplay.argtypes = [c.c_char_p]
+        x11.XCloseDisplay.argtypes = [c.c_void_p]
+        x11.XDefaultScreen.argtypes = [c.c_void_p]
+        x11.XDefaultRootWindow.restype = c.c_ulong
+        x11.XDefaultRootWindow.argtypes = [c.c_void_p]
+        x11.XDefaultVisual.restype = c.c_void_p
+        x11.XDefaultVisual.argtypes = [c.c_void_p, c.c_int]
+        x11.XDefaultDepth.argtypes = [c.c_void_p, c.c_int]
+        x11.XGetImage.restype = ximage_p
+        x11.XGetImage.argtypes = [c.c_void_p, c.c_ulong, c.c_int, c.c_int, c.c_uint, c.c_uint, c.c_ulong, c.c_int]
+        x11.XSync.argtypes = [c.c_void_p, c.c_int]
+        x11.XFree.argtypes = [c.c_void_p]
+
+        self._display = x11.XOpenDisplay(display.encode() if display else None)
+        if not self._display:
+            raise OSError(f"Cannot open X display {display or '$DISPLAY'}")
+        self._root = x11.XDefaultRootWindow(self._display)
+        self._image = None
+        self._shm = None
+        self._frame = None
+
+        if libxext_path:
+            try:
+                self._attach_shm(ctypes.CDLL(libxext_path), ximage_p)
+            except OSError:
+                self._image = None
+                self._shm = None
+        if self._image is not None:
+            self.stride = self._image.contents.bytes_per_line
+            size = self.stride * self.height
+            self._frame = (c.c_ubyte * size).from_address(self._image.contents.data)
+            self._view = memoryview(self._frame).cast("B")
+            self._get = self._xext.XShmGetImage
+        else:
+            self._view = memoryview(bytearray(self.stride * self.height))
+
+    def _attach_shm(self, xext, ximage_p):
+        c = self._ctypes
+
+        class ShmSegmentInfo(c.Structure):
+            _fields_ = [("shmseg", c.c_ulong), ("shmid", c.c_int), ("shmaddr", c.c_void_p), ("readOnly", c.c_int)]
+
+        xext.XShmQueryExtension.argtypes = [c.c_void_p]
+        xext.XShmCreateImage.restype = ximage_p
+        xext.XShmCreateImage.argtypes = [c.c_void_p, c.c_void_p, c.c_uint, c.c_int, c.c_void_p,
+                                         c.POINTER(ShmSegmentInfo), c.c_uint, c.c_uint]
+        xext.XShmAttach.argtypes = [c.c_void_p, c.POINTER(ShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [c.c_void_p, c.POINTER(ShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [c.c_void_p, c.c_ulong, ximage_p, c.c_int, c.c_int, c.c_ulong]
+        if not xext.XShmQueryExtension(self._display):
+            raise OSError("X server has no MIT-SHM")
+
+        libc = c.CDLL(None, use_errno=True)
+        libc.shmget.argtypes = [c.c_int, c.c_size_t, c.c_int]
+        libc.shmat.restype = c.c_void_p
+        libc.shmat.argtypes = [c.c_int, c.c_void_p, c.c_int]
+        libc.shmdt.argtypes = [c.c_void_p]
+        libc.shmctl.argtypes = [c.c_int, c.c_int, c.c_void_p]
+
+        x11 = self._x11
+        screen = x11.XDefaultScreen(self._display)
+        info = ShmSegmentInfo()
+        image = xext.XShmCreateImage(self._display, x11.XDefaultVisual(self._display, screen),
+                                     x11.XDefaultDepth(self._display, screen), _ZPIXMAP, None,
+                                     c.byref(info), self.width, self.height)
+        if not image:
+            raise OSError("XShmCreateImage failed")
+        if image.contents.bits_per_pixel != 32:
+            x11.XFree(image)
+            raise OSError("MIT-SHM capture needs a 32-bit visual")
+        size = image.contents.bytes_per_line * self.height
+        info.shmid = libc.shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            x11.XFree(image)
+            raise OSError(c.get_errno(), "shmget failed")
+        addr = libc.shmat(info.shmid, None, 0)
+        if addr in (None, c.c_void_p(-1).value):
+            libc.shmctl(info.shmid, _IPC_RMID, None)
+            x11.XFree(image)
+            raise OSError(c.get_errno(), "shmat failed")
+        info.shmaddr = image.contents.data = addr
+        info.readOnly = 0
+        ok = xext.XShmAttach(self._display, c.byref(info))
+        x11.XSync(self._display, 0)
+        # Marked for removal now; the segment lives until both we and the server detach
+        libc.shmctl(info.shmid, _IPC_RMID, None)
+        if not ok:
+            libc.shmdt(addr)
+            x11.XFree(image)
+            raise OSError("XShmAttach failed")
+        self._xext = xext
+        self._libc = libc
+        self._image = image
+        self._shm = info
+
+    def grab(self):
+        x, y, width, height = self.region
+        if self._image is not None:
+            if not self._get(self._display, self._root, self._image, x, y, _ALL_PLANES):
+                raise OSError("XShmGetImage failed (region off screen?)")
+            return self._view
+        image = self._x11.XGetImage(self._display, self._root, x, y, width, height, _ALL_PLANES, _ZPIXMAP)
+        if not image:
+            raise OSError("XGetImage failed (region off screen?)")
+        try:
+            contents = image.contents
+            if contents.bits_per_pixel != 32:
+                raise OSError("X11 capture needs a 32-bit visual")
+            src = self._ctypes.string_at(contents.data, contents.bytes_per_line * height)
+            row = width * 4
+            if contents.bytes_per_line == row:
+                self._view[:] = src
+            else:
+                for i in range(height):
+                    start = i * contents.bytes_per_line
+                    self._view[i * row:(i + 1) * row] = src[start:start + row]
+        finally:
+            self._x11.XFree(image.contents.data)
+            self._x11.XFree(image)
+        return self._view
+
+    def close(self):
+        super().close()
+        if self._display is None:
+            return
+        if self._image is not None:
+            self._frame = None
+            self._xext.XShmDetach(self._display, self._ctypes.byref(self._shm))
+            self._x11.XSync(self._display, 0)
+            self._libc.shmdt(self._shm.shmaddr)
+            # The data pointer is the shm segment, so only the XImage struct itself is freed
+            self._image.contents.data = None
+            self._x11.XFree(self._image)
+            self._image = None
+        self._x11.XCloseDisplay(self._display)
+        self._display = None
+
+
+class GdiCapture(RegionCapture):
+    """Windows capture: BitBlt from the screen DC into a top-down 32-bit DIB section reused per frame."""
+
+    name = "gdi"
+
+    def __init__(self, region):
+        super().__init__(region)
+        import ctypes
+        from ctypes import wintypes
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [
+                ("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG), ("biHeight", wintypes.LONG),
+                ("biPlanes", wintypes.WORD), ("biBitCount", wintypes.WORD), ("biCompression", wintypes.DWORD),
+                ("biSizeImage", wintypes.DWORD), ("biXPelsPerMeter", wintypes.LONG),
+                ("biYPelsPerMeter", wintypes.LONG), ("biClrUsed", wintypes.DWORD), ("biClrImportant", wintypes.DWORD),
+            ]
+
+        self._user32 = user32 = ctypes.windll.user32
+        self._gdi32 = gdi32 = ctypes.windll.gdi32
+        user32.GetDC.restype = wintypes.HDC
+        gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+        gdi32.SelectObject.restype = wintypes.HGDIOBJ
+
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = self.width
+        header.biHeight = -self.height      # negative: top-down rows
+        header.biPlanes = 1
+        header.biBitCount = 32
+        bits = ctypes.c_void_p()
+        self._screen_dc = user32.GetDC(None)
+        self._dc = gdi32.CreateCompatibleDC(self._screen_dc)
+        self._bitmap = gdi32.CreateDIBSection(self._dc, ctypes.byref(header), 0, ctypes.byref(bits), None, 0)
+        if not self._bitmap or not bits.value:
+            self.close()
+            raise OSError("CreateDIBSection failed")
+        self._old = gdi32.SelectObject(self._dc, self._bitmap)
+        self._frame = (ctypes.c_ubyte * (self.stride * self.height)).from_address(bits.value)
+        self._view = memoryview(self._frame).cast("B")
+        self._blit = gdi32.BitBlt
+        self._gdi_flush = gdi32.GdiFlush
+
+    _SRCCOPY_CAPTUREBLT = 0x00CC0020 | 0x40000000
+
+    def grab(self):
+        x, y, width, height = self.region
+        if not self._blit(self._dc, 0, 0, width, height, self._screen_dc, x, y, self._SRCCOPY_CAPTUREBLT):
+            raise OSError("BitBlt failed")
+        self._gdi_flush()
+        return self._view
+
+    def close(self):
+        super().close()
+        self._frame = None
+        gdi32 = self._gdi32
+        if getattr(self, "_old", None):
+            gdi32.SelectObject(self._dc, self._old)
+            self._old = None
+        if getattr(self, "_bitmap", None):
+            gdi32.DeleteObject(self._bitmap)
+            self._bitmap = None
+        if getattr(self, "_dc", None):
+            gdi32.DeleteDC(self._dc)
+            self._dc = None
+        if getattr(self, "_screen_dc", None):
+            self._user32.ReleaseDC(None, self._screen_dc)
+            self._screen_dc = None
+
+
+class MssCapture(RegionCapture):
+    """Capture through the optional mss package; one copy per frame into the reused buffer."""
+
+    name = "mss"
+
+    def __init__(self, region):
+        super().__init__(region)
+        import mss
+        try:
+            self._mss = mss.mss()
+        except Exception as e:     # mss raises its own ScreenShotError/XError types
+            raise OSError(f"mss: {e}")
+        x, y, width, height = self.region
+        self._monitor = {"left": x, "top": y, "width": width, "height": height}
+        self._view = memoryview(bytearray(self.stride * self.height))
+
+    def grab(self):
+        try:
+            self._view[:] = self._mss.grab(self._monitor).raw
+        except Exception as e:
+            raise OSError(f"mss: {e}")
+        return self._view
+
+    def close(self):
+        super().close()
+        if getattr(self, "_mss", None) is not None:
+            self._mss.close()
+            self._mss = None
+
+
+CAPTURES = {
+    XShmCapture.name: XShmCapture,
+    GdiCapture.name: GdiCapture,
+    MssCapture.name: MssCapture,
+}
+
+
+def open_capture(region, backend=None):
+    """
+    Open a RegionCapture for region (x, y, width, height). backend: a name from CAPTURES, or None to
+    use the platform's native capture and fall back to mss.
+    """
+    if backend is not None:
+        if isinstance(backend, RegionCapture):
+            return backend
+        try:
+            return CAPTURES[backend](region)
+        except KeyError:
+            raise ValueError(f"Unknown capture backend: {backend!r}")
+    native = GdiCapture if sys.platform == "win32" else XShmCapture
+    try:
+        return native(region)
+    except (OSError, AttributeError) as e:
+        try:
+            return MssCapture(region)
+        except ImportError:
+            raise OSError(f"No screen capture available ({native.name}: {e}; mss not installed)")
+        except OSError as mss_error:
+            raise OSError(f"No screen capture available ({native.name}: {e}; {mss_error})")
@@ -0,0 +1,322 @@
+# cli.py
+# Headless command line front end. Imports no GUI toolkit, so it starts fast and runs from scripts,
+# cron jobs and systemd units.
+#
+#   python -m autoclicker run preset.json
+#   python -m autoclicker run preset.json --backend xtest --duration 60 --stats-every 5 --json
+#   python -m autoclicker run "farm loop" --library
+#   python -m autoclicker presets import *.json --tags farming
+#   python -m autoclicker script farm.txt --repeat 10         # run a click script (see script.py)
+#   python -m autoclicker serve --backend xtest                 # control server on a Unix socket (see control.py)
+#   python -m autoclicker ctl '{"cmd": "stop"}'
+#   python -m autoclicker grab 800 400 48 48 icon.png     # save a template for a "template" trigger
+
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import sys
+import threading
+
+try:
+    from .backends import BACKENDS, get_backend
+    from .engine import ClickerEngine
+    from .presets import load_preset_file, preset_job
+    from .preset_library import get_library
+    from .script import ScriptJob, load_script
+except ImportError:
+    from backends import BACKENDS, get_backend
+    from engine import ClickerEngine
+    from presets import load_preset_file, preset_job
+    from preset_library import get_library
+    from script import ScriptJob, load_script
+
+
+def _print_stats(stats, as_json, final=False):
+    if as_json:
+        print(json.dumps(dict(stats, final=final)), flush=True)
+        return
+    print(f"{'Finished' if final else 'Running'}: {stats['actions']} actions in {stats['elapsed']:.2f} s, "
+          f"{stats['achieved_cps']:.1f}/{stats['requested_cps']:.1f} CPS, "
+          f"jitter p99 {stats['jitter_p99_ms']:.2f} ms, late {stats['late']}, missed {stats['missed']}",
+          flush=True)
+
+
+def run(args):
+    """Run one preset (see _run_job)."""
+    try:
+        if args.library:
+            job = get_library().job(args.preset)
+        else:
+            job = preset_job(load_preset_file(args.preset))
+    except KeyError:
+        print(f"No preset named {args.preset!r} in the library", file=sys.stderr)
+        return 2
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Cannot load preset {args.preset}: {e}", file=sys.stderr)
+        return 2
+    return _run_job(job, args)
+
+
+def script(args):
+    """Check a click script, or run it like a preset."""
+    try:
+        compiled = load_script(args.script)
+    except (OSError, ValueError) as e:
+        print(f"Cannot load script {args.script}: {e}", file=sys.stderr)
+        return 2
+    if args.check:
+        print(f"{args.script}: OK, {len(compiled)} instructions")
+        return 0
+    return _run_job(ScriptJob(compiled, args.repeat or None), args)
+
+
+def _make_engine(args):
+    """
+    (engine, backend) for args: a ClickerEngine with the opened backend, or with --process an
+    engine_process.ProcessEngine (its child process opens the backend; backend is then None).
+    Returns None after printing why the backend cannot be opened.
+    """
+    if args.process:
+        try:
+            from .engine_process import ProcessEngine
+        except ImportError:
+            from engine_process import ProcessEngine
+        return ProcessEngine(backend=args.backend), None
+    try:
+        backend = get_backend(args.backend)
+    except Exception as e:
+        print(f"Cannot open {args.backend} backend: {e}", file=sys.stderr)
+        return None
+    return ClickerEngine(backend=backend), backend
+
+
+def _run_job(job, args):
+    """Run job on its own engine until it finishes, --duration passes, or SIGINT/SIGTERM arrives."""
+    made = _make_engine(args)
+    if made is None:
+        return 2
+    engine, backend = made
+    job = engine.submit_job(job)
+    stop = threading.Event()
+
+    def on_signal(signum, frame):
+        stop.set()
+        job.stop()
+
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, on_signal)
+
+    if args.duration:
+        timer = threading.Timer(args.duration, job.stop)
+        timer.daemon = True
+        timer.start()
+
+    while not job.wait(args.stats_every or None):
+        _print_stats(job.stats(), args.json)
+
+    _print_stats(job.stats(), args.json, final=True)
+    engine.shutdown(1)
+    if backend is not None:
+        backend.close()
+    return 130 if stop.is_set() else 0
+
+
+def presets(args):
+    """Manage the preset library: list, import, export, delete."""
+    try:
+        library = get_library()
+        if args.action == "list":
+            for row in library.search(args.search or "", args.tag):
+                if args.json:
+                    print(json.dumps(row))
+                else:
+                    tags = f"  [{', '.join(row['tags'])}]" if row["tags"] else ""
+                    print(f"{row['name']}{tags}")
+        elif args.action == "import":
+            failed = False
+            for path in args.files:
+                if os.path.isdir(path):
+                    names, errors = library.import_folder(path, args.tags)
+                else:
+                    try:
+                        names, errors = [library.import_file(path, tags=args.tags)], {}
+                    except (OSError, ValueError) as e:
+                        names, errors = [], {path: str(e)}
+                for name in names:
+                    print(f"Imported {name}")
+                for path, error in errors.items():
+                    print(f"Cannot import {path}: {error}", file=sys.stderr)
+                    failed = True
+            return 1 if failed else 0
+        elif args.action == "export":
+            library.export_file(args.name, args.file)
+        elif args.action == "delete":
+            if not library.delete(args.name):
+                raise KeyError(args.name)
+    except KeyError as e:
+        print(f"No preset named {e.args[0]!r} in the library", file=sys.stderr)
+        return 2
+    except (OSError, sqlite3.Error) as e:
+        print(f"Preset library error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+def grab(args):
+    """Capture a screen region to a PNG file, e.g. a template for a template trigger."""
+    try:
+        from .capture import open_capture
+        from .templates import write_png
+    except ImportError:
+        from capture import open_capture
+        from templates import write_png
+    try:
+        with open_capture((args.x, args.y, args.width, args.height), args.capture) as capture:
+            capture.grab()
+            bgra = capture.array()
+            write_png(args.file, bgra[:, :, [2, 1, 0]])
+    except (OSError, ValueError) as e:
+        print(f"Cannot capture region: {e}", file=sys.stderr)
+        return 2
+    print(f"Saved {args.width}x{args.height} region at ({args.x}, {args.y}) to {args.file}")
+    return 0
+
+
+def serve(args):
+    """Run the control server (control.py) until SIGINT/SIGTERM; jobs run on one engine."""
+    try:
+        from .control import ControlServer
+    except ImportError:
+        from control import ControlServer
+    made = _make_engine(args)
+    if made is None:
+        return 2
+    engine, backend = made
+    try:
+        server = ControlServer(engine, args.socket).start()
+    except OSError as e:
+        print(f"Cannot start control server: {e}", file=sys.stderr)
+        engine.shutdown(1)
+        return 2
+    print(f"Listening on {server.path}", flush=True)
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    while not stop.wait(1):
+        pass
+    server.close()
+    engine.shutdown(1)
+    if backend is not None:
+        backend.close()
+    return 0
+
+
+def ctl(args):
+    """Send commands to a running control server and print the replies (and any streamed events)."""
+    try:
+        from .control import ControlClient
+    except ImportError:
+        from control import ControlClient
+    try:
+        commands = [json.loads(command) for command in args.commands]
+    except ValueError as e:
+        print(f"Invalid JSON command: {e}", file=sys.stderr)
+        return 2
+    failed = False
+    try:
+        with ControlClient(args.socket) as client:
+            for command in commands:
+                reply = client.request(command)
+                print(json.dumps(reply), flush=True)
+                replies = reply if isinstance(reply, list) else [reply]
+                failed |= not all(r.get("ok") for r in replies)
+            if args.follow:
+                for event in client.events():
+                    print(json.dumps(event), flush=True)
+                    if event.get("final"):
+                        break
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Cannot reach control server: {e}", file=sys.stderr)
+        return 2
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="autoclicker", description="Run the autoclicker without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a preset file until it finishes or is interrupted")
+    run_parser.add_argument("preset", help="preset JSON file (as saved by the GUI), or a library name with --library")
+    run_parser.add_argument("--library", action="store_true", help="load the preset by name from the preset library")
+
+    script_parser = commands.add_parser("script", help="run a click script until it finishes or is interrupted")
+    script_parser.add_argument("script", help="script file (see script.py for the commands)")
+    script_parser.add_argument("--repeat", type=int, default=1, help="passes over the script, 0 = until stopped")
+    script_parser.add_argument("--check", action="store_true", help="only parse and validate the script")
+
+    for job_parser in (run_parser, script_parser):
+        job_parser.add_argument("--backend", default="pynput", choices=sorted(BACKENDS),
+                                help="input backend (default: pynput)")
+        job_parser.add_argument("--duration", type=float, default=0,
+                                help="stop after this many seconds (default: run until the job finishes)")
+        job_parser.add_argument("--stats-every", type=float, default=0, metavar="SECONDS",
+                                help="print stats periodically while running")
+        job_parser.add_argument("--json", action="store_true", help="print stats as JSON lines")
+
+    presets_parser = commands.add_parser("presets", help="manage the preset library")
+    actions = presets_parser.add_subparsers(dest="action", required=True)
+    list_parser = actions.add_parser("list", help="list presets, most recently used first")
+    list_parser.add_argument("search", nargs="?", help="only names containing this text")
+    list_parser.add_argument("--tag", help="only presets with this tag")
+    list_parser.add_argument("--json", action="store_true", help="print one JSON object per preset")
+    import_parser = actions.add_parser("import", help="import preset JSON files or folders of them")
+    import_parser.add_argument("files", nargs="+")
+    import_parser.add_argument("--tags", help="comma separated tags for the imported presets")
+    export_parser = actions.add_parser("export", help="write a preset to a JSON file")
+    export_parser.add_argument("name")
+    export_parser.add_argument("file")
+    delete_parser = actions.add_parser("delete", help="remove a preset from the library")
+    delete_parser.add_argument("name")
+
+    serve_parser = commands.add_parser("serve", help="accept JSON-lines commands on a Unix socket")
+    serve_parser.add_argument("--socket", help="socket path (default: $XDG_RUNTIME_DIR/autoclicker.sock)")
+    serve_parser.add_argument("--backend", default="pynput", choices=sorted(BACKENDS),
+                              help="input backend (default: pynput)")
+    for engine_parser in (run_parser, script_parser, serve_parser):
+        engine_parser.add_argument("--process", action="store_true",
+                                   help="run the click engine in a separate process")
+    ctl_parser = commands.add_parser("ctl", help="send JSON commands to a running control server")
+    ctl_parser.add_argument("commands", nargs="+", help='JSON command objects, e.g. \'{"cmd": "jobs"}\'')
+    ctl_parser.add_argument("--socket", help="socket path (default: as for serve)")
+    ctl_parser.add_argument("--follow", action="store_true", help="keep printing streamed stats until the job ends")
+
+    grab_parser = commands.add_parser("grab", help="save a screen region as a PNG (template for a trigger)")
+    for name in ("x", "y", "width", "height"):
+        grab_parser.add_argument(name, type=int)
+    grab_parser.add_argument("file", help="PNG file to write")
+    grab_parser.add_argument("--capture", help="capture backend (default: native, then mss)")
+
+    args = parser.parse_args(argv)
+    if args.command == "grab":
+        return grab(args)
+    if args.command == "serve":
+        return serve(args)
+    if args.command == "ctl":
+        return ctl(args)
+    if args.command == "run":
+        return run(args)
+    if args.command == "script":
+        return script(args)
+    if args.command == "presets":
+        return presets(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+# control.py
+# Local control server: start, stop and retune jobs from other processes on the same host over a Unix
+# domain socket, one JSON object per line.
+#
+#   -> {"id": 1, "cmd": "start", "preset": {"hotkey": "Mouse: Left", "interval_ms": 50}}
+#   <- {"id": 1, "ok": true, "job": 1}
+#   -> {"id": 2, "cmd": "update", "job": 1, "interval_ms": 20}
+#   -> {"id": 3, "cmd": "stats", "job": 1, "every": 1.0}
+#   <- {"id": 3, "ok": true, "stats": {...}}              then {"id": 3, "event": "stats", ...} every second
+#   -> [{"cmd": "stop", "job": 1}, {"cmd": "jobs"}]        a batch: one JSON array in, one array out
+#
+# Commands are answered in order, and a client may send any number of them without waiting for the
+# replies (pipelining). Replies are written straight to the socket; the server only waits for the
+# client to read when a lot of output is queued.
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+
+try:
+    from .engine import ClickJob
+    from .presets import compile_preset, load_preset_file, preset_job, preset_plan
+except ImportError:
+    from engine import ClickJob
+    from presets import compile_preset, load_preset_file, preset_job, preset_plan
+
+# Longest accepted line (a preset with a large script fits easily)
+MAX_LINE = 1 << 20
+# Queued reply bytes before the server waits for a slow client to read
+WRITE_HIGH_WATER = 64 * 1024
+# Finished jobs kept for "stats" and "jobs" replies
+JOB_HISTORY = 64
+MIN_STATS_EVERY = 0.05
+
+
+class ControlError(Exception):
+    """A command that cannot be carried out; sent back to the client as the error message."""
+
+
+def default_socket_path():
+    """autoclicker.sock in $XDG_RUNTIME_DIR, or a per-user name in the temp folder."""
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "autoclicker.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"autoclicker-{uid}.sock")
+
+
+def _socket_in_use(path):
+    """
+    True if a server is listening on path; a stale socket file from a crashed server is removed.
+    Raises OSError if something other than a socket is in the way.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISSOCK(mode):
+        raise OSError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        os.unlink(path)
+        return False
+    finally:
+        probe.close()
+
+
+class ControlServer:
+    """
+    Serves the control protocol for a ClickerEngine. serve_forever() blocks; start() serves from a
+    daemon thread (e.g. next to the GUI) and returns once the socket is listening.
+    Jobs started through the server run on engine with its default backend unless a command names one.
+    """
+
+    def __init__(self, engine, path=None):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("The control server needs Unix domain sockets")
+        self.engine = engine
+        self.path = path or default_socket_path()
+        self._jobs = OrderedDict()     # id -> (job, preset) for jobs started here
+        self._loaded = None            # (preset, compiled) from the last "load"
+        self._loop = None
+        self._server = None
+        self._stopped = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._clients = {}             # connection task -> writer
+        self._commands = {
+            "start": self._cmd_start,
+            "stop": self._cmd_stop,
+            "update": self._cmd_update,
+            "load": self._cmd_load,
+            "stats": self._cmd_stats,
+            "jobs": self._cmd_jobs,
+            "ping": self._cmd_ping,
+        }
+
+    # --- Running ---
+    def serve_forever(self):
+        """Serve until close() is called (or the process is interrupted)."""
+        asyncio.run(self._serve())
+
+    def start(self):
+        """Serve from a daemon thread. Raises OSError if the socket cannot be opened."""
+        self._thread = threading.Thread(target=self._serve_thread, name="ControlServer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def close(self):
+        """Stop serving and remove the socket file. Jobs keep running on the engine."""
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join(2)
+
+    def _serve_thread(self):
+        try:
+            self.serve_forever()
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+
+    async def _serve(self):
+        if _socket_in_use(self.path):
+            raise OSError(f"A control server is already listening on {self.path}")
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        # Owner-only socket (anyone who can connect can click), made so before it starts listening.
+        # chmod rather than umask: the umask is process-wide and other threads may be creating files.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.path)
+            os.chmod(self.path, 0o600)
+            self._server = await asyncio.start_unix_server(self._client, sock=sock, limit=MAX_LINE)
+        except BaseException:
+            sock.close()
+            raise
+        self._ready.set()
+        try:
+            await self._stopped.wait()
+        finally:
+            self._server.close()
+            # Closed connections read EOF, so their handlers return instead of being cancelled mid-read
+            for writer in self._clients.values():
+                writer.close()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            await self._server.wait_closed()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    # --- Connections ---
+    async def _client(self, reader, writer):
+        streams = {}
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    self._send(writer, {"ok": False, "error": f"Line longer than {MAX_LINE} bytes"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    self._send(writer, {"ok": False, "error": f"Invalid JSON: {e}"})
+                    continue
+                if isinstance(message, list):
+                    reply = [self._handle(m, writer, streams) for m in message]
+                else:
+                    reply = self._handle(message, writer, streams)
+                self._send(writer, reply)
+                if writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for stream in streams.values():
+                stream.cancel()
+            writer.close()
+            self._clients.pop(task, None)
+
+    def _send(self, writer, reply):
+        if not writer.is_closing():
+            writer.write(json.dumps(reply, separators=(",", ":")).encode() + b"\n")
+
+    def _handle(self, message, writer, streams):
+        """Run one command and return its reply."""
+        if not isinstance(message, dict):
+            return {"ok": False, "error": "Commands are JSON objects"}
+        reply = {"id": message["id"]} if "id" in message else {}
+        if message.get("cmd") == "cancel":
+            task = streams.pop(message.get("stream"), None)
+            if task is not None:
+                task.cancel()
+            reply["ok"] = task is not None
+            return reply
+        handler = self._commands.get(message.get("cmd"))
+        try:
+            if handler is None:
+                raise ControlError(f"Unknown command {message.get('cmd')!r} "
+                                   f"(use {', '.join(sorted(self._commands))} or cancel)")
+            result = handler(message)
+            every = message.get("every") if message.get("cmd") == "stats" else None
+            if every:
+                every = max(MIN_STATS_EVERY, float(every))
+        except KeyError as e:
+            reply.update(ok=False, error=f"Not found: {e.args[0]}")
+            return reply
+        except (ControlError, ValueError, TypeError, OSError, RuntimeError, sqlite3.Error) as e:
+            reply.update(ok=False, error=str(e))
+            return reply
+        reply["ok"] = True
+        reply.update(result)
+        if every:
+            # One stream per command id; a new "stats" with the same id replaces it
+            stream_id = message.get("id")
+            old = streams.pop(stream_id, None)
+            if old is not None:
+                old.cancel()
+            streams[stream_id] = asyncio.ensure_future(
+                self._stream_stats(writer, stream_id, self._job(message), every))
+        return reply
+
+    async def _stream_stats(self, writer, stream_id, job, every):
+        while not writer.is_closing():
+            await asyncio.sleep(every)
+            finished = not job.running
+            self._send(writer, {"id": stream_id, "event": "stats", "job": job.id,
+                                "final": finished, "stats": job.stats()})
+            if finished:
+                return
+
+    # --- Commands ---
+    def _job(self, message):
+        """The job a command names with "job", or the most recent one started here."""
+        if "job" in message:
+            entry = self._jobs.get(int(message["job"]))
+            if entry is None:
+                raise KeyError(f"job {message['job']}")
+            return entry[0]
+        if not self._jobs:
+            raise ControlError("No job has been started")
+        return next(reversed(self._jobs.values()))[0]
+
+    def _source(self, message):
+        """(preset, compiled or None, library name or None) from a command's preset/file/library keys."""
+        if "preset" in message:
+            if not isinstance(message["preset"], dict):
+                raise ControlError("preset must be an object")
+            return message["preset"], None, None
+        if "file" in message:
+            return load_preset_file(message["file"]), None, None
+        if "library" in message:
+            return None, None, message["library"]
+        if self._loaded is None:
+            raise ControlError("Give a preset, file or library name, or load one first")
+        return self._loaded[0], self._loaded[1], None
+
+    def _cmd_start(self, message):
+        preset, compiled, name = self._source(message)
+        if name is not None:
+            try:
+                from .preset_library import get_library
+            except ImportError:
+                from preset_library import get_library
+            library = get_library()
+            job = library.job(name)
+            preset = library.get(name, touch=False)
+        else:
+            job = preset_job(preset, compiled=compiled)
+        # The engine may hand back its own handle for the job (engine_process.ProcessEngine)
+        job = self.engine.submit_job(job, message.get("backend"))
+        self._jobs[job.id] = (job, preset)
+        if len(self._jobs) > JOB_HISTORY:
+            for job_id, (old, _) in list(self._jobs.items()):
+                if not old.running:
+                    del self._jobs[job_id]
+                    break
+        return {"job": job.id}
+
+    def _cmd_stop(self, message):
+        if "job" in message:
+            jobs = [self._job(message)]
+        else:
+            jobs = self.engine.jobs()
+        for job in jobs:
+            job.stop()
+        return {"stopped": [job.id for job in jobs]}
+
+    def _cmd_update(self, message):
+        """Retune a running click job: the other keys are preset fields merged over its current preset."""
+        job = self._job(message)
+        if not (isinstance(job, ClickJob) or getattr(job, "updatable", False)) or not job.running:
+            raise ControlError(f"Job {job.id} is not a running click job")
+        preset = dict(self._jobs[job.id][1])
+        preset.update((k, v) for k, v in message.items() if k not in ("id", "cmd", "job"))
+        # Either interval form replaces the other, which preset_interval_ms() would otherwise prefer
+        if "interval_ms" in message:
+            preset.pop("interval", None)
+        elif "interval" in message:
+            preset.pop("interval_ms", None)
+        job.update(preset_plan(preset))
+        self._jobs[job.id] = (job, preset)
+        return {"job": job.id}
+
+    def _cmd_load(self, message):
+        """Validate a preset and keep it compiled, so a later "start" without a source runs it at once."""
+        preset, compiled, name = self._source(message)
+        if name is not None:
+            try:
+                from .preset_library import get_library
+            except ImportError:
+                from preset_library import get_library
+            preset = get_library().get(name)
+        self._loaded = (preset, compiled or compile_preset(preset))
+        return {"preset": preset}
+
+    def _cmd_stats(self, message):
+        job = self._job(message)
+        return {"job": job.id, "running": job.running, "stats": job.stats()}
+
+    def _cmd_jobs(self, message):
+        return {"jobs": [{"job": job.id, "type": getattr(job, "kind", type(job).__name__), "state": job.state,
+                          "actions": job.actions} for job, _ in self._jobs.values()]}
+
+    def _cmd_ping(self, message):
+        return {}
+
+
+class ControlClient:
+    """
+    Minimal blocking client: request() sends one command (or a list, as a batch) and returns the reply;
+    events() yields stream events (stats with "every") as they arrive.
+    """
+
+    def __init__(self, path=None, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_socket_path())
+        self._file = self.sock.makefile("rb")
+        self._events = []
+
+    def send(self, message):
+        self.sock.sendall(json.dumps(message).encode() + b"\n")
+
+    def receive(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Control server closed the connection")
+        return json.loads(line)
+
+    def request(self, message):
+        self.send(message)
+        while True:
+            reply = self.receive()
+            if isinstance(reply, dict) and "event" in reply:
+                self._events.append(reply)
+            else:
+                return reply
+
+    def events(self):
+        while self._events:
+            yield self._events.pop(0)
+        while True:
+            yield self.receive()
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,524 @@
+# engine.py
+# Click engine: one scheduler thread multiplexing any number of independent click/key jobs
+
+import heapq
+import itertools
+import threading
+
+try:
+    from .actions import ACTION_MOUSE, ACTION_SCROLL, ACTION_KEY, TIMING_DEADLINE
+    from .backends import InputBackend, get_backend
+    from .telemetry import Telemetry
+    from .timing import DeadlineTimer, wait_until, rate_stats, perf_counter, SPIN_THRESHOLD, WAKE_MARGIN
+except ImportError:
+    from actions import ACTION_MOUSE, ACTION_SCROLL, ACTION_KEY, TIMING_DEADLINE
+    from backends import InputBackend, get_backend
+    from telemetry import Telemetry
+    from timing import DeadlineTimer, wait_until, rate_stats, perf_counter, SPIN_THRESHOLD, WAKE_MARGIN
+
+# Scheduler entry phases. Jobs may define their own non-negative phases; _PHASE_STOP is reserved.
+PHASE_STEP = 0
+_PHASE_PRESS = 0    # move (if requested) and perform / press the action
+_PHASE_RELEASE = 1  # release what was pressed, count the action, schedule the next press
+_PHASE_STOP = -1    # release anything still held and finish the job
+PHASE_MOVE = 2      # stream the points of a smooth move (EngineJob._start_path), then continue
+PHASE_POLL = 3      # coarse step (e.g. polling a trigger): the engine sleeps until it is due, no spin
+
+# Returned by EngineJob._step() for a job that stays alive without another scheduled step
+WAIT_FOR_STOP = object()
+
+# Job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_HOLDING = "holding"
+JOB_DONE = "done"
+
+
+class EngineJob:
+    """
+    Base class for work scheduled on a ClickerEngine; submit with ClickerEngine.submit_job().
+    Subclasses implement _step() (and usually _bind()/_release_held()); the engine calls them on its
+    worker thread only, so they need no locking of their own.
+    """
+
+    interval = 0.0   # requested seconds between actions, used for stats
+    precise = False  # deadline-mode jobs set this to spin for the last stretch before each step
+
+    def __init__(self, on_finish=None, backend=None):
+        self.id = None
+        self.on_finish = on_finish
+        self.backend = backend
+        self.state = JOB_PENDING
+        self.error = None      # exception that ended the job, if it failed
+        self.actions = 0
+        self.started = None
+        self.last = None
+        self.timer = None
+        self.telemetry = Telemetry(self.interval)
+        self._engine = None
+        self._done = threading.Event()
+        self._path = None
+
+    @property
+    def running(self):
+        return self.state != JOB_DONE
+
+    def stop(self):
+        """Stop the job (releases anything it holds). Safe to call from any thread, more than once."""
+        if self._engine is not None:
+            self._engine.stop_job(self)
+
+    def wait(self, timeout=None):
+        """Block until the job has finished. Returns True if it finished within timeout."""
+        return self._done.wait(timeout)
+
+    def stats(self):
+        """
+        Achieved vs requested actions per second for this job (see timing.rate_stats), plus the
+        telemetry snapshot: count, current_cps, jitter percentiles and late/dropped counts.
+        """
+        stats = rate_stats(self.actions, self.started, self.last, self.interval,
+                           self.timer.missed if self.timer else 0)
+        stats.update(self.telemetry.snapshot())
+        return stats
+
+    def _bind(self, backend):
+        """Called once on the engine thread before the first step, with the backend to use."""
+        self.backend = backend
+        self.state = JOB_RUNNING
+        self.started = perf_counter()
+        if self.timer:
+            self.timer.start(self.started)
+
+    def _step(self, phase, deadline):
+        """
+        Perform the work due at deadline. Return (next_deadline, next_phase), None when the job is
+        finished, or WAIT_FOR_STOP to stay alive without scheduling another step.
+        """
+        raise NotImplementedError
+
+    def _release_held(self):
+        """Release any input the job still holds down (called when it finishes or is stopped)."""
+
+    def _start_path(self, start, end):
+        """
+        Begin a smooth move from start to end (see paths.build_path). Returns False when there is nothing
+        to stream (unknown start, or close enough to jump); otherwise step with _advance_path().
+        """
+        if start is None:
+            return False
+        # Imported on first use: paths pulls in NumPy when it is installed
+        try:
+            from .paths import build_path, PathStream
+        except ImportError:
+            from paths import build_path, PathStream
+        path = build_path(start, end)
+        if path is None:
+            return False
+        self._path = PathStream(path, perf_counter())
+        return True
+
+    def _advance_path(self):
+        """Move along the current path. Returns the next point's deadline, or None once it is finished."""
+        nxt = self._path.advance(self.backend, perf_counter())
+        if nxt is None:
+            self._path = None
+        return nxt
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.id} {self.state} actions={self.actions}>"
+
+
+class ClickJob(EngineJob):
+    """
+    Job that repeats one compiled ActionPlan. Returned by ClickerEngine.submit().
+    Jobs are independent: each has its own plan (interval, action, repeat count) and stop handle.
+    The plan can be replaced while the job runs with update(); the next action uses it.
+    """
+
+    def __init__(self, plan, on_finish=None, backend=None):
+        super().__init__(on_finish, backend)
+        self.plan = plan
+        self._next_plan = plan   # latest plan passed to update(), swapped in at the next press
+        self.interval = self.telemetry.interval = plan.interval
+        self.timer = DeadlineTimer(plan.interval, plan.missed_policy) if plan.timing == TIMING_DEADLINE else None
+        self._pressed = ()       # objects currently held down, released on stop
+        self._press = None       # bound backend methods and resolved objects, set on the engine thread
+        self._release = None
+        self._press_seq = ()
+        self._release_seq = ()
+        # Pre-sampled jitter (None when disabled): one list index per action on the hot path
+        self._intervals = None
+        self._offsets = None
+        self._make_jitter(plan, intervals=True, offsets=True)
+
+    def update(self, plan):
+        """
+        Replace the running job's ActionPlan (interval, position, action, hold time, ...). Safe to call
+        from any thread: the new plan is a single reference swap, picked up at the start of the next
+        press, so the job keeps its place in the schedule. A job holding its button down (hold mode)
+        keeps holding until it is stopped.
+        """
+        self._next_plan = plan
+
+    @property
+    def precise(self):
+        # Interval mode sleeps after each action anyway; only deadline mode is worth a spin
+        return self.timer is not None
+
+    def _make_jitter(self, plan, intervals, offsets):
+        """(Re)create the interval and/or offset jitter buffers for plan."""
+        if intervals:
+            self._intervals = None
+        if offsets:
+            self._offsets = None
+        if not (plan.interval_jitter or plan.position_jitter):
+            return
+        try:
+            from .jitter import JitterBuffer, interval_sampler, offset_sampler
+        except ImportError:
+            from jitter import JitterBuffer, interval_sampler, offset_sampler
+        if intervals and plan.interval_jitter:
+            self._intervals = JitterBuffer(interval_sampler(plan.interval, plan.interval_jitter, plan.seed))
+        if offsets and plan.position_jitter and plan.position is not None:
+            self._offsets = JitterBuffer(offset_sampler(plan.position_jitter, plan.seed))
+
+    def _resolve(self, plan, backend):
+        """Resolve the backend methods and button/key objects for plan once."""
+        if plan.kind == ACTION_KEY:
+            self._press, self._release = backend.press_key, backend.release_key
+            resolve = backend.resolve_key
+        else:
+            self._press, self._release = backend.press_button, backend.release_button
+            resolve = backend.resolve_button
+        self._press_seq = tuple(resolve(name) for name in plan.press_seq)
+        self._release_seq = tuple(reversed(self._press_seq))
+
+    def _bind(self, backend):
+        self._resolve(self.plan, backend)
+        super()._bind(backend)
+
+    def _apply_plan(self, plan):
+        """Swap in a plan passed to update(); runs on the engine thread between actions."""
+        old = self.plan
+        self.plan = plan
+        if plan.kind != old.kind or plan.press_seq != old.press_seq:
+            self._resolve(plan, self.backend)
+        if plan.interval != old.interval:
+            self.interval = self.telemetry.interval = plan.interval
+        if plan.timing != old.timing:
+            self.timer = None
+            if plan.timing == TIMING_DEADLINE:
+                self.timer = DeadlineTimer(plan.interval, plan.missed_policy)
+                self.timer.start(perf_counter())
+        elif self.timer:
+            self.timer.interval = max(0.0, plan.interval)
+            self.timer.missed_policy = plan.missed_policy
+        self._make_jitter(
+            plan,
+            intervals=(plan.interval, plan.interval_jitter, plan.seed) != (old.interval, old.interval_jitter, old.seed),
+            offsets=(plan.position_jitter, plan.seed, plan.position is None) != (old.position_jitter, old.seed, old.position is None),
+        )
+
+    def _step(self, phase, deadline):
+        if phase == _PHASE_RELEASE:
+            return self._step_release()
+        if phase == _PHASE_PRESS and self._next_plan is not self.plan:
+            self._apply_plan(self._next_plan)
+        return self._step_action(phase, deadline)
+
+    def _step_action(self, phase, deadline):
+        """Smooth move (if enabled) then press, for the current plan."""
+        if phase == PHASE_MOVE or (self.plan.smooth_move and self._start_move()):
+            nxt = self._advance_path()
+            if nxt is not None:
+                return (nxt, PHASE_MOVE)
+        return self._step_press(deadline)
+
+    def _start_move(self):
+        """Start a smooth move to the plan position if the cursor is somewhere else."""
+        if self.plan.position is None:
+            return False
+        try:
+            start = self.backend.position()
+        except Exception:
+            start = None
+        return self._start_path(start, self.plan.position)
+
+    def _step_press(self, deadline):
+        plan = self.plan
+        kind = plan.kind
+        backend = self.backend
+        self.last = now = perf_counter()
+        self.telemetry.record(now, now - deadline)
+
+        # Move mouse if requested
+        if plan.position is not None:
+            x, y = plan.position
+            offsets = self._offsets
+            if offsets is not None:
+                x += offsets.next()
+                y += offsets.next()
+            try:
+                backend.move(x, y)
+            except Exception:
+                pass
+
+        if kind == ACTION_SCROLL:
+            try:
+                backend.scroll(*plan.scroll_delta)
+            except Exception:
+                pass
+
+        elif kind == ACTION_MOUSE:
+            try:
+                press = self._press
+                for btn in self._press_seq:
+                    press(btn)
+                self._pressed = self._release_seq
+            except Exception:
+                pass
+            if plan.hold:
+                # Held until stopped; stopping the job releases it
+                self.actions += 1
+                self.state = JOB_HOLDING
+                return WAIT_FOR_STOP
+
+        elif kind == ACTION_KEY:
+            try:
+                press = self._press
+                for key in self._press_seq:
+                    press(key)
+                self._pressed = self._release_seq
+            except Exception as e:
+                print(f"Key press failed: {str(e)}")
+                self._pressed = ()
+                return None
+            if plan.hold:
+                # Keys stay down after the first press in hold mode
+                self._pressed = ()
+                self.actions += 1
+                return None
+
+        if self._pressed and plan.hold_time > 0:
+            return (self.last + plan.hold_time, _PHASE_RELEASE)
+        return self._step_release()
+
+    def _step_release(self):
+        plan = self.plan
+        if self._pressed:
+            try:
+                release = self._release
+                for obj in self._pressed:
+                    release(obj)
+            except Exception as e:
+                if plan.kind == ACTION_KEY:
+                    print(f"Key press failed: {str(e)}")
+                    self._pressed = ()
+                    return None
+            self._pressed = ()
+        self.actions += 1
+
+        # Repeat termination
+        if plan.repeat_times is not None and self.actions >= plan.repeat_times:
+            return None
+
+        now = perf_counter()
+        intervals = self._intervals
+        if self.timer:
+            deadline = self.timer.advance(now)
+            if intervals is not None:
+                # Jitter around the drift-free grid rather than accumulating it
+                deadline += intervals.next() - plan.interval
+            return (deadline, _PHASE_PRESS)
+        return (now + (intervals.next() if intervals is not None else plan.interval), _PHASE_PRESS)
+
+    def _release_held(self):
+        if self._pressed:
+            try:
+                for obj in self._pressed:
+                    self._release(obj)
+            except Exception:
+                pass
+            self._pressed = ()
+
+    def __repr__(self):
+        return f"<ClickJob {self.id} {self.plan.kind} {self.state} actions={self.actions}>"
+
+
+class ClickerEngine:
+    """
+    Runs jobs on a single worker thread.
+    Pending steps sit in a heap ordered by absolute perf_counter() deadline; the worker sleeps on a
+    condition variable until the earliest one is due (or a job is added/stopped), then spins for the
+    final sub-millisecond. An idle engine has no periodic wakeups.
+    """
+
+    def __init__(self, backend=None, spin_threshold=SPIN_THRESHOLD):
+        """
+        backend: default InputBackend (instance or name, see backends.get_backend) for jobs without their
+        own. A name is only opened when the first such job starts; if that fails, only that job ends.
+        """
+        self.backend = backend
+        self.spin_threshold = spin_threshold
+        self._heap = []                   # (deadline, seq, job, phase)
+        self._seq = itertools.count()     # tie-breaker so equal deadlines never compare jobs
+        self._ids = itertools.count(1)
+        self._jobs = {}                   # id -> job for every job that has not finished
+        self._cond = threading.Condition()
+        self._thread = None
+        self._shutdown = False
+        self._backends = {}               # name -> InputBackend created for jobs that asked for it by name
+
+    # --- Public API ---
+    def submit(self, plan, on_finish=None, backend=None):
+        """
+        Schedule a compiled ActionPlan (see actions.compile_action_plan). Returns its ClickJob.
+        backend overrides the engine's default InputBackend for this job only.
+        """
+        return self.submit_job(ClickJob(plan, on_finish), backend)
+
+    def submit_job(self, job, backend=None):
+        """
+        Schedule any EngineJob to start immediately. Returns the job.
+        backend: InputBackend instance or name; named backends are created once and shared by every job
+        on this engine that asks for them, and closed on shutdown().
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("ClickerEngine has been shut down")
+            if isinstance(backend, str):
+                if backend not in self._backends:
+                    self._backends[backend] = get_backend(backend)
+                backend = self._backends[backend]
+            if backend is not None:
+                job.backend = get_backend(backend)
+            job.id = next(self._ids)
+            job._engine = self
+            self._jobs[job.id] = job
+            self._push(perf_counter(), job, PHASE_STEP)
+            self._ensure_thread()
+            self._cond.notify()
+        return job
+
+    def stop_job(self, job):
+        """Ask a job to stop; the engine thread releases held input and calls its on_finish."""
+        with self._cond:
+            if job.state == JOB_DONE or job.id not in self._jobs:
+                return
+            self._push(perf_counter(), job, _PHASE_STOP)
+            self._cond.notify()
+
+    def stop_all(self):
+        """Stop every job currently scheduled on this engine."""
+        with self._cond:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self.stop_job(job)
+
+    def jobs(self):
+        """Snapshot of the jobs that have not finished yet."""
+        with self._cond:
+            return list(self._jobs.values())
+
+    def shutdown(self, timeout=None):
+        """Stop all jobs and end the worker thread."""
+        self.stop_all()
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+        with self._cond:
+            backends, self._backends = list(self._backends.values()), {}
+        for backend in backends:
+            try:
+                backend.close()
+            except Exception as e:
+                print(f"Could not close input backend {backend.name}: {e}")
+
+    # --- Scheduler internals ---
+    def _push(self, deadline, job, phase):
+        heapq.heappush(self._heap, (deadline, next(self._seq), job, phase))
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="ClickerEngine", daemon=True)
+        self._thread.start()
+
+    def _next_entry(self):
+        """Block until the earliest heap entry is (nearly) due and pop it. Returns None on shutdown."""
+        heap = self._heap
+        cond = self._cond
+        with cond:
+            while True:
+                if self._shutdown and not self._jobs:
+                    return None
+                # Drop stale entries left behind by jobs that already finished
+                while heap and heap[0][2].state == JOB_DONE:
+                    heapq.heappop(heap)
+                if not heap:
+                    cond.wait()
+                    continue
+                remaining = heap[0][0] - perf_counter()
+                job = heap[0][2]
+                margin = self.spin_threshold + WAKE_MARGIN if job.precise and heap[0][3] != PHASE_POLL else 0.0
+                if remaining > margin:
+                    # Woken early by submit/stop, which may have pushed an earlier deadline
+                    cond.wait(remaining - margin)
+                    continue
+                return heapq.heappop(heap)
+
+    def _default_backend(self):
+        """The engine's own backend, built on first use by a job that does not bring one."""
+        if not isinstance(self.backend, InputBackend):
+            self.backend = get_backend(self.backend)
+        return self.backend
+
+    def _run(self):
+        while True:
+            entry = self._next_entry()
+            if entry is None:
+                return
+            deadline, _, job, phase = entry
+            if job.state == JOB_DONE:
+                continue   # stale entry of a job that was already stopped
+            if phase != PHASE_POLL and job.precise:
+                wait_until(deadline, spin_threshold=self.spin_threshold)
+            try:
+                if phase == _PHASE_STOP:
+                    self._finish(job)
+                else:
+                    if job.state == JOB_PENDING:
+                        job._bind(job.backend or self._default_backend())
+                    nxt = job._step(phase, deadline)
+                    if nxt is None:
+                        self._finish(job)
+                    elif nxt is not WAIT_FOR_STOP:
+                        with self._cond:
+                            self._push(nxt[0], job, nxt[1])
+            except Exception as e:
+                # Includes a backend that cannot be opened (no pynput, no display): only this job ends
+                print(f"Click job {job.id} failed: {e}")
+                job.error = e
+                self._finish(job)
+            if job.backend is not None:
+                try:
+                    job.backend.flush()
+                except Exception:
+                    pass
+
+    def _finish(self, job):
+        if job.state == JOB_DONE:
+            return
+        job._release_held()
+        with self._cond:
+            job.state = JOB_DONE
+            self._jobs.pop(job.id, None)
+        job._done.set()
+        if job.on_finish:
+            try:
+                job.on_finish()
+            except Exception as e:
+                print(f"on_finish callback failed: {e}")
@@ -0,0 +1,462 @@
+# engine_process.py
+# Click engine in a child process: the scheduler gets its own interpreter (and GIL), so Tk, the pynput
+# listeners and the keyboard hook thread in the parent cannot delay clicks. Commands go over a Pipe;
+# every job's counters and timing stats are published into shared memory, so reading them in the
+# parent needs no round trip to the child.
+
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from multiprocessing import shared_memory
+
+try:
+    from .engine import ClickerEngine, ClickJob, JOB_PENDING, JOB_RUNNING, JOB_HOLDING, JOB_DONE
+    from .triggers import TriggerClickJob
+    from .sequence import SequenceJob
+    from .script import ScriptJob
+    from .macro import ReplayJob
+    from .actions import TIMING_DEADLINE
+except ImportError:
+    from engine import ClickerEngine, ClickJob, JOB_PENDING, JOB_RUNNING, JOB_HOLDING, JOB_DONE
+    from triggers import TriggerClickJob
+    from sequence import SequenceJob
+    from script import ScriptJob
+    from macro import ReplayJob
+    from actions import TIMING_DEADLINE
+
+# Jobs that can run at the same time (one stats slot each)
+MAX_JOBS = 64
+# Seconds between stats updates written by the child
+PUBLISH_INTERVAL = 0.05
+# Reads of a slot the child is writing before checking that the child is still alive
+READ_SPINS = 1000
+
+# Stats slot layout, one float64 per field. "seq" is a sequence lock: odd while the child writes.
+STAT_KEYS = ("actions", "elapsed", "requested_cps", "achieved_cps", "missed", "count", "current_cps",
+             "jitter_p50_ms", "jitter_p90_ms", "jitter_p99_ms", "jitter_max_ms", "lateness_p99_ms",
+             "late", "dropped")
+_INT_KEYS = frozenset(("actions", "missed", "count", "late", "dropped"))
+_SLOT_FIELDS = ("seq", "job", "state") + STAT_KEYS
+_SLOT_SIZE = len(_SLOT_FIELDS)
+_STATES = (None, JOB_PENDING, JOB_RUNNING, JOB_HOLDING, JOB_DONE)
+_STATE_CODES = {state: code for code, state in enumerate(_STATES) if state}
+
+
+def job_spec(job):
+    """
+    Describe a job that has not been submitted yet as a picklable spec the child can rebuild it from.
+    Raises TypeError for jobs that cannot run in another process.
+    """
+    cls = type(job)
+    if cls is ClickJob:
+        return ("click", job.plan)
+    if cls is TriggerClickJob:
+        return ("trigger", job.plan, job.trigger)
+    if cls is SequenceJob:
+        return ("sequence", job.sequence, job.repeat, TIMING_DEADLINE if job.deadline_mode else None,
+                job.smooth_move)
+    if cls is ScriptJob:
+        return ("script", job.script, job.repeat, job.capture)
+    if cls is ReplayJob:
+        return ("replay", job.macro, job.speed, job.repeat)
+    raise TypeError(f"{cls.__name__} cannot run in the engine process")
+
+
+def _build_job(spec, on_finish):
+    kind = spec[0]
+    if kind == "click":
+        return ClickJob(spec[1], on_finish)
+    if kind == "trigger":
+        return TriggerClickJob(spec[1], spec[2], on_finish)
+    if kind == "sequence":
+        return SequenceJob(spec[1], spec[2], spec[3], on_finish, smooth_move=spec[4])
+    if kind == "script":
+        return ScriptJob(spec[1], spec[2], on_finish, capture=spec[3])
+    if kind == "replay":
+        return ReplayJob(spec[1], spec[2], spec[3], on_finish)
+    raise ValueError(f"Unknown job spec {kind!r}")
+
+
+def _attach(name):
+    """Open the parent's shared memory block in the child; the parent owns (and unlinks) it."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers it, with the resource tracker the spawned child shares with the
+        # parent; the parent's unlink() unregisters it again
+        return shared_memory.SharedMemory(name)
+
+
+# --- Child process ---
+class _Publisher:
+    """Writes job stats into their shared memory slots (child side)."""
+
+    def __init__(self, shm):
+        self.stats = shm.buf.cast("d")
+        self.slots = {}    # job id -> (job, slot)
+        self.lock = threading.Lock()
+
+    def write(self, job_id, job, slot):
+        """Publish job's stats under the parent's job_id (the child engine numbers its jobs on its own)."""
+        stats = self.stats
+        base = slot * _SLOT_SIZE
+        values = job.stats()
+        stats[base] += 1
+        stats[base + 1] = job_id
+        stats[base + 2] = _STATE_CODES.get(job.state, 0)
+        for i, key in enumerate(STAT_KEYS, base + 3):
+            stats[i] = values[key]
+        stats[base] += 1
+
+    def run(self, stop):
+        while not stop.wait(PUBLISH_INTERVAL):
+            with self.lock:
+                entries = list(self.slots.items())
+            for job_id, (job, slot) in entries:
+                self.write(job_id, job, slot)
+
+
+def _child_main(conn, shm_name, backend, cpu):
+    # Ctrl+C / SIGTERM sent to the whole process group are for the parent, which shuts the child down;
+    # the child also exits on its own when the pipe closes
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as e:
+            print(f"Cannot pin the engine process to CPU {cpu}: {e}")
+    shm = _attach(shm_name)
+    publisher = _Publisher(shm)
+    engine = ClickerEngine(backend=backend)
+    jobs = {}                        # parent job id -> job
+    send_lock = threading.Lock()
+    stop = threading.Event()
+    threading.Thread(target=publisher.run, args=(stop,), name="StatsPublisher", daemon=True).start()
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError):
+                pass
+
+    def finished(job_id, slot):
+        # Engine thread: publish the final stats before telling the parent, so it reads them
+        job = jobs.pop(job_id, None)
+        with publisher.lock:
+            publisher.slots.pop(job_id, None)
+        if job is not None:
+            publisher.write(job_id, job, slot)
+        send(("done", job_id))
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            command = message[0]
+            if command == "submit":
+                _, job_id, slot, spec, job_backend = message
+                try:
+                    job = _build_job(spec, lambda job_id=job_id, slot=slot: finished(job_id, slot))
+                    jobs[job_id] = job
+                    with publisher.lock:
+                        publisher.slots[job_id] = (job, slot)
+                    engine.submit_job(job, job_backend)
+                except Exception as e:
+                    jobs.pop(job_id, None)
+                    with publisher.lock:
+                        publisher.slots.pop(job_id, None)
+                    send(("failed", job_id, str(e)))
+            elif command == "stop":
+                job = jobs.get(message[1])
+                if job is not None:
+                    job.stop()
+            elif command == "update":
+                job = jobs.get(message[1])
+                if isinstance(job, ClickJob):
+                    job.update(message[2])
+            elif command == "stop_all":
+                engine.stop_all()
+            elif command == "shutdown":
+                break
+    finally:
+        engine.shutdown(1)
+        stop.set()
+        publisher.stats.release()
+        shm.close()
+        conn.close()
+
+
+# --- Parent side ---
+class ProcessJob:
+    """
+    Parent-side handle for a job running in the engine process, with the EngineJob API the front ends
+    use: stop(), wait(), stats(), running/state/actions, and update() for click jobs. stats() and the
+    properties read the job's shared memory slot directly.
+    """
+
+    def __init__(self, engine, job, on_finish):
+        self.id = None
+        self.kind = type(job).__name__
+        self.interval = job.interval
+        self.on_finish = on_finish
+        self._engine = engine
+        self._slot = None
+        self._conn = None      # pipe to the engine process that runs the job
+        self._final = None     # stats read once the job has finished
+        self._done = threading.Event()
+
+    @property
+    def state(self):
+        if self._done.is_set():
+            return JOB_DONE
+        values = self._engine._read(self._slot)
+        if values[1] != self.id:
+            return JOB_PENDING
+        return _STATES[int(values[2])] or JOB_PENDING
+
+    @property
+    def running(self):
+        return not self._done.is_set()
+
+    @property
+    def actions(self):
+        return self.stats()["actions"]
+
+    def stop(self):
+        self._engine.stop_job(self)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def updatable(self):
+        """True for click jobs, which take update()."""
+        return self.kind in ("ClickJob", "TriggerClickJob")
+
+    def update(self, plan):
+        """Replace a click job's ActionPlan (see engine.ClickJob.update)."""
+        if not self.updatable:
+            raise TypeError(f"{self.kind} cannot be updated")
+        self._engine._send(("update", self.id, plan), self._conn)
+
+    def stats(self):
+        if self._final is not None:
+            return dict(self._final)
+        values = self._engine._read(self._slot)
+        if values[1] != self.id:
+            # Nothing published for this job yet (the slot may still hold an earlier job's stats)
+            values = [0.0] * _SLOT_SIZE
+        stats = {}
+        for key, value in zip(STAT_KEYS, values[3:]):
+            stats[key] = int(value) if key in _INT_KEYS else value
+        return stats
+
+    def __repr__(self):
+        return f"<ProcessJob {self.id} {self.kind} {self.state}>"
+
+
+class ProcessEngine:
+    """
+    Drop-in for ClickerEngine that runs the scheduler in a child process (started on first use, with
+    the spawn method so the child does not inherit the parent's threads). submit()/submit_job() send
+    the job's inputs to the child and return a ProcessJob. Backends must be given by name.
+    cpu: pin the child to this CPU (Linux), so the click loop has a core to itself.
+    on_finish callbacks run in the parent, on the thread that reads the pipe.
+    If the child dies, its jobs finish and the next submit starts a new one.
+    """
+
+    def __init__(self, backend=None, cpu=None, max_jobs=MAX_JOBS):
+        if backend is not None and not isinstance(backend, str):
+            raise TypeError("The engine process needs a backend name, not an instance")
+        self.backend = backend
+        self.cpu = cpu
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._jobs = {}              # id -> ProcessJob
+        self._free = list(range(max_jobs - 1, -1, -1))
+        self._next_id = 1
+        self._process = None
+        self._conn = None
+        self._shm = None
+        self._stats = None
+        self._reader = None
+        self._shutdown = False
+
+    # --- Public API (as ClickerEngine) ---
+    def submit(self, plan, on_finish=None, backend=None):
+        return self.submit_job(ClickJob(plan), backend, on_finish)
+
+    def submit_job(self, job, backend=None, on_finish=None):
+        """Run job (not yet submitted anywhere) in the engine process. Returns its ProcessJob."""
+        if backend is not None and not isinstance(backend, str):
+            raise TypeError("The engine process needs a backend name, not an instance")
+        spec = job_spec(job)
+        handle = ProcessJob(self, job, on_finish or job.on_finish)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("ProcessEngine has been shut down")
+            self._ensure_process()
+            if not self._free:
+                raise RuntimeError(f"The engine process runs at most {self.max_jobs} jobs at once")
+            handle.id = self._next_id
+            self._next_id += 1
+            handle._slot = self._free.pop()
+            handle._conn = self._conn
+            process = self._process
+            self._jobs[handle.id] = handle
+        if not self._send(("submit", handle.id, handle._slot, spec, backend), handle._conn):
+            # The child died before the reader noticed; this finishes the handle too
+            self._lost(handle._conn, process)
+        return handle
+
+    def stop_job(self, job):
+        if job.running:
+            self._send(("stop", job.id), job._conn)
+
+    def stop_all(self):
+        if self._conn is not None:
+            self._send(("stop_all",))
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, timeout=None):
+        """Stop all jobs, end the child process and free the shared memory."""
+        with self._lock:
+            self._shutdown = True
+            process, conn, reader = self._process, self._conn, self._reader
+        if process is not None:
+            self._send(("shutdown",), conn)
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(1)
+        if reader is not None:
+            reader.join(timeout)
+        if self._shm is not None:
+            self._stats.release()
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    # --- Internals ---
+    def _ensure_process(self):
+        """Start the child (called with _lock held); the stats block outlives it, for its replacement."""
+        if self._process is not None:
+            return
+        ctx = multiprocessing.get_context("spawn")
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.max_jobs * _SLOT_SIZE * 8)
+            self._stats = self._shm.buf.cast("d")
+        conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_child_main, args=(child_conn, self._shm.name, self.backend, self.cpu),
+                              name="ClickerEngine", daemon=True)
+        # spawn re-runs a main script in the child unless it is guarded by __name__ == "__main__";
+        # GUI.py builds its window at import, and the child only needs this module
+        main = sys.modules.get("__main__")
+        main_file = None
+        if main is not None and getattr(main, "__spec__", None) is None:
+            main_file = main.__dict__.pop("__file__", None)
+        try:
+            process.start()
+        finally:
+            if main_file is not None:
+                main.__file__ = main_file
+            child_conn.close()
+        self._process, self._conn = process, conn
+        self._reader = threading.Thread(target=self._read_pipe, args=(conn, process),
+                                        name="EngineProcessReader", daemon=True)
+        self._reader.start()
+
+    def _send(self, message, conn=None):
+        """Send a command to the child (the current one unless conn is given). Returns False if it is gone."""
+        conn = conn or self._conn
+        if conn is None:
+            return False
+        with self._send_lock:
+            try:
+                conn.send(message)
+                return True
+            except (OSError, EOFError) as e:
+                print(f"Engine process is gone: {e}")
+                return False
+
+    def _read(self, slot):
+        """Consistent copy of a stats slot (retries while the child is writing it)."""
+        stats = self._stats
+        base = slot * _SLOT_SIZE
+        spins = 0
+        while True:
+            seq = stats[base]
+            values = stats[base:base + _SLOT_SIZE].tolist()
+            if seq == stats[base] and not int(seq) & 1:
+                return values
+            spins += 1
+            if spins >= READ_SPINS:
+                # A child that died mid-write never finishes the slot
+                process = self._process
+                if process is None or not process.is_alive():
+                    return values
+                spins = 0
+
+    def _read_pipe(self, conn, process):
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "failed":
+                print(f"Click job {message[1]} failed: {message[2]}")
+            self._finish(message[1])
+        self._lost(conn, process)
+
+    def _lost(self, conn, process):
+        """
+        The child behind conn exited (or crashed): forget it so the next submit starts a new one, and
+        finish every job it was running.
+        """
+        with self._lock:
+            if self._conn is conn:
+                self._process = None
+                self._conn = None
+            lost = [job for job in self._jobs.values() if job._conn is conn]
+            shutting_down = self._shutdown
+        conn.close()
+        if not shutting_down:
+            # shutdown() reaps the child itself
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+                process.join(1)
+            # Slots it left mid-write would otherwise stay locked for the jobs that reuse them
+            stats = self._stats
+            for job in lost:
+                base = job._slot * _SLOT_SIZE
+                if int(stats[base]) & 1:
+                    stats[base] += 1
+        for job in lost:
+            self._finish(job.id)
+
+    def _finish(self, job_id):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        job._final = job.stats()
+        with self._lock:
+            self._free.append(job._slot)
+        job._done.set()
+        if job.on_finish:
+            try:
+                job.on_finish()
+            except Exception as e:
+                print(f"on_finish callback failed: {e}")
@@ -0,0 +1,144 @@
+# jitter.py
+# Randomised interval and position jitter drawn in large batches into refillable buffers, so a click
+# only pays for one list index. Batches are filled on a background thread; with a seed the k-th batch
+# is always the same, whichever thread ends up drawing it.
+
+import queue
+import random
+import threading
+
+try:
+    from .actions import DIST_UNIFORM, DIST_NORMAL, DIST_LOGNORMAL
+except ImportError:
+    from actions import DIST_UNIFORM, DIST_NORMAL, DIST_LOGNORMAL
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    np = None
+    _HAS_NUMPY = False
+
+# Samples per batch
+BUFFER_SIZE = 4096
+
+
+# Independent random streams per seed
+_STREAM_INTERVAL = 0
+_STREAM_OFFSET = 1
+
+
+def _generator(seed, stream, batch):
+    """RNG for one batch: fixed by (seed, stream, batch) when seeded, fresh entropy otherwise."""
+    if _HAS_NUMPY:
+        return np.random.default_rng(None if seed is None else [seed, stream, batch])
+    return random.Random(None if seed is None else f"{seed}:{stream}:{batch}")
+
+
+def interval_sampler(interval, spec, seed=None):
+    """Return draw(batch, n): n jittered intervals in seconds (never negative) for the given spec."""
+    dist, amount = spec
+
+    def draw(batch, n):
+        gen = _generator(seed, _STREAM_INTERVAL, batch)
+        if _HAS_NUMPY:
+            if dist == DIST_UNIFORM:
+                values = interval + gen.uniform(-amount, amount, n) / 1000
+            elif dist == DIST_NORMAL:
+                values = interval + gen.normal(0.0, amount, n) / 1000
+            else:
+                values = interval * gen.lognormal(0.0, amount, n)
+            return np.maximum(values, 0.0).tolist()
+        if dist == DIST_UNIFORM:
+            values = [interval + gen.uniform(-amount, amount) / 1000 for _ in range(n)]
+        elif dist == DIST_NORMAL:
+            values = [interval + gen.gauss(0.0, amount) / 1000 for _ in range(n)]
+        else:
+            values = [interval * gen.lognormvariate(0.0, amount) for _ in range(n)]
+        return [v if v > 0 else 0.0 for v in values]
+
+    return draw
+
+
+def offset_sampler(spec, seed=None):
+    """Return draw(batch, n): n integer pixel offsets for the given spec (take two per click for dx, dy)."""
+    dist, amount = spec
+
+    def draw(batch, n):
+        gen = _generator(seed, _STREAM_OFFSET, batch)
+        if _HAS_NUMPY:
+            if dist == DIST_UNIFORM:
+                values = gen.uniform(-amount, amount, n)
+            else:
+                values = gen.normal(0.0, amount, n)
+            return np.rint(values).astype(np.int64).tolist()
+        if dist == DIST_UNIFORM:
+            return [int(round(gen.uniform(-amount, amount))) for _ in range(n)]
+        return [int(round(gen.gauss(0.0, amount))) for _ in range(n)]
+
+    return draw
+
+
+class _Refiller:
+    """One daemon thread that fills spare JitterBuffer batches in the background."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, buffer, batch):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="JitterRefiller", daemon=True)
+                self._thread.start()
+        self._queue.put((buffer, batch))
+
+    def _run(self):
+        while True:
+            buffer, batch = self._queue.get()
+            try:
+                buffer._spare = (batch, buffer._draw(batch, buffer.size))
+            except Exception as e:
+                print(f"Jitter refill failed: {e}")
+
+_refiller = _Refiller()
+
+
+class JitterBuffer:
+    """
+    Pre-sampled values from draw(batch, n). next() is a list index; when a batch runs out the spare
+    batch (filled in the background) is swapped in and the following one is requested. If the spare is
+    not ready yet it is drawn on the spot, so the sequence of values never depends on thread timing.
+    """
+
+    def __init__(self, draw, size=BUFFER_SIZE):
+        self.size = size
+        self._draw = draw
+        self._batch = 0
+        self._values = draw(0, size)
+        self._index = 0
+        self._spare = None       # (batch, values) written by the refiller thread
+        _refiller.submit(self, 1)
+
+    def next(self):
+        i = self._index
+        values = self._values
+        if i == len(values):
+            values = self._swap()
+            i = 0
+        self._index = i + 1
+        return values[i]
+
+    def _swap(self):
+        batch = self._batch + 1
+        spare = self._spare
+        self._spare = None
+        if spare is not None and spare[0] == batch:
+            values = spare[1]
+        else:
+            values = self._draw(batch, self.size)
+        self._batch = batch
+        self._values = values
+        _refiller.submit(self, batch + 1)
+        return values
@@ -0,0 +1,286 @@
+# macro.py
+# Macro recording (pynput listeners) and deadline-based replay on the click engine
+
+from array import array
+import threading
+import time
+
+try:
+    from .engine import EngineJob, PHASE_STEP
+    from .timing import perf_counter
+except ImportError:
+    from engine import EngineJob, PHASE_STEP
+    from timing import perf_counter
+
+# Event kinds (Macro.kind column)
+EV_MOVE = 0
+EV_BUTTON_DOWN = 1
+EV_BUTTON_UP = 2
+EV_SCROLL = 3
+EV_KEY_DOWN = 4
+EV_KEY_UP = 5
+
+# Supported replay speed factors
+MIN_SPEED = 0.5
+MAX_SPEED = 10.0
+
+
+def key_name(key):
+    """Canonical name for a pynput key: Key member name ("ctrl_l"), the character, or "<vk>" as a last resort."""
+    name = getattr(key, "name", None)
+    if name:
+        return name
+    char = getattr(key, "char", None)
+    if char:
+        return char
+    vk = getattr(key, "vk", None)
+    return f"<{vk}>" if vk is not None else None
+
+
+class Macro:
+    """
+    Recorded input events stored column-wise in typed arrays (19 bytes per event), so a multi-hour
+    recording stays a few MB instead of millions of dicts.
+    Columns: t (ns since start), kind (EV_*), x/y (position, or scroll dx/dy), code (index into names).
+    Button events keep the position they happened at for reference; replay only moves on EV_MOVE.
+    """
+
+    def __init__(self):
+        self.t = array("q")
+        self.kind = array("B")
+        self.x = array("i")
+        self.y = array("i")
+        self.code = array("H")
+        self.names = []      # canonical button/key names referenced by code
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.t)
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds."""
+        return self.t[-1] / 1e9 if self.t else 0.0
+
+    def name_code(self, name):
+        """Return the code for a button/key name, adding it to the names table if new."""
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def append(self, t_ns, kind, x=0, y=0, name=None):
+        self.t.append(t_ns)
+        self.kind.append(kind)
+        self.x.append(int(x))
+        self.y.append(int(y))
+        self.code.append(self.name_code(name) if name is not None else 0)
+
+    def events(self):
+        """Iterate events as (t_ns, kind, x, y, name) tuples."""
+        names = self.names
+        for t, kind, x, y, code in zip(self.t, self.kind, self.x, self.y, self.code):
+            name = names[code] if kind in (EV_BUTTON_DOWN, EV_BUTTON_UP, EV_KEY_DOWN, EV_KEY_UP) else None
+            yield (t, kind, x, y, name)
+
+
+class MacroRecorder:
+    """
+    Records mouse moves, clicks, scrolls and key presses with perf_counter_ns timestamps.
+    Uses the same pynput mouse/keyboard listeners as pick_position_blocking(). Pressing stop_key ends
+    the recording (the stop key itself is not recorded).
+    """
+
+    def __init__(self, record_moves=True, stop_key="esc"):
+        self.record_moves = record_moves
+        self.stop_key = stop_key
+        self.macro = Macro()
+        self._t0 = None
+        self._last_pos = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._mouse_listener = None
+        self._key_listener = None
+
+    def start(self):
+        """Start recording on the listener threads; returns immediately."""
+        from pynput import mouse as pynput_mouse, keyboard as pynput_keyboard
+
+        self._t0 = time.perf_counter_ns()
+        self._mouse_listener = pynput_mouse.Listener(
+            on_move=self._on_move if self.record_moves else None,
+            on_click=self._on_click,
+            on_scroll=self._on_scroll,
+        )
+        self._key_listener = pynput_keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
+        self._mouse_listener.start()
+        self._key_listener.start()
+        return self
+
+    def stop(self):
+        """Stop recording and return the Macro."""
+        self._stopped.set()
+        for listener in (self._mouse_listener, self._key_listener):
+            if listener:
+                listener.stop()
+        return self.macro
+
+    def wait(self, timeout=None):
+        """Block until the stop key is pressed (or stop() is called). Returns True if stopped."""
+        return self._stopped.wait(timeout)
+
+    def _record(self, kind, x=0, y=0, name=None):
+        if self._stopped.is_set():
+            return
+        t = time.perf_counter_ns() - self._t0
+        with self._lock:
+            self.macro.append(t, kind, x, y, name)
+
+    def _on_move(self, x, y):
+        self._last_pos = (x, y)
+        self._record(EV_MOVE, x, y)
+
+    def _on_click(self, x, y, button, pressed):
+        # Replay only moves the cursor on move events, so make sure the click position is one
+        if (x, y) != self._last_pos:
+            self._on_move(x, y)
+        self._record(EV_BUTTON_DOWN if pressed else EV_BUTTON_UP, x, y, button.name)
+
+    def _on_scroll(self, x, y, dx, dy):
+        self._record(EV_SCROLL, dx, dy)
+
+    def _on_press(self, key):
+        name = key_name(key)
+        if name == self.stop_key:
+            self.stop()
+            return False
+        if name is not None:
+            self._record(EV_KEY_DOWN, name=name)
+
+    def _on_release(self, key):
+        name = key_name(key)
+        if name is not None and name != self.stop_key:
+            self._record(EV_KEY_UP, name=name)
+
+
+def _resolve_all(resolve, names):
+    """Resolve every name with resolve(), using None for names the backend cannot map."""
+    resolved = []
+    for name in names:
+        try:
+            resolved.append(resolve(name))
+        except Exception:
+            resolved.append(None)
+    return resolved
+
+
+class ReplayJob(EngineJob):
+    """
+    Replays a Macro on the click engine. Every event is due at start + t / speed on perf_counter(),
+    so timing does not drift over long recordings; events already due are sent back to back.
+    repeat: number of passes, None = loop until stopped.
+    """
+
+    def __init__(self, macro, speed=1.0, repeat=1, on_finish=None, backend=None):
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"Replay speed must be between {MIN_SPEED}x and {MAX_SPEED}x, got {speed}")
+        super().__init__(on_finish, backend)
+        self.macro = macro
+        self.speed = speed
+        self.repeat = repeat
+        self.loops = 0
+        if len(macro) > 1 and macro.duration > 0:
+            self.interval = self.telemetry.interval = macro.duration / (len(macro) - 1) / speed
+        self._index = 0
+        self._base = None
+        self._buttons = ()
+        self._keys = ()
+        self._held_buttons = set()
+        self._held_keys = set()
+
+    def _bind(self, backend):
+        self._buttons = _resolve_all(backend.resolve_button, self.macro.names)
+        self._keys = _resolve_all(backend.resolve_key, self.macro.names)
+        super()._bind(backend)
+        self._base = self.started
+
+    def _step(self, phase, deadline):
+        macro = self.macro
+        t, kinds, xs, ys, codes = macro.t, macro.kind, macro.x, macro.y, macro.code
+        n = len(t)
+        if n == 0:
+            return None
+        backend = self.backend
+        scale = 1e-9 / self.speed
+        i = self._index
+        base = self._base
+        now = perf_counter()
+        self.telemetry.record(now, now - deadline)
+
+        while True:
+            self._dispatch(backend, kinds[i], xs[i], ys[i], codes[i])
+            self.actions += 1
+
+            i += 1
+            if i == n:
+                self.loops += 1
+                if self.repeat is not None and self.loops >= self.repeat:
+                    self._index = i
+                    self.last = perf_counter()
+                    return None
+                # Next pass starts where this one ended
+                base += t[n - 1] * scale
+                self._base = base
+                i = 0
+                # Back to the scheduler after every pass: a macro whose events are all at t=0 would
+                # otherwise loop here forever, starving other jobs and never seeing stop()
+                due = max(base + t[0] * scale, perf_counter())
+                break
+            due = base + t[i] * scale
+            if due > perf_counter():
+                break
+
+        self._index = i
+        self.last = perf_counter()
+        return (due, PHASE_STEP)
+
+    def _dispatch(self, backend, kind, x, y, code):
+        """Send one event to the backend."""
+        if kind == EV_MOVE:
+            backend.move(x, y)
+        elif kind == EV_BUTTON_DOWN or kind == EV_BUTTON_UP:
+            button = self._buttons[code]
+            if button is not None:
+                if kind == EV_BUTTON_DOWN:
+                    backend.press_button(button)
+                    self._held_buttons.add(button)
+                else:
+                    backend.release_button(button)
+                    self._held_buttons.discard(button)
+        elif kind == EV_SCROLL:
+            backend.scroll(x, y)
+        else:
+            key = self._keys[code]
+            if key is not None:
+                if kind == EV_KEY_DOWN:
+                    backend.press_key(key)
+                    self._held_keys.add(key)
+                else:
+                    backend.release_key(key)
+                    self._held_keys.discard(key)
+
+    def _release_held(self):
+        backend = self.backend
+        for key in self._held_keys:
+            try:
+                backend.release_key(key)
+            except Exception:
+                pass
+        for button in self._held_buttons:
+            try:
+                backend.release_button(button)
+            except Exception:
+                pass
+        self._held_keys.clear()
+        self._held_buttons.clear()
@@ -0,0 +1,355 @@
+# macro_file.py
+# Compact binary macro format, memory-mapped streaming playback, and JSON conversion
+#
+# Layout (little endian):
+#   header   "<8sHHIQQ"  magic, version, flags, name count, event count, duration (ns)
+#   names    per name: "<H" byte length + UTF-8 bytes
+#   records  "<IBxhhH"   12 bytes each: dt (us since previous event), kind, dx, dy, code
+#
+# Positions (move and button events) are delta-encoded against the previous position; scroll events
+# store their dx/dy as-is and key events store 0, 0.
+#
+#   python macro_file.py to-binary recording.json recording.acmacro
+#   python macro_file.py to-json recording.acmacro recording.json
+
+import json
+import mmap
+import struct
+import sys
+
+try:
+    from .macro import (Macro, ReplayJob, EV_MOVE, EV_BUTTON_DOWN, EV_BUTTON_UP, EV_SCROLL,
+                        EV_KEY_DOWN, EV_KEY_UP)
+    from .engine import PHASE_STEP
+    from .timing import perf_counter
+except ImportError:
+    from macro import (Macro, ReplayJob, EV_MOVE, EV_BUTTON_DOWN, EV_BUTTON_UP, EV_SCROLL,
+                       EV_KEY_DOWN, EV_KEY_UP)
+    from engine import PHASE_STEP
+    from timing import perf_counter
+
+MAGIC = b"ACMACRO\0"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".acmacro"
+
+_HEADER = struct.Struct("<8sHHIQQ")
+_NAME_LEN = struct.Struct("<H")
+_RECORD = struct.Struct("<IBxhhH")
+
+# Records decoded per mmap read during playback (48 KB)
+CHUNK_RECORDS = 4096
+
+_MAX_DT_US = 0xFFFFFFFF
+_POSITIONAL = (EV_MOVE, EV_BUTTON_DOWN, EV_BUTTON_UP)
+
+EVENT_TYPES = {
+    EV_MOVE: "move",
+    EV_BUTTON_DOWN: "button_down",
+    EV_BUTTON_UP: "button_up",
+    EV_SCROLL: "scroll",
+    EV_KEY_DOWN: "key_down",
+    EV_KEY_UP: "key_up",
+}
+_EVENT_KINDS = {name: kind for kind, name in EVENT_TYPES.items()}
+
+
+class MacroFormatError(ValueError):
+    """Raised for files that are not valid binary macros."""
+
+
+# --- Writing ---
+def save_macro(path, macro):
+    """Write a Macro to path in the binary format."""
+    t, kinds, xs, ys, codes = macro.t, macro.kind, macro.x, macro.y, macro.code
+    pack = _RECORD.pack
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(macro.names), len(macro), int(macro.duration * 1e9)))
+        for name in macro.names:
+            raw = name.encode("utf-8")
+            f.write(_NAME_LEN.pack(len(raw)))
+            f.write(raw)
+
+        prev_us = 0
+        prev_x = prev_y = 0
+        buf = []
+        for i in range(len(t)):
+            t_us = t[i] // 1000
+            # Gaps longer than ~71 minutes are shortened to the maximum the format can express
+            dt = min(max(0, t_us - prev_us), _MAX_DT_US)
+            prev_us += dt
+            kind = kinds[i]
+            if kind in _POSITIONAL:
+                dx, dy = xs[i] - prev_x, ys[i] - prev_y
+                prev_x, prev_y = xs[i], ys[i]
+            elif kind == EV_SCROLL:
+                dx, dy = xs[i], ys[i]
+            else:
+                dx = dy = 0
+            try:
+                buf.append(pack(dt, kind, dx, dy, codes[i]))
+            except struct.error:
+                raise MacroFormatError(f"Event {i} does not fit the record format (delta {dx}, {dy})")
+            if len(buf) >= CHUNK_RECORDS:
+                f.write(b"".join(buf))
+                buf.clear()
+        f.write(b"".join(buf))
+
+
+# --- Reading ---
+class MacroFile:
+    """
+    Read-only view of a binary macro through mmap. Only the header and name table are parsed up front;
+    records are decoded on demand in CHUNK_RECORDS-sized pieces, so memory use does not grow with the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise MacroFormatError(f"{path} is empty")
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_header(self):
+        mm = self._mm
+        if len(mm) < _HEADER.size:
+            raise MacroFormatError(f"{self.path} is too short to be a macro file")
+        magic, version, _flags, name_count, self.count, self.duration_ns = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise MacroFormatError(f"{self.path} is not a macro file")
+        if version > FORMAT_VERSION:
+            raise MacroFormatError(f"{self.path} uses format version {version}; this build reads up to {FORMAT_VERSION}")
+        offset = _HEADER.size
+        self.names = []
+        for _ in range(name_count):
+            (length,) = _NAME_LEN.unpack_from(mm, offset)
+            offset += _NAME_LEN.size
+            self.names.append(bytes(mm[offset:offset + length]).decode("utf-8"))
+            offset += length
+        self._records_offset = offset
+        if offset + self.count * _RECORD.size > len(mm):
+            raise MacroFormatError(f"{self.path} is truncated")
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def duration(self):
+        return self.duration_ns / 1e9
+
+    def records(self, chunk_records=CHUNK_RECORDS):
+        """Yield raw (dt_us, kind, dx, dy, code) records, reading the mapping chunk by chunk."""
+        mm = self._mm
+        size = _RECORD.size
+        start = self._records_offset
+        end = start + self.count * size
+        step = chunk_records * size
+        while start < end:
+            chunk = mm[start:min(start + step, end)]
+            yield from _RECORD.iter_unpack(chunk)
+            start += step
+
+    def events(self):
+        """Yield decoded (t_ns, kind, x, y, code) events with absolute times and positions."""
+        t = x = y = 0
+        for dt, kind, dx, dy, code in self.records():
+            t += dt * 1000
+            if kind in _POSITIONAL:
+                x += dx
+                y += dy
+                yield (t, kind, x, y, code)
+            else:
+                yield (t, kind, dx, dy, code)
+
+    def to_macro(self):
+        """Load the whole file into an in-memory Macro."""
+        macro = Macro()
+        for name in self.names:
+            macro.name_code(name)
+        for t, kind, x, y, code in self.events():
+            macro.t.append(t)
+            macro.kind.append(kind)
+            macro.x.append(x)
+            macro.y.append(y)
+            macro.code.append(code)
+        return macro
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FileReplayJob(ReplayJob):
+    """
+    Replays a MacroFile straight from the mapping: events are decoded one at a time as they come due,
+    so playback starts immediately and memory stays constant however long the recording is.
+    """
+
+    def __init__(self, macro_file, speed=1.0, repeat=1, on_finish=None, backend=None):
+        super().__init__(macro_file, speed, repeat, on_finish, backend)
+        self._events = None
+        self._pending = None
+
+    def _bind(self, backend):
+        super()._bind(backend)
+        self._events = self.macro.events()
+        self._pending = next(self._events, None)
+
+    def _step(self, phase, deadline):
+        if self._pending is None:
+            return None
+        backend = self.backend
+        scale = 1e-9 / self.speed
+        base = self._base
+        event = self._pending
+        now = perf_counter()
+        self.telemetry.record(now, now - deadline)
+
+        while True:
+            t, kind, x, y, code = event
+            self._dispatch(backend, kind, x, y, code)
+            self.actions += 1
+
+            event = next(self._events, None)
+            if event is None:
+                self.loops += 1
+                if self.repeat is not None and self.loops >= self.repeat:
+                    self._pending = None
+                    self.last = perf_counter()
+                    return None
+                # Next pass starts where this one ended
+                base += t * scale
+                self._base = base
+                self._events = self.macro.events()
+                event = next(self._events, None)
+                if event is None:
+                    return None
+                # Back to the scheduler after every pass (see ReplayJob._step)
+                due = max(base + event[0] * scale, perf_counter())
+                break
+            due = base + event[0] * scale
+            if due > perf_counter():
+                break
+
+        self._pending = event
+        self.last = perf_counter()
+        return (due, PHASE_STEP)
+
+    def _release_held(self):
+        super()._release_held()
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+
+
+# --- JSON conversion ---
+def macro_to_json(macro):
+    """
+    Convert a Macro to a JSON-serialisable dict in the same plain style as saved presets:
+    {"type": "macro", "version": 1, "events": [{"t": ms, "type": "move", "x": .., "y": ..}, ...]}
+    """
+    events = []
+    for t, kind, x, y, name in macro.events():
+        event = {"t": round(t / 1e6, 3), "type": EVENT_TYPES[kind]}
+        if name is not None:
+            event["name"] = name
+        if kind in _POSITIONAL or kind == EV_SCROLL:
+            event["x"], event["y"] = x, y
+        events.append(event)
+    return {"type": "macro", "version": FORMAT_VERSION, "events": events}
+
+
+def macro_from_json(data):
+    """Build a Macro from the dict produced by macro_to_json()."""
+    if data.get("type") != "macro":
+        raise MacroFormatError("JSON data is not a macro (missing \"type\": \"macro\")")
+    macro = Macro()
+    for event in data.get("events", []):
+        try:
+            kind = _EVENT_KINDS[event["type"]]
+        except KeyError:
+            raise MacroFormatError(f"Unknown macro event type: {event.get('type')!r}")
+        macro.append(int(round(float(event["t"]) * 1e6)), kind,
+                     event.get("x", 0), event.get("y", 0), event.get("name"))
+    return macro
+
+
+def preset_to_macro(preset, cycles=None):
+    """
+    Expand a classic click preset (the dict written by save_preset) into a Macro of explicit events.
+    cycles defaults to the preset's repeat count (1 for "until_stopped"; loop the replay instead).
+    """
+    try:
+        from .actions import compile_action_plan, ACTION_MOUSE, ACTION_SCROLL, ACTION_KEY
+    except ImportError:
+        from actions import compile_action_plan, ACTION_MOUSE, ACTION_SCROLL, ACTION_KEY
+
+    interval = preset.get("interval", {})
+    interval_ms = (int(interval.get("hours", 0)) * 3600000 + int(interval.get("mins", 0)) * 60000 +
+                   int(interval.get("secs", 0)) * 1000 + int(interval.get("milliseconds", 0)))
+    plan = compile_action_plan(interval_ms, preset.get("hotkey"),
+                               repeat_mode=preset.get("repeat_mode", "until_stopped"),
+                               repeat_times=int(preset.get("repeat_count", 1) or 1),
+                               pos_mode=preset.get("pos_mode", "current"),
+                               x=preset.get("x"), y=preset.get("y"),
+                               hold_time=float(preset.get("hold_time", 50) or 0) / 1000)
+    if cycles is None:
+        cycles = plan.repeat_times or 1
+
+    macro = Macro()
+    t = 0
+    hold_ns = int(plan.hold_time * 1e9)
+    interval_ns = int(plan.interval * 1e9)
+    down, up = (EV_KEY_DOWN, EV_KEY_UP) if plan.kind == ACTION_KEY else (EV_BUTTON_DOWN, EV_BUTTON_UP)
+    x, y = plan.position if plan.position is not None else (0, 0)
+    for _ in range(cycles):
+        if plan.position is not None:
+            macro.append(t, EV_MOVE, x, y)
+        if plan.kind == ACTION_SCROLL:
+            macro.append(t, EV_SCROLL, *plan.scroll_delta)
+        elif plan.kind in (ACTION_MOUSE, ACTION_KEY):
+            for name in plan.press_seq:
+                macro.append(t, down, x, y, name)
+            for name in plan.release_seq:
+                macro.append(t + hold_ns, up, x, y, name)
+        t += hold_ns + interval_ns
+    return macro
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] not in ("to-binary", "to-json"):
+        print("usage: macro_file.py to-binary|to-json <input> <output>")
+        return 2
+    command, src, dst = argv
+    if command == "to-binary":
+        with open(src, "r") as f:
+            data = json.load(f)
+        macro = macro_from_json(data) if data.get("type") == "macro" else preset_to_macro(data)
+        save_macro(dst, macro)
+    else:
+        with MacroFile(src) as mf:
+            data = macro_to_json(mf.to_macro())
+        with open(dst, "w") as f:
+            json.dump(data, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
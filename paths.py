@@ -0,0 +1,158 @@
+# paths.py
+# Humanised mouse paths: cubic Bezier curves walked with a minimum-jerk speed profile, plus jitter.
+# Geometry is computed in one batch per path (NumPy when available) and cached per quantised
+# start/end pair; PathStream then feeds the points to a backend from the engine's deadline scheduler.
+
+from bisect import bisect_right
+from functools import lru_cache
+import math
+import random
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    np = None
+    _HAS_NUMPY = False
+
+# Points generated per second of movement (about one per display frame at 120 Hz)
+PATH_RATE = 120
+
+# Start/end points are snapped to this grid (px) for the cache key; the exact ends are blended back in
+PATH_QUANTUM = 8
+
+# Cached paths (quantised start, end and curve variant)
+PATH_CACHE_SIZE = 256
+
+# Distinct curve shapes kept per start/end pair, picked at random per move
+PATH_VARIANTS = 4
+
+# Moves shorter than this (px) are done as a plain jump
+SMOOTH_MIN_DISTANCE = 3
+
+# Default random deviation (px, standard deviation) added to the middle of a path
+PATH_JITTER = 1.0
+
+# Largest sideways bend of the curve as a fraction of the distance
+MAX_CURVATURE = 0.25
+
+
+def move_duration(distance):
+    """Seconds a hand-made move of distance px takes (Fitts' law shaped, 80 ms - ~0.6 s)."""
+    return 0.08 + 0.07 * math.log2(1 + distance / 20)
+
+
+@lru_cache(maxsize=64)
+def _profile(n):
+    """Minimum-jerk progress s(tau) = 10 tau^3 - 15 tau^4 + 6 tau^5 at n evenly spaced times."""
+    if _HAS_NUMPY:
+        tau = np.linspace(0.0, 1.0, n)
+        return tau, tau ** 3 * (10 - 15 * tau + 6 * tau ** 2)
+    tau = [i / (n - 1) for i in range(n)]
+    return tau, [t ** 3 * (10 - 15 * t + 6 * t * t) for t in tau]
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _base_path(x0, y0, x1, y1, n, variant):
+    """Float x/y coordinates of a curved path from (x0, y0) to (x1, y1) in n points (cached)."""
+    rnd = random.Random(hash((x0, y0, x1, y1, variant)))
+    dx, dy = x1 - x0, y1 - y0
+    # Control points a third and two thirds of the way, pushed sideways by a random bend
+    bend1 = rnd.uniform(-MAX_CURVATURE, MAX_CURVATURE)
+    bend2 = rnd.uniform(-MAX_CURVATURE, MAX_CURVATURE)
+    cx1, cy1 = x0 + dx / 3 - dy * bend1, y0 + dy / 3 + dx * bend1
+    cx2, cy2 = x0 + 2 * dx / 3 - dy * bend2, y0 + 2 * dy / 3 + dx * bend2
+    _, s = _profile(n)
+    if _HAS_NUMPY:
+        u = 1.0 - s
+        b0, b1, b2, b3 = u ** 3, 3 * u * u * s, 3 * u * s * s, s ** 3
+        return (b0 * x0 + b1 * cx1 + b2 * cx2 + b3 * x1,
+                b0 * y0 + b1 * cy1 + b2 * cy2 + b3 * y1)
+    xs, ys = [], []
+    for v in s:
+        u = 1.0 - v
+        b0, b1, b2, b3 = u ** 3, 3 * u * u * v, 3 * u * v * v, v ** 3
+        xs.append(b0 * x0 + b1 * cx1 + b2 * cx2 + b3 * x1)
+        ys.append(b0 * y0 + b1 * cy1 + b2 * cy2 + b3 * y1)
+    return xs, ys
+
+
+def _quantize(v):
+    return int(round(v / PATH_QUANTUM)) * PATH_QUANTUM
+
+
+def build_path(start, end, jitter=PATH_JITTER, rng=None, duration=None):
+    """
+    Path from start to end as (xs, ys, ts): integer screen coordinates and their offsets in seconds
+    from the start of the move. Returns None when the move is short enough to be a plain jump.
+    rng: random.Random used for the variant and jitter (module random by default).
+    """
+    x0, y0 = start
+    x1, y1 = end
+    qx0, qy0, qx1, qy1 = _quantize(x0), _quantize(y0), _quantize(x1), _quantize(y1)
+    distance = math.hypot(qx1 - qx0, qy1 - qy0)
+    if math.hypot(x1 - x0, y1 - y0) < SMOOTH_MIN_DISTANCE or distance == 0:
+        return None
+    rng = rng or random
+    if duration is None:
+        duration = move_duration(distance)
+    n = max(2, int(duration * PATH_RATE) + 1)
+    bx, by = _base_path(qx0, qy0, qx1, qy1, n, rng.randrange(PATH_VARIANTS))
+    tau, s = _profile(n)
+
+    # Shift the cached curve onto the exact ends, then add jitter that fades out at both ends
+    ex0, ey0, ex1, ey1 = x0 - qx0, y0 - qy0, x1 - qx1, y1 - qy1
+    if _HAS_NUMPY:
+        xs = bx + ex0 * (1 - s) + ex1 * s
+        ys = by + ey0 * (1 - s) + ey1 * s
+        if jitter:
+            gen = np.random.default_rng(rng.getrandbits(32))
+            taper = np.sin(np.pi * tau) * jitter
+            xs = xs + gen.standard_normal(n) * taper
+            ys = ys + gen.standard_normal(n) * taper
+        xs = np.rint(xs).astype(np.int64).tolist()
+        ys = np.rint(ys).astype(np.int64).tolist()
+        ts = (tau * duration).tolist()
+    else:
+        xs, ys, ts = [], [], []
+        gauss = rng.gauss
+        for i in range(n):
+            v = s[i]
+            wobble = math.sin(math.pi * tau[i]) * jitter if jitter else 0.0
+            xs.append(int(round(bx[i] + ex0 * (1 - v) + ex1 * v + (gauss(0, wobble) if wobble else 0))))
+            ys.append(int(round(by[i] + ey0 * (1 - v) + ey1 * v + (gauss(0, wobble) if wobble else 0))))
+            ts.append(tau[i] * duration)
+    xs[-1], ys[-1] = int(x1), int(y1)
+    return xs, ys, ts
+
+
+def path_cache_info():
+    """functools cache statistics for the path geometry cache."""
+    return _base_path.cache_info()
+
+
+class PathStream:
+    """
+    Plays a path built by build_path() against a backend. advance() moves the cursor to the newest
+    point that is due (points already overtaken are skipped, not replayed late) and returns the deadline
+    of the next point, or None once the path is finished.
+    """
+
+    def __init__(self, path, start):
+        self.xs, self.ys, self.ts = path
+        self.start = start
+        self._index = 0
+
+    @property
+    def end(self):
+        return self.start + self.ts[-1]
+
+    def advance(self, backend, now):
+        ts = self.ts
+        j = bisect_right(ts, now - self.start)
+        if j > self._index:
+            self._index = j
+            backend.move(self.xs[j - 1], self.ys[j - 1])
+        if self._index >= len(ts):
+            return None
+        return self.start + ts[self._index]
@@ -0,0 +1,322 @@
+# preset_library.py
+# Preset library in one local SQLite database: name/tag search, most recently used first, and an LRU
+# cache of parsed and validated presets so switching between them needs no file dialog or JSON parse.
+# Presets keep the JSON shape of the GUI's Save Preset files and can be imported/exported as such.
+
+import atexit
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from .presets import compile_preset, load_preset_file, preset_job
+except ImportError:
+    from presets import compile_preset, load_preset_file, preset_job
+
+# Parsed presets kept in memory
+CACHE_SIZE = 64
+
+# Last-used updates are kept in memory and written in one transaction at most this often (and before
+# search(), close() and flush()), so switching presets does not commit on every read
+TOUCH_FLUSH_INTERVAL = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    id        INTEGER PRIMARY KEY,
+    name      TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    key       TEXT,
+    data      TEXT NOT NULL,
+    created   REAL NOT NULL,
+    updated   REAL NOT NULL,
+    last_used REAL,
+    use_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS preset_tags (
+    preset_id INTEGER NOT NULL REFERENCES presets(id) ON DELETE CASCADE,
+    tag       TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (preset_id, tag)
+);
+CREATE INDEX IF NOT EXISTS preset_tags_tag ON preset_tags(tag);
+CREATE INDEX IF NOT EXISTS presets_last_used ON presets(last_used);
+"""
+
+# Created once older databases have their key column filled in (see PresetLibrary._migrate)
+_KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS presets_key ON presets(key)"
+
+# Most recently used first, never used ones last (alphabetically)
+_ORDER = "ORDER BY p.last_used IS NULL, p.last_used DESC, p.name"
+
+
+def default_library_path():
+    """presets.db next to last_settings.json."""
+    appdata = os.getenv("APPDATA") or os.path.expanduser("~")
+    folder = os.path.join(appdata, "AutoClicker")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, "presets.db")
+
+
+def _key(name):
+    """Lookup key for a preset name: names that casefold() to the same text are the same preset."""
+    return name.strip().casefold()
+
+
+def _clean_tags(tags):
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return sorted({t.strip() for t in tags or () if t and t.strip()}, key=str.lower)
+
+
+class PresetLibrary:
+    """
+    Named presets in a SQLite database. get() returns a fresh copy of the parsed preset; the parsed
+    and compiled form is cached (LRU, keyed by name and last update) so repeated switches skip both
+    JSON parsing and validation. Names are matched by their casefold() key, in the cache and in the
+    indexed key column alike. Safe to share between threads.
+    """
+
+    def __init__(self, path=None, cache_size=CACHE_SIZE):
+        self.path = path or default_library_path()
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()     # name key -> (updated, preset, compiled)
+        self._touched = {}              # preset id -> [last_used, uses] not written yet
+        self._touch_flushed = time.monotonic()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+        self._db.execute(_KEY_INDEX)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._db.close()
+            self._cache.clear()
+
+    def flush(self):
+        """Write pending last-used updates now."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touch_flushed = time.monotonic()
+            if touched:
+                with self._db:
+                    self._db.executemany(
+                        "UPDATE presets SET last_used = ?, use_count = use_count + ? WHERE id = ?",
+                        [(last_used, uses, preset_id) for preset_id, (last_used, uses) in touched.items()])
+
+    # --- Writing ---
+    def save(self, name, preset, tags=None):
+        """
+        Store preset under name, replacing any preset of that name (case-insensitive). It is compiled
+        first, so invalid presets raise ValueError and are never stored. tags=None keeps existing tags.
+        """
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("Preset name is empty")
+        compiled = compile_preset(preset)
+        data = json.dumps(preset, sort_keys=True)
+        key = _key(name)
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT id FROM presets WHERE key = ?", (key,)).fetchone()
+            if row:
+                preset_id = row[0]
+                self._db.execute("UPDATE presets SET name = ?, data = ?, updated = ? WHERE id = ?",
+                                 (name, data, now, preset_id))
+            else:
+                preset_id = self._db.execute(
+                    "INSERT INTO presets (name, key, data, created, updated) VALUES (?, ?, ?, ?, ?)",
+                    (name, key, data, now, now)).lastrowid
+            if tags is not None:
+                self._db.execute("DELETE FROM preset_tags WHERE preset_id = ?", (preset_id,))
+                self._db.executemany("INSERT INTO preset_tags (preset_id, tag) VALUES (?, ?)",
+                                     [(preset_id, t) for t in _clean_tags(tags)])
+            self._remember(key, now, json.loads(data), compiled)
+
+    def delete(self, name):
+        """Remove a preset. Returns True if it existed."""
+        with self._lock, self._db:
+            self._cache.pop(_key(name), None)
+            return self._db.execute("DELETE FROM presets WHERE key = ?", (_key(name),)).rowcount > 0
+
+    def rename(self, name, new_name):
+        new_name = (new_name or "").strip()
+        if not new_name:
+            raise ValueError("Preset name is empty")
+        with self._lock, self._db:
+            try:
+                changed = self._db.execute("UPDATE presets SET name = ?, key = ? WHERE key = ?",
+                                           (new_name, _key(new_name), _key(name))).rowcount
+            except sqlite3.IntegrityError:
+                raise ValueError(f"A preset named {new_name!r} already exists")
+            self._cache.pop(_key(name), None)
+            if not changed:
+                raise KeyError(name)
+
+    def set_tags(self, name, tags):
+        with self._lock, self._db:
+            preset_id = self._id(name)
+            self._db.execute("DELETE FROM preset_tags WHERE preset_id = ?", (preset_id,))
+            self._db.executemany("INSERT INTO preset_tags (preset_id, tag) VALUES (?, ?)",
+                                 [(preset_id, t) for t in _clean_tags(tags)])
+
+    # --- Reading ---
+    def get(self, name, touch=True):
+        """Return a copy of the named preset (KeyError if missing). touch marks it as just used."""
+        return copy.deepcopy(self._load(name, touch)[1])
+
+    def job(self, name, on_finish=None, touch=True):
+        """Build the preset's EngineJob from the cached compiled form (see presets.preset_job)."""
+        _, preset, compiled = self._load(name, touch)
+        return preset_job(preset, on_finish, compiled)
+
+    def search(self, text="", tag=None, limit=None):
+        """
+        Presets whose name contains text (case-insensitive) and that carry tag, most recently used
+        first. Returns [{"name", "tags", "last_used", "use_count"}].
+        """
+        sql = "SELECT p.id, p.name, p.last_used, p.use_count FROM presets p"
+        args = []
+        if tag:
+            sql += " JOIN preset_tags t ON t.preset_id = p.id AND t.tag = ?"
+            args.append(tag.strip())
+        if text:
+            sql += " WHERE p.name LIKE ? ESCAPE '\\'"
+            args.append("%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        sql += " " + _ORDER
+        if limit:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        with self._lock:
+            self.flush()
+            rows = self._db.execute(sql, args).fetchall()
+            tags = self._tags_for([r[0] for r in rows])
+        return [{"name": name, "tags": tags.get(pid, []), "last_used": last_used, "use_count": count}
+                for pid, name, last_used, count in rows]
+
+    def names(self, text="", tag=None, limit=None):
+        return [r["name"] for r in self.search(text, tag, limit)]
+
+    def recent(self, limit=10):
+        return self.names(limit=limit)
+
+    def all_tags(self):
+        with self._lock:
+            return [r[0] for r in self._db.execute(
+                "SELECT DISTINCT tag FROM preset_tags ORDER BY tag COLLATE NOCASE")]
+
+    def __contains__(self, name):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM presets WHERE key = ?", (_key(name),)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM presets").fetchone()[0]
+
+    # --- JSON files ---
+    def import_file(self, path, name=None, tags=None):
+        """Import a Save Preset JSON file (name defaults to the file name). Returns the name used."""
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        self.save(name, load_preset_file(path), tags)
+        return name
+
+    def import_folder(self, folder, tags=None):
+        """Import every *.json preset in folder. Returns (imported names, {file: error})."""
+        imported, errors = [], {}
+        for entry in sorted(os.listdir(folder)):
+            if not entry.lower().endswith(".json"):
+                continue
+            path = os.path.join(folder, entry)
+            try:
+                imported.append(self.import_file(path, tags=tags))
+            except (OSError, ValueError) as e:
+                errors[path] = str(e)
+        return imported, errors
+
+    def export_file(self, name, path):
+        """Write the named preset to path in the Save Preset JSON shape."""
+        with open(path, "w") as f:
+            json.dump(self.get(name, touch=False), f, indent=4)
+
+    # --- Internals ---
+    def _migrate(self):
+        """Fill in the key column of databases created before it existed."""
+        if "key" not in [r[1] for r in self._db.execute("PRAGMA table_info(presets)")]:
+            self._db.execute("ALTER TABLE presets ADD COLUMN key TEXT")
+        seen = {k for (k,) in self._db.execute("SELECT key FROM presets WHERE key IS NOT NULL")}
+        for preset_id, name in self._db.execute("SELECT id, name FROM presets WHERE key IS NULL ORDER BY id").fetchall():
+            key = _key(name)
+            if key in seen:
+                # Only told apart by case rules NOCASE ignores (e.g. "Straße" / "STRASSE"): keep both
+                name = f"{name} ({preset_id})"
+                key = _key(name)
+            seen.add(key)
+            self._db.execute("UPDATE presets SET name = ?, key = ? WHERE id = ?", (name, key, preset_id))
+
+    def _id(self, name):
+        row = self._db.execute("SELECT id FROM presets WHERE key = ?", (_key(name),)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row[0]
+
+    def _tags_for(self, ids):
+        tags = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for pid, tag in self._db.execute(
+                    f"SELECT preset_id, tag FROM preset_tags WHERE preset_id IN ({marks}) "
+                    "ORDER BY tag COLLATE NOCASE", chunk):
+                tags.setdefault(pid, []).append(tag)
+        return tags
+
+    def _load(self, name, touch):
+        """(updated, preset, compiled) for name, from the cache when it is current."""
+        key = _key(name)
+        with self._lock:
+            row = self._db.execute("SELECT id, updated FROM presets WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._cache.pop(key, None)
+                raise KeyError(name)
+            preset_id, updated = row
+            entry = self._cache.get(key)
+            if entry is None or entry[0] != updated:
+                data = self._db.execute("SELECT data FROM presets WHERE id = ?", (preset_id,)).fetchone()[0]
+                preset = json.loads(data)
+                entry = self._remember(key, updated, preset, compile_preset(preset))
+            else:
+                self._cache.move_to_end(key)
+            if touch:
+                touched = self._touched.setdefault(preset_id, [0.0, 0])
+                touched[0] = time.time()
+                touched[1] += 1
+                if time.monotonic() - self._touch_flushed >= TOUCH_FLUSH_INTERVAL:
+                    self.flush()
+            return entry
+
+    def _remember(self, key, updated, preset, compiled):
+        entry = (updated, preset, compiled)
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_library():
+    """The shared PresetLibrary at default_library_path(), opened on first use."""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = PresetLibrary()
+            atexit.register(_library.flush)
+        return _library
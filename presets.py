@@ -0,0 +1,123 @@
+# presets.py
+# Preset files (the JSON written by the GUI's Save Preset / last settings) turned into engine jobs.
+# Imports nothing GUI related, so the CLI and other headless front ends can use it.
+
+import json
+
+try:
+    from .actions import compile_action_plan, TIMING_INTERVAL
+    from .engine import ClickJob
+    from .sequence import ClickSequence, SequenceJob, compile_sequence
+    from .script import Script, ScriptJob, compile_script
+except ImportError:
+    from actions import compile_action_plan, TIMING_INTERVAL
+    from engine import ClickJob
+    from sequence import ClickSequence, SequenceJob, compile_sequence
+    from script import Script, ScriptJob, compile_script
+
+# Interval fields as stored by the GUI, in milliseconds per unit
+INTERVAL_UNITS = (("hours", 3600000), ("mins", 60000), ("secs", 1000), ("milliseconds", 1))
+
+
+def load_preset_file(path):
+    """Read a preset JSON file. Raises ValueError if it is not a preset object."""
+    with open(path, "r") as f:
+        preset = json.load(f)
+    if not isinstance(preset, dict):
+        raise ValueError(f"{path} does not contain a preset object")
+    return preset
+
+
+def preset_interval_ms(preset):
+    """Total interval in milliseconds: "interval_ms", or the GUI's {"hours", "mins", "secs", "milliseconds"} dict."""
+    if "interval_ms" in preset:
+        return max(0, int(float(preset["interval_ms"])))
+    interval = preset.get("interval") or {}
+    try:
+        return sum(int(interval.get(unit, 0) or 0) * ms for unit, ms in INTERVAL_UNITS)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid interval in preset: {interval!r}")
+
+
+def preset_plan(preset):
+    """Compile a preset into an ActionPlan (hold_time is stored in ms, as in the GUI)."""
+    repeat_mode = preset.get("repeat_mode", "until_stopped")
+    try:
+        repeat_times = int(preset.get("repeat_count", 1) or 1)
+        hold_time = float(preset.get("hold_time", 50) or 0) / 1000
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid preset value: {e}")
+    return compile_action_plan(
+        preset_interval_ms(preset),
+        preset.get("hotkey"),
+        repeat_mode,
+        repeat_times,
+        preset.get("pos_mode", "current"),
+        preset.get("x"),
+        preset.get("y"),
+        preset.get("hold_mode", "press"),
+        hold_time,
+        preset.get("timing", TIMING_INTERVAL),
+        smooth_move=preset.get("smooth_move", False),
+        interval_jitter=preset.get("interval_jitter"),
+        position_jitter=preset.get("position_jitter"),
+        seed=preset.get("seed"),
+    )
+
+
+def _make_trigger(spec):
+    # Imported on first use: triggers pulls in NumPy when it is installed
+    try:
+        from .triggers import make_trigger
+    except ImportError:
+        from triggers import make_trigger
+    return make_trigger(spec)
+
+
+def _trigger_job(plan, trigger, on_finish):
+    try:
+        from .triggers import TriggerClickJob
+    except ImportError:
+        from triggers import TriggerClickJob
+    return TriggerClickJob(plan, trigger, on_finish)
+
+
+def compile_preset(preset):
+    """
+    Validate a preset by compiling it: a Script when it has a "script" (text or list of lines, see
+    script.py), a ClickSequence when it has a "sequence" list of points (see sequence.compile_sequence),
+    otherwise an ActionPlan (a "trigger" dict is checked too).
+    Raises ValueError if it is invalid.
+    """
+    if not isinstance(preset, dict):
+        raise ValueError("Preset is not an object")
+    if preset.get("script"):
+        return compile_script(preset["script"])
+    points = preset.get("sequence")
+    if points:
+        return compile_sequence(points)
+    if preset.get("trigger"):
+        _make_trigger(preset["trigger"])
+    return preset_plan(preset)
+
+
+def preset_job(preset, on_finish=None, compiled=None):
+    """
+    Build the EngineJob a preset describes: a ScriptJob when it has a "script", a SequenceJob when it
+    has a "sequence" list of points, otherwise a ClickJob (a triggers.TriggerClickJob when it has a
+    "trigger" dict). compiled is compile_preset(preset), if the caller already has it.
+    Submit the job with ClickerEngine.submit_job().
+    """
+    if compiled is None:
+        compiled = compile_preset(preset)
+    repeat = None
+    if preset.get("repeat_mode") == "repeat":
+        repeat = int(preset.get("repeat_count", 1) or 1)
+    if isinstance(compiled, Script):
+        return ScriptJob(compiled, repeat, on_finish)
+    if isinstance(compiled, ClickSequence):
+        return SequenceJob(compiled, repeat, preset.get("timing", TIMING_INTERVAL),
+                           on_finish, smooth_move=preset.get("smooth_move", False))
+    if preset.get("trigger"):
+        return _trigger_job(compiled, _make_trigger(preset["trigger"]), on_finish)
+    return ClickJob(compiled, on_finish)
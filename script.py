@@ -0,0 +1,562 @@
+# script.py
+# Click scripts: a small line-based macro language, parsed and validated once and compiled into a flat
+# instruction array that ScriptJob interprets on the click engine.
+#
+#   # farm loop
+#   sub collect
+#       click left 640 400
+#       wait 150
+#       key ctrl+s
+#   end
+#
+#   loop 20
+#       click right 1200 640 hold 80
+#       wait 500
+#       if pixel 1200 640 #2ecc40 12
+#           call collect
+#       else
+#           move 100 100
+#       end
+#   end
+#
+# Commands: click [left|right|middle|x1|x2] [X Y] [hold MS], key COMBO [hold MS], move X Y, wait MS,
+# loop [N] ... end (no N = forever), if pixel X Y #RRGGBB [TOLERANCE] ... [else ...] end,
+# sub NAME ... end (top level only) and call NAME. "#" starts a comment, except in the colour of an if.
+
+import hashlib
+from array import array
+from collections import OrderedDict
+
+try:
+    from .actions import canonical_key
+    from .engine import EngineJob, PHASE_STEP
+    from .timing import perf_counter
+except ImportError:
+    from actions import canonical_key
+    from engine import EngineJob, PHASE_STEP
+    from timing import perf_counter
+
+# Opcodes. Operands are a and b (see Script); jump targets are instruction indexes.
+OP_END = 0             # end of one pass over the main body
+OP_WAIT = 1            # a = microseconds, measured from the step's deadline
+OP_PRESS_BUTTON = 2    # a = button index
+OP_RELEASE_BUTTON = 3  # a = button index (counts one action)
+OP_PRESS_KEYS = 4      # a = combo index
+OP_RELEASE_KEYS = 5    # a = combo index (counts one action)
+OP_MOVE = 6            # a = x, b = y
+OP_LOOP_INIT = 7       # a = counter slot, b = count
+OP_LOOP_NEXT = 8       # a = counter slot, b = first instruction of the body
+OP_JUMP = 9            # a = target
+OP_IF_PIXEL = 10       # a = probe index, b = target when the pixel does not match
+OP_CALL = 11           # a = first instruction of the subroutine
+OP_RETURN = 12
+
+BUTTONS = ("left", "right", "middle", "x1", "x2")
+
+# Instructions run back to back before the interpreter yields to the engine; keeps a script without
+# waits from starving other jobs
+MAX_STEP_INSTRUCTIONS = 10000
+
+# Instructions the stats estimate (Script.interval) dry-runs at most
+ESTIMATE_INSTRUCTIONS = 100000
+
+SCRIPT_CACHE_SIZE = 32
+
+# Token index of the colour in "if pixel X Y #RRGGBB"; a "#" there does not start a comment
+_COLOUR_TOKEN = 4
+
+
+class ScriptError(ValueError):
+    """Raised for scripts that do not parse or validate; the message starts with the line number."""
+
+    def __init__(self, line, message):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+class Script:
+    """
+    A compiled script. Instruction i is op[i] ('B' array) with operands a[i] and b[i] ('q' arrays);
+    line[i] is its source line. buttons and combos are the button names and key name tuples the
+    press/release instructions index, probes the (x, y, (r, g, b), tolerance) of each if-pixel.
+    Scripts are immutable once compiled, so one Script can back any number of jobs.
+    """
+
+    def __init__(self, digest=None):
+        self.digest = digest
+        self.op = array("B")
+        self.a = array("q")
+        self.b = array("q")
+        self.line = array("I")
+        self.buttons = []
+        self.combos = []
+        self.probes = []
+        self.loop_slots = 0
+        self.subs = {}        # name -> first instruction
+        self._interval = None
+
+    def __len__(self):
+        return len(self.op)
+
+    @property
+    def empty(self):
+        """True when the main body does nothing (only its OP_END)."""
+        return self.op[0] == OP_END
+
+    @property
+    def interval(self):
+        """
+        Nominal seconds of waiting per action over one pass, assuming every if-pixel matches (used for
+        stats). Estimated by a dry run of up to ESTIMATE_INSTRUCTIONS instructions, so an endless loop
+        is measured over its first iterations.
+        """
+        if self._interval is None:
+            ops, arg_a, arg_b = self.op, self.a, self.b
+            counters = [0] * self.loop_slots
+            stack = []
+            pc = waited = actions = 0
+            for _ in range(ESTIMATE_INSTRUCTIONS):
+                op = ops[pc]
+                a = arg_a[pc]
+                pc += 1
+                if op == OP_END:
+                    break
+                if op == OP_WAIT:
+                    waited += a
+                elif op == OP_RELEASE_BUTTON or op == OP_RELEASE_KEYS:
+                    actions += 1
+                elif op == OP_LOOP_INIT:
+                    counters[a] = arg_b[pc - 1]
+                elif op == OP_LOOP_NEXT:
+                    counters[a] -= 1
+                    if counters[a] > 0:
+                        pc = arg_b[pc - 1]
+                elif op == OP_JUMP:
+                    pc = a
+                elif op == OP_CALL:
+                    stack.append(pc)
+                    pc = a
+                elif op == OP_RETURN:
+                    pc = stack.pop()
+            self._interval = waited * 1e-6 / actions if actions else 0.0
+        return self._interval
+
+    def emit(self, op, line, a=0, b=0):
+        """Append an instruction and return its index."""
+        self.op.append(op)
+        self.a.append(a)
+        self.b.append(b)
+        self.line.append(line)
+        return len(self.op) - 1
+
+    def _index(self, table, value):
+        try:
+            return table.index(value)
+        except ValueError:
+            table.append(value)
+            return len(table) - 1
+
+
+# --- Parsing ---
+def _is_colour(token):
+    if len(token) != 7 or token[0] != "#":
+        return False
+    try:
+        int(token[1:], 16)
+        return True
+    except ValueError:
+        return False
+
+
+def _tokens(text):
+    """
+    Split a line into tokens, dropping a trailing comment. The colour of "if pixel X Y #RRGGBB" is kept
+    whatever it looks like, so a malformed one is reported as an invalid colour.
+    """
+    tokens = text.split()
+    colour = _COLOUR_TOKEN if len(tokens) > 1 and tokens[0].lower() == "if" and tokens[1] == "pixel" else None
+    for i, token in enumerate(tokens):
+        if token.startswith("#") and i != colour:
+            return tokens[:i]
+    return tokens
+
+
+def _int(token, n, what):
+    try:
+        return int(token)
+    except ValueError:
+        raise ScriptError(n, f"{what} must be an integer, got {token!r}")
+
+
+def _ms(token, n):
+    try:
+        ms = float(token)
+    except ValueError:
+        raise ScriptError(n, f"time must be a number of milliseconds, got {token!r}")
+    if not 0 <= ms < 1e9:
+        raise ScriptError(n, f"time out of range: {token}")
+    return int(round(ms * 1000))
+
+
+def _hold(args, n):
+    """Split a trailing "hold MS" off args. Returns (args, microseconds or None)."""
+    if len(args) >= 2 and args[-2] == "hold":
+        return args[:-2], _ms(args[-1], n)
+    if "hold" in args:
+        raise ScriptError(n, "hold needs a time in milliseconds")
+    return args, None
+
+
+class _Compiler:
+    """Single pass over the lines; blocks are tracked on a stack and their jumps patched at end/else."""
+
+    def __init__(self, script):
+        self.script = script
+        self.blocks = []          # (kind, line, data)
+        self.sub = None           # name of the subroutine being compiled
+        self.calls = {}           # caller (None = main) -> [(name, line)]
+        self.pending_calls = []   # (instruction, name, line)
+        self.sub_bodies = []      # (name, line, lines) compiled after the main body
+
+    def compile(self, lines):
+        main = []
+        i = 0
+        while i < len(lines):
+            n, tokens = lines[i]
+            if tokens[0] == "sub":
+                if len(tokens) != 2:
+                    raise ScriptError(n, "usage: sub NAME")
+                name = tokens[1]
+                if any(body[0] == name for body in self.sub_bodies):
+                    raise ScriptError(n, f"subroutine {name!r} is defined twice")
+                depth = 1
+                body = []
+                i += 1
+                while i < len(lines):
+                    word = lines[i][1][0]
+                    if word == "sub":
+                        raise ScriptError(lines[i][0], "sub cannot be nested")
+                    if word in ("loop", "if"):
+                        depth += 1
+                    elif word == "end":
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    body.append(lines[i])
+                    i += 1
+                else:
+                    raise ScriptError(n, f"sub {name} has no end")
+                self.sub_bodies.append((name, n, body))
+            else:
+                main.append(lines[i])
+            i += 1
+
+        self.block(main, None)
+        self.script.emit(OP_END, lines[-1][0] if lines else 0)
+        for name, n, body in self.sub_bodies:
+            self.script.subs[name] = len(self.script)
+            self.block(body, name)
+            self.script.emit(OP_RETURN, n)
+
+        for index, name, n in self.pending_calls:
+            if name not in self.script.subs:
+                raise ScriptError(n, f"call to undefined subroutine {name!r}")
+            self.script.a[index] = self.script.subs[name]
+        self._check_recursion()
+
+    def block(self, lines, sub):
+        self.sub = sub
+        self.calls.setdefault(sub, [])
+        for n, tokens in lines:
+            self.statement(n, tokens[0], tokens[1:])
+        if self.blocks:
+            kind, n, _ = self.blocks[-1]
+            raise ScriptError(n, f"{kind} has no end")
+
+    def statement(self, n, word, args):
+        script = self.script
+        if word == "click":
+            args, hold = _hold(args, n)
+            button = "left"
+            if args and not args[0].lstrip("-").isdigit():
+                button = args[0].lower()
+                args = args[1:]
+            if button not in BUTTONS:
+                raise ScriptError(n, f"unknown button {button!r} (use {', '.join(BUTTONS)})")
+            if len(args) == 2:
+                script.emit(OP_MOVE, n, _int(args[0], n, "x"), _int(args[1], n, "y"))
+            elif args:
+                raise ScriptError(n, "usage: click [BUTTON] [X Y] [hold MS]")
+            index = script._index(script.buttons, button)
+            script.emit(OP_PRESS_BUTTON, n, index)
+            if hold:
+                script.emit(OP_WAIT, n, hold)
+            script.emit(OP_RELEASE_BUTTON, n, index)
+        elif word == "key":
+            args, hold = _hold(args, n)
+            names = tuple(canonical_key(part) for part in "".join(args).split("+") if part)
+            if not names:
+                raise ScriptError(n, "usage: key COMBO [hold MS], e.g. key ctrl+c")
+            index = script._index(script.combos, names)
+            script.emit(OP_PRESS_KEYS, n, index)
+            if hold:
+                script.emit(OP_WAIT, n, hold)
+            script.emit(OP_RELEASE_KEYS, n, index)
+        elif word == "move":
+            if len(args) != 2:
+                raise ScriptError(n, "usage: move X Y")
+            script.emit(OP_MOVE, n, _int(args[0], n, "x"), _int(args[1], n, "y"))
+        elif word == "wait":
+            if len(args) != 1:
+                raise ScriptError(n, "usage: wait MS")
+            script.emit(OP_WAIT, n, _ms(args[0], n))
+        elif word == "loop":
+            if len(args) > 1:
+                raise ScriptError(n, "usage: loop [COUNT]")
+            if args:
+                count = _int(args[0], n, "loop count")
+                if count < 1:
+                    raise ScriptError(n, "loop count must be at least 1")
+                slot = script.loop_slots
+                script.loop_slots += 1
+                script.emit(OP_LOOP_INIT, n, slot, count)
+                self.blocks.append(("loop", n, (slot, len(script))))
+            else:
+                self.blocks.append(("loop", n, (None, len(script))))
+        elif word == "if":
+            if len(args) not in (4, 5) or args[0] != "pixel":
+                raise ScriptError(n, "usage: if pixel X Y #RRGGBB [TOLERANCE]")
+            if not _is_colour(args[3]):
+                raise ScriptError(n, f"invalid colour {args[3]!r}, expected #RRGGBB")
+            colour = tuple(int(args[3][i:i + 2], 16) for i in (1, 3, 5))
+            tolerance = _int(args[4], n, "tolerance") if len(args) == 5 else 0
+            if not 0 <= tolerance <= 255:
+                raise ScriptError(n, "tolerance must be between 0 and 255")
+            probe = script._index(script.probes, (_int(args[1], n, "x"), _int(args[2], n, "y"), colour, tolerance))
+            self.blocks.append(("if", n, [script.emit(OP_IF_PIXEL, n, probe), None]))
+        elif word == "else":
+            if args or not self.blocks or self.blocks[-1][0] != "if" or self.blocks[-1][2][1] is not None:
+                raise ScriptError(n, "else without if")
+            jumps = self.blocks[-1][2]
+            jumps[1] = script.emit(OP_JUMP, n)
+            script.b[jumps[0]] = len(script)
+        elif word == "end":
+            if args or not self.blocks:
+                raise ScriptError(n, "end without loop, if or sub")
+            kind, _, data = self.blocks.pop()
+            if kind == "loop":
+                slot, body = data
+                if body == len(script):
+                    raise ScriptError(n, "empty loop")
+                if slot is None:
+                    script.emit(OP_JUMP, n, body)
+                else:
+                    script.emit(OP_LOOP_NEXT, n, slot, body)
+            else:
+                test, skip = data
+                if skip is None:
+                    script.b[test] = len(script)
+                else:
+                    script.a[skip] = len(script)
+        elif word == "call":
+            if len(args) != 1:
+                raise ScriptError(n, "usage: call NAME")
+            self.pending_calls.append((script.emit(OP_CALL, n), args[0], n))
+            self.calls[self.sub].append((args[0], n))
+        elif word == "sub":
+            raise ScriptError(n, "sub cannot be nested")
+        else:
+            raise ScriptError(n, f"unknown command {word!r}")
+
+    def _check_recursion(self):
+        # Loop counters live in fixed slots, so a subroutine must never be active twice
+        done = set()
+
+        def visit(name, active):
+            for callee, n in self.calls.get(name, ()):
+                if callee in active:
+                    raise ScriptError(n, f"recursive call to {callee!r}")
+                if callee not in done:
+                    visit(callee, active | {callee})
+            done.add(name)
+
+        visit(None, frozenset())
+        for name in self.script.subs:
+            visit(name, frozenset((name,)))
+
+
+def parse_script(text, digest=None):
+    """Parse and compile script text into a Script. Raises ScriptError."""
+    lines = []
+    for n, line in enumerate(text.splitlines(), 1):
+        tokens = _tokens(line)
+        if tokens:
+            tokens[0] = tokens[0].lower()
+            lines.append((n, tokens))
+    script = Script(digest)
+    _Compiler(script).compile(lines)
+    return script
+
+
+# --- Cache ---
+_cache = OrderedDict()   # sha1 of the text -> Script, least recently used first
+
+
+def compile_script(text):
+    """
+    Compile script text (a string or a list of lines), reusing the compiled Script when the same
+    text was compiled before; the cache is keyed by a hash of the content. Raises ScriptError.
+    """
+    if not isinstance(text, str):
+        text = "\n".join(text)
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    script = _cache.get(digest)
+    if script is not None:
+        _cache.move_to_end(digest)
+        return script
+    script = parse_script(text, digest)
+    _cache[digest] = script
+    if len(_cache) > SCRIPT_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return script
+
+
+def load_script(path):
+    """Read and compile a script file (cached by content, see compile_script). Raises OSError/ScriptError."""
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_script(f.read())
+
+
+class ScriptJob(EngineJob):
+    """
+    Runs a Script on the click engine. Each step interprets instructions back to back until a wait,
+    which becomes the next deadline (counted from this step's deadline, so waits do not drift).
+    repeat: number of passes over the main body, None = until stopped.
+    if-pixel probes are screen triggers (triggers.PixelTrigger) created on first use.
+    """
+
+    def __init__(self, script, repeat=1, on_finish=None, backend=None, capture=None):
+        super().__init__(on_finish, backend)
+        self.script = script
+        self.repeat = repeat
+        self.loops = 0
+        self.interval = self.telemetry.interval = script.interval
+        self.capture = capture
+        self._pc = 0
+        self._counters = [0] * script.loop_slots
+        self._stack = []
+        self._buttons = ()
+        self._combos = ()
+        self._probes = [None] * len(script.probes)
+        self._held_buttons = set()
+        self._held_keys = set()
+
+    def _bind(self, backend):
+        self._buttons = tuple(backend.resolve_button(name) for name in self.script.buttons)
+        self._combos = tuple(tuple(backend.resolve_key(name) for name in combo) for combo in self.script.combos)
+        super()._bind(backend)
+
+    def _probe(self, index):
+        try:
+            from .triggers import PixelTrigger
+        except ImportError:
+            from triggers import PixelTrigger
+        x, y, colour, tolerance = self.script.probes[index]
+        trigger = self._probes[index] = PixelTrigger((x, y), colour, tolerance, capture=self.capture)
+        return trigger
+
+    def _step(self, phase, deadline):
+        script = self.script
+        if script.empty:
+            return None
+        ops, arg_a, arg_b = script.op, script.a, script.b
+        backend = self.backend
+        counters, stack = self._counters, self._stack
+        pc = self._pc
+        now = perf_counter()
+        self.telemetry.record(now, now - deadline)
+
+        try:
+            for _ in range(MAX_STEP_INSTRUCTIONS):
+                op = ops[pc]
+                a = arg_a[pc]
+                pc += 1
+                if op == OP_WAIT:
+                    self._pc = pc
+                    due = deadline + a * 1e-6
+                    now = perf_counter()
+                    # Behind schedule: continue from now instead of bursting to catch up
+                    return (due if due > now else now, PHASE_STEP)
+                elif op == OP_PRESS_BUTTON:
+                    button = self._buttons[a]
+                    backend.press_button(button)
+                    self._held_buttons.add(button)
+                elif op == OP_RELEASE_BUTTON:
+                    button = self._buttons[a]
+                    backend.release_button(button)
+                    self._held_buttons.discard(button)
+                    self.actions += 1
+                    self.last = perf_counter()
+                elif op == OP_MOVE:
+                    backend.move(a, arg_b[pc - 1])
+                elif op == OP_PRESS_KEYS:
+                    for key in self._combos[a]:
+                        backend.press_key(key)
+                        self._held_keys.add(key)
+                elif op == OP_RELEASE_KEYS:
+                    for key in reversed(self._combos[a]):
+                        backend.release_key(key)
+                        self._held_keys.discard(key)
+                    self.actions += 1
+                    self.last = perf_counter()
+                elif op == OP_LOOP_NEXT:
+                    counters[a] -= 1
+                    if counters[a] > 0:
+                        pc = arg_b[pc - 1]
+                elif op == OP_LOOP_INIT:
+                    counters[a] = arg_b[pc - 1]
+                elif op == OP_JUMP:
+                    pc = a
+                elif op == OP_IF_PIXEL:
+                    probe = self._probes[a] or self._probe(a)
+                    if probe.check() is None:
+                        pc = arg_b[pc - 1]
+                elif op == OP_CALL:
+                    stack.append(pc)
+                    pc = a
+                elif op == OP_RETURN:
+                    pc = stack.pop()
+                else:   # OP_END
+                    self.loops += 1
+                    if self.repeat is not None and self.loops >= self.repeat:
+                        self._pc = pc - 1
+                        return None
+                    pc = 0
+        except Exception as e:
+            print(f"Script failed at line {script.line[pc - 1]}: {e}")
+            self._pc = pc - 1
+            return None
+        # Instruction budget used up without a wait: yield to other jobs, continue right away
+        self._pc = pc
+        return (perf_counter(), PHASE_STEP)
+
+    def _release_held(self):
+        backend = self.backend
+        for key in self._held_keys:
+            try:
+                backend.release_key(key)
+            except Exception:
+                pass
+        for button in self._held_buttons:
+            try:
+                backend.release_button(button)
+            except Exception:
+                pass
+        self._held_keys.clear()
+        self._held_buttons.clear()
+        for probe in self._probes:
+            if probe is not None:
+                probe.close()
+
+    def __repr__(self):
+        return f"<ScriptJob {self.id} {self.state} instructions={len(self.script)} loops={self.loops}>"
@@ -0,0 +1,216 @@
+# sequence.py
+# Multi-point click sequences: N target points, each with its own action, hold time and delay,
+# compiled once into parallel typed arrays that the engine walks by index
+
+from array import array
+
+try:
+    from .actions import compile_action_plan, ACTION_NONE, ACTION_SCROLL, ACTION_KEY, TIMING_DEADLINE
+    from .engine import EngineJob, PHASE_STEP, PHASE_MOVE
+    from .timing import perf_counter
+except ImportError:
+    from actions import compile_action_plan, ACTION_NONE, ACTION_SCROLL, ACTION_KEY, TIMING_DEADLINE
+    from engine import EngineJob, PHASE_STEP, PHASE_MOVE
+    from timing import perf_counter
+
+# Defaults for points that do not set their own values
+DEFAULT_ACTION = "Mouse: Left"
+DEFAULT_HOLD_MS = 50
+DEFAULT_DELAY_MS = 100
+
+_PHASE_PRESS = PHASE_STEP
+_PHASE_RELEASE = 1
+
+
+class ClickSequence:
+    """
+    A compiled sequence. Point i is x[i], y[i] ('i' arrays), actions[action[i]] ('H' array index into
+    the table of distinct actions), hold[i] and delay[i] ('d' arrays, seconds).
+    Each action table entry is (kind, press_seq, scroll_delta) as in actions.ActionPlan.
+    """
+
+    def __init__(self):
+        self.x = array("i")
+        self.y = array("i")
+        self.action = array("H")
+        self.hold = array("d")
+        self.delay = array("d")
+        self.actions = []
+        self._action_ids = {}
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def cycle_time(self):
+        """Nominal seconds for one pass over every point."""
+        return sum(self.hold) + sum(self.delay)
+
+    def action_id(self, hotkey):
+        """Index of the compiled action for a hotkey display string, compiling it on first use."""
+        action_id = self._action_ids.get(hotkey)
+        if action_id is None:
+            plan = compile_action_plan(0, hotkey)
+            action_id = self._action_ids[hotkey] = len(self.actions)
+            self.actions.append((plan.kind, plan.press_seq, plan.scroll_delta))
+        return action_id
+
+    def append(self, x, y, action=DEFAULT_ACTION, hold_ms=DEFAULT_HOLD_MS, delay_ms=DEFAULT_DELAY_MS):
+        self.x.append(int(x))
+        self.y.append(int(y))
+        self.action.append(self.action_id(action))
+        self.hold.append(max(0.0, float(hold_ms) / 1000))
+        self.delay.append(max(0.0, float(delay_ms) / 1000))
+
+    def points(self):
+        """Iterate points as dicts in the format compile_sequence() accepts (for presets)."""
+        names = {action_id: hotkey for hotkey, action_id in self._action_ids.items()}
+        for i in range(len(self.x)):
+            yield {"x": self.x[i], "y": self.y[i], "action": names[self.action[i]],
+                   "hold_ms": self.hold[i] * 1000, "delay_ms": self.delay[i] * 1000}
+
+
+def compile_sequence(points, action=DEFAULT_ACTION, hold_ms=DEFAULT_HOLD_MS, delay_ms=DEFAULT_DELAY_MS):
+    """
+    Compile points into a ClickSequence. Each point is a dict with x, y and optional action (hotkey
+    display string such as "Mouse: Right" or "Key: Ctrl + c"), hold_ms and delay_ms (wait after the
+    action before the next point), or a tuple (x, y[, action[, hold_ms[, delay_ms]]]).
+    The remaining arguments are the defaults for points that leave a value out.
+    """
+    seq = ClickSequence()
+    for n, point in enumerate(points):
+        try:
+            if isinstance(point, dict):
+                seq.append(point["x"], point["y"], point.get("action") or action,
+                           point.get("hold_ms", hold_ms), point.get("delay_ms", delay_ms))
+            else:
+                values = tuple(point) + (action, hold_ms, delay_ms)[len(point) - 2:]
+                seq.append(*values[:5])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid sequence point {n}: {point!r} ({e})")
+    return seq
+
+
+class SequenceJob(EngineJob):
+    """
+    Runs a ClickSequence on the click engine: move to point i, perform its action, release after its
+    hold time, wait its delay, continue with point i + 1. Steps only index the precompiled arrays and a
+    per-job table of resolved backend calls.
+    repeat: number of passes over the sequence, None = until stopped.
+    timing: TIMING_DEADLINE schedules every point from the previous point's deadline (no drift over
+    long runs); otherwise each delay starts when the previous action finished.
+    smooth_move: glide between points along humanised paths (see paths.py) instead of jumping; the
+    travel time comes on top of the point's delay.
+    """
+
+    def __init__(self, sequence, repeat=None, timing=None, on_finish=None, backend=None, smooth_move=False):
+        super().__init__(on_finish, backend)
+        self.sequence = sequence
+        self.repeat = repeat
+        self.smooth_move = smooth_move
+        self.deadline_mode = self.precise = timing == TIMING_DEADLINE
+        self.loops = 0
+        if len(sequence):
+            self.interval = self.telemetry.interval = sequence.cycle_time / len(sequence)
+        self._index = 0
+        self._ops = ()            # per action id: (kind, press, release, press objs, release objs, scroll delta)
+        self._pressed = None      # (release, objs) while an action is held
+        self._press_deadline = 0.0
+        self._cursor = None       # where the previous point left the cursor
+
+    def _bind(self, backend):
+        ops = []
+        for kind, press_seq, scroll_delta in self.sequence.actions:
+            if kind == ACTION_KEY:
+                press, release, resolve = backend.press_key, backend.release_key, backend.resolve_key
+            else:
+                press, release, resolve = backend.press_button, backend.release_button, backend.resolve_button
+            objs = tuple(resolve(name) for name in press_seq) if kind != ACTION_NONE else ()
+            ops.append((kind, press, release, objs, tuple(reversed(objs)), scroll_delta))
+        self._ops = tuple(ops)
+        super()._bind(backend)
+
+    def _step(self, phase, deadline):
+        if phase == _PHASE_RELEASE:
+            return self._step_release()
+        seq = self.sequence
+        if not len(seq):
+            return None
+        i = self._index
+        target = (seq.x[i], seq.y[i])
+        if phase == PHASE_MOVE or (self.smooth_move and target != self._cursor and self._start_move(target)):
+            nxt = self._advance_path()
+            if nxt is not None:
+                return (nxt, PHASE_MOVE)
+        backend = self.backend
+        self.last = now = perf_counter()
+        self.telemetry.record(now, now - deadline)
+        self._press_deadline = deadline
+
+        try:
+            backend.move(*target)
+        except Exception:
+            pass
+        self._cursor = target
+
+        kind, press, release, objs, release_objs, scroll_delta = self._ops[seq.action[i]]
+        if kind == ACTION_SCROLL:
+            try:
+                backend.scroll(*scroll_delta)
+            except Exception:
+                pass
+        elif objs:
+            try:
+                for obj in objs:
+                    press(obj)
+                self._pressed = (release, release_objs)
+            except Exception as e:
+                print(f"Sequence point {i} failed: {e}")
+
+        hold = seq.hold[i]
+        if self._pressed and hold > 0:
+            return ((deadline if self.deadline_mode else now) + hold, _PHASE_RELEASE)
+        return self._step_release()
+
+    def _start_move(self, target):
+        start = self._cursor
+        if start is None:
+            try:
+                start = self.backend.position()
+            except Exception:
+                start = None
+        return self._start_path(start, target)
+
+    def _step_release(self):
+        self._release_held()
+        self.actions += 1
+        seq = self.sequence
+        i = self._index
+        if self.deadline_mode:
+            due = self._press_deadline + seq.hold[i] + seq.delay[i]
+        else:
+            due = perf_counter() + seq.delay[i]
+
+        i += 1
+        if i == len(seq):
+            self.loops += 1
+            if self.repeat is not None and self.loops >= self.repeat:
+                return None
+            i = 0
+        self._index = i
+        # Behind schedule: fire now and continue the grid from here instead of bursting to catch up
+        now = perf_counter()
+        return (due if due > now else now, _PHASE_PRESS)
+
+    def _release_held(self):
+        if self._pressed:
+            release, objs = self._pressed
+            self._pressed = None
+            try:
+                for obj in objs:
+                    release(obj)
+            except Exception:
+                pass
+
+    def __repr__(self):
+        return f"<SequenceJob {self.id} {self.state} points={len(self.sequence)} loops={self.loops}>"
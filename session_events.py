@@ -0,0 +1,228 @@
+# session_events.py
+# Platform event sources for the hotkey health monitor (Linux): X server reconnects, screensaver,
+# session lock/unlock and suspend/resume. Every source blocks on a file descriptor, never on a timer.
+# Modules only the watcher threads need are imported when a watcher starts, to keep GUI startup light.
+
+import os
+import threading
+
+# Events passed to the notify callback
+EVENT_LOCK = "lock"
+EVENT_UNLOCK = "unlock"
+EVENT_RESUME = "resume"
+EVENT_X_RECONNECT = "x_reconnect"
+EVENT_SCREENSAVER_ON = "screensaver_on"
+EVENT_SCREENSAVER_OFF = "screensaver_off"
+
+# Reconnect backoff while the X server is gone (only runs between a disconnect and the next connect)
+X_RECONNECT_MIN = 0.5
+X_RECONNECT_MAX = 30.0
+
+# MIT-SCREEN-SAVER constants
+_SCREEN_SAVER_NOTIFY_MASK = 1
+_SCREEN_SAVER_ON = 1
+
+
+class XDisplayWatcher:
+    """
+    Watches the X server through its own display connection. The thread sleeps in select() on the
+    connection socket with no timeout: the socket only becomes readable for a screensaver notification
+    (when libXss is available) or when the server goes away. After a disconnect it reconnects with
+    backoff and reports EVENT_X_RECONNECT.
+    """
+
+    def __init__(self, notify, display=None):
+        import ctypes
+        import ctypes.util
+
+        libx11_path = ctypes.util.find_library("X11")
+        if not libx11_path:
+            raise OSError("X display watcher needs libX11")
+        self._ctypes = ctypes
+        self._x11 = x11 = ctypes.CDLL(libx11_path)
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XPending.argtypes = [ctypes.c_void_p]
+        x11.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        x11.XFlush.argtypes = [ctypes.c_void_p]
+
+        self._xss = None
+        libxss_path = ctypes.util.find_library("Xss")
+        if libxss_path:
+            self._xss = xss = ctypes.CDLL(libxss_path)
+            xss.XScreenSaverQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 2
+            xss.XScreenSaverSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong]
+
+        self.notify = notify
+        self.display_name = display
+        self._display = None
+        self._event_base = None
+        self._running = False
+        self._thread = None
+        self._wake_r, self._wake_w = os.pipe()
+
+    def start(self):
+        if not self._connect():
+            raise OSError(f"Cannot open X display {self.display_name or '$DISPLAY'}")
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="XDisplayWatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        os.write(self._wake_w, b"x")
+
+    def _connect(self):
+        ctypes = self._ctypes
+        name = self.display_name
+        display = self._x11.XOpenDisplay(name.encode() if name else None)
+        if not display:
+            return False
+        self._display = display
+        self._event_base = None
+        if self._xss:
+            event_base, error_base = ctypes.c_int(), ctypes.c_int()
+            if self._xss.XScreenSaverQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+                self._event_base = event_base.value
+                self._xss.XScreenSaverSelectInput(display, self._x11.XDefaultRootWindow(display),
+                                                  _SCREEN_SAVER_NOTIFY_MASK)
+                self._x11.XFlush(display)
+        return True
+
+    def _server_gone(self, fd):
+        """Peek at the socket without consuming anything Xlib still has to read. True on EOF/error."""
+        import socket
+
+        try:
+            sock = socket.socket(fileno=os.dup(fd))
+        except OSError:
+            return True
+        try:
+            return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+        finally:
+            sock.close()
+
+    def _drain_events(self):
+        ctypes = self._ctypes
+        x11 = self._x11
+        display = self._display
+        event = (ctypes.c_long * 24)()   # sizeof(XEvent)
+        while x11.XPending(display):
+            x11.XNextEvent(display, ctypes.byref(event))
+            if self._event_base is not None and (event[0] & 0x7f) == self._event_base:
+                # XScreenSaverNotifyEvent: type, serial, send_event, display, window, root, state, ...
+                state = ctypes.cast(ctypes.byref(event, 6 * ctypes.sizeof(ctypes.c_long)),
+                                    ctypes.POINTER(ctypes.c_int))[0]
+                self.notify(EVENT_SCREENSAVER_ON if state == _SCREEN_SAVER_ON else EVENT_SCREENSAVER_OFF)
+
+    def _run(self):
+        import select
+
+        while self._running:
+            fd = self._x11.XConnectionNumber(self._display)
+            readable, _, _ = select.select([fd, self._wake_r], [], [])
+            if not self._running:
+                return
+            if fd not in readable:
+                continue
+            if not self._server_gone(fd):
+                self._drain_events()
+                continue
+            # The server closed the connection. Any Xlib call on it would end the process through the
+            # default I/O error handler, so the dead Display is abandoned rather than closed.
+            self._display = None
+            delay = X_RECONNECT_MIN
+            while self._running and not self._connect():
+                readable, _, _ = select.select([self._wake_r], [], [], delay)
+                delay = min(delay * 2, X_RECONNECT_MAX)
+            if self._running:
+                self.notify(EVENT_X_RECONNECT)
+
+
+# dbus-monitor match rules and how their signals map to events
+_DBUS_SYSTEM_RULES = (
+    "type='signal',interface='org.freedesktop.login1.Manager',member='PrepareForSleep'",
+    "type='signal',interface='org.freedesktop.login1.Session',member='Lock'",
+    "type='signal',interface='org.freedesktop.login1.Session',member='Unlock'",
+)
+_DBUS_SESSION_RULES = (
+    "type='signal',interface='org.freedesktop.ScreenSaver',member='ActiveChanged'",
+    "type='signal',interface='org.gnome.ScreenSaver',member='ActiveChanged'",
+)
+
+
+class DBusSignalWatcher:
+    """
+    Listens for logind lock/unlock/suspend and screensaver signals through a dbus-monitor child process,
+    so no D-Bus binding is needed. The reader thread blocks on the pipe; nothing runs until a signal arrives.
+    bus: "system" or "session".
+    """
+
+    def __init__(self, notify, bus="system"):
+        self.notify = notify
+        self.bus = bus
+        self._proc = None
+        self._thread = None
+
+    @staticmethod
+    def available():
+        import shutil
+        return shutil.which("dbus-monitor") is not None
+
+    def start(self):
+        import subprocess
+
+        rules = _DBUS_SYSTEM_RULES if self.bus == "system" else _DBUS_SESSION_RULES
+        self._proc = subprocess.Popen(["dbus-monitor", f"--{self.bus}", *rules],
+                                      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        self._thread = threading.Thread(target=self._run, name=f"DBusSignalWatcher-{self.bus}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._proc and self._proc.poll() is None:
+            self._proc.terminate()
+
+    def _run(self):
+        member = None
+        for line in self._proc.stdout:
+            line = line.strip()
+            if line.startswith("signal "):
+                member = line.rsplit("member=", 1)[-1] if "member=" in line else None
+                if member == "Lock":
+                    self.notify(EVENT_LOCK)
+                elif member == "Unlock":
+                    self.notify(EVENT_UNLOCK)
+                continue
+            if line.startswith("boolean ") and member:
+                value = line.split()[1] == "true"
+                if member == "PrepareForSleep" and not value:
+                    self.notify(EVENT_RESUME)
+                elif member == "ActiveChanged":
+                    self.notify(EVENT_SCREENSAVER_ON if value else EVENT_SCREENSAVER_OFF)
+                member = None
+
+
+def start_linux_sources(notify):
+    """Start every Linux event source available here. Returns the started sources (each has stop())."""
+    sources = []
+    if os.getenv("DISPLAY"):
+        try:
+            sources.append(XDisplayWatcher(notify).start())
+        except Exception as e:
+            print(f"X display watcher unavailable: {e}")
+    if DBusSignalWatcher.available():
+        for bus in ("system", "session"):
+            try:
+                sources.append(DBusSignalWatcher(notify, bus).start())
+            except Exception as e:
+                print(f"D-Bus {bus} watcher unavailable: {e}")
+    return sources
@@ -0,0 +1,94 @@
+# startup_benchmark.py
+# Cold start import-time check based on `python -X importtime`. Fails (exit 1) when a target goes over
+# its budget or eagerly imports a module that must stay lazy.
+#
+#   python startup_benchmark.py                 # measure every target, best of 5 runs
+#   python startup_benchmark.py --top 15        # also list the slowest imports
+#   python startup_benchmark.py --scale 2       # slower machine: double every budget
+
+import argparse
+import os
+import subprocess
+import sys
+
+# target -> (code to import, budget in ms of import time on top of interpreter startup)
+TARGETS = {
+    "gui": ("import tkinter, tkinter.ttk, Autoclicker", 80.0),
+    "cli": ("import cli", 40.0),
+}
+
+# Modules each target must not import at startup (loaded on first use instead)
+LAZY_MODULES = {
+    "gui": ("pynput", "keyboard", "numpy", "tkinter.filedialog", "tkinter.messagebox", "subprocess", "paths", "jitter",
+            "asyncio", "multiprocessing"),
+    "cli": ("tkinter", "pynput", "keyboard", "numpy", "Autoclicker", "asyncio", "multiprocessing"),
+}
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _parse(stderr):
+    """Parse -X importtime output into [(module, depth, self_us, cumulative_us)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_part, cumulative_us, name = line.split("|")
+        indent = len(name) - len(name.lstrip()) - 1
+        rows.append((name.strip(), indent // 2, int(self_part.split(":")[1]), int(cumulative_us)))
+    return rows
+
+
+def measure(code):
+    """Import code once in a fresh interpreter; returns the parsed importtime rows."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=REPO_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{result.stderr[-2000:]}")
+    return _parse(result.stderr)
+
+
+def run_target(code, runs, baseline):
+    """Best-of-runs import time (ms) of code, excluding modules the bare interpreter already imports."""
+    best = None
+    best_rows = None
+    for _ in range(runs):
+        rows = measure(code)
+        total = sum(cum for name, depth, _, cum in rows if depth == 0 and name not in baseline) / 1000
+        if best is None or total < best:
+            best, best_rows = total, rows
+    return best, best_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check cold start import time against a budget.")
+    parser.add_argument("--runs", type=int, default=5, help="runs per target, the fastest counts (default 5)")
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest imports per target")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slower machines)")
+    parser.add_argument("targets", nargs="*", help=f"targets to check: {', '.join(TARGETS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    baseline = {name for name, depth, _, _ in measure("pass") if depth == 0}
+    failed = False
+    for target in args.targets or TARGETS:
+        code, budget = TARGETS[target]
+        budget *= args.scale
+        total, rows = run_target(code, args.runs, baseline)
+        imported = {name for name, _, _, _ in rows}
+        eager = [m for m in LAZY_MODULES.get(target, ()) if m in imported]
+        ok = total <= budget and not eager
+        failed |= not ok
+        print(f"{target:4}  {total:7.1f} ms  (budget {budget:.0f} ms)  {'ok' if ok else 'FAIL'}")
+        if eager:
+            print(f"      imported eagerly: {', '.join(eager)}")
+        if args.top:
+            for name, _, self_us, cum in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+                print(f"      {self_us / 1000:7.2f} ms self  {cum / 1000:7.2f} ms cumulative  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# telemetry.py
+# Low-overhead click timing telemetry: a fixed-size ring buffer written on the hot path and
+# HDR-style log-linear histograms built lazily by whoever reads the stats
+
+from array import array
+import threading
+
+# Ring buffer size (power of two). Readers drain it incrementally, so it only has to hold the actions
+# performed between two reads (a GUI refreshing 4x per second at 1000 CPS needs 250 slots).
+DEFAULT_CAPACITY = 4096
+
+# Actions that start more than this many seconds after their deadline count as late
+LATE_THRESHOLD = 0.001
+
+# Window used for the "current" clicks per second figure
+RECENT_WINDOW = 1.0
+
+# Histogram resolution: values below 2 ** _SUB_BITS us are exact, larger ones keep _SUB_BITS - 1
+# significant bits (about 1.5 % relative error)
+_SUB_BITS = 7
+_SUB_COUNT = 1 << _SUB_BITS
+_HALF_COUNT = _SUB_COUNT >> 1
+
+
+class LogHistogram:
+    """
+    HDR-style histogram of non-negative values in microseconds: linear buckets up to 128 us, then
+    64 buckets per power of two. Fixed memory, O(1) insert, percentiles by cumulative scan.
+    """
+
+    def __init__(self, max_exponent=32):
+        self.counts = [0] * (_SUB_COUNT + max_exponent * _HALF_COUNT)
+        self.total = 0
+        self.max_value = 0
+
+    @staticmethod
+    def bucket(value_us):
+        v = int(value_us)
+        if v < _SUB_COUNT:
+            return v if v > 0 else 0
+        e = v.bit_length() - _SUB_BITS
+        return _SUB_COUNT + (e - 1) * _HALF_COUNT + ((v >> e) - _HALF_COUNT)
+
+    @staticmethod
+    def bucket_value(index):
+        """Midpoint (us) of the values that fall into bucket index."""
+        if index < _SUB_COUNT:
+            return float(index)
+        e = (index - _SUB_COUNT) // _HALF_COUNT + 1
+        m = (index - _SUB_COUNT) % _HALF_COUNT + _HALF_COUNT
+        return ((m << e) + ((m + 1) << e) - 1) / 2
+
+    def add(self, value_us):
+        index = self.bucket(value_us)
+        if index >= len(self.counts):
+            index = len(self.counts) - 1
+        self.counts[index] += 1
+        self.total += 1
+        if value_us > self.max_value:
+            self.max_value = value_us
+
+    def percentile(self, pct):
+        """Value (us) at the given percentile, 0.0 when empty."""
+        if not self.total:
+            return 0.0
+        target = max(1, int(round(pct / 100 * self.total)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.bucket_value(index), float(self.max_value))
+        return float(self.max_value)
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.max_value = 0
+
+
+class Telemetry:
+    """
+    Per-job timing telemetry. record() is the only call on the hot path: two array stores and an
+    increment, no locking. snapshot() drains new ring entries into the period/lateness histograms.
+    """
+
+    def __init__(self, interval=0.0, capacity=DEFAULT_CAPACITY):
+        if capacity & (capacity - 1):
+            raise ValueError("Telemetry capacity must be a power of two")
+        self.interval = interval
+        self.capacity = capacity
+        self.count = 0
+        self._mask = capacity - 1
+        self.times = array("d", bytes(8 * capacity))     # perf_counter() when each action started
+        self.lateness = array("d", bytes(8 * capacity))  # seconds after its deadline
+        self.period_jitter = LogHistogram()              # |period - interval| in us
+        self.lateness_hist = LogHistogram()              # lateness in us
+        self.late = 0
+        self.dropped = 0
+        self._drained = 0
+        self._prev_time = None
+        self._lock = threading.Lock()
+
+    def record(self, t, lateness):
+        """Record one action that started at t (perf_counter()), lateness seconds after its deadline."""
+        i = self.count & self._mask
+        self.times[i] = t
+        self.lateness[i] = lateness
+        self.count += 1
+
+    def _drain(self):
+        count = self.count
+        start = self._drained
+        if count - start > self.capacity:
+            # The reader fell behind by more than a full ring; those samples are gone
+            self.dropped += count - start - self.capacity
+            start = count - self.capacity
+            self._prev_time = None
+        mask = self._mask
+        times, lateness = self.times, self.lateness
+        interval = self.interval
+        prev = self._prev_time
+        for n in range(start, count):
+            i = n & mask
+            t = times[i]
+            late = lateness[i]
+            if late > LATE_THRESHOLD:
+                self.late += 1
+            self.lateness_hist.add(late * 1e6 if late > 0 else 0)
+            if prev is not None:
+                self.period_jitter.add(abs((t - prev) - interval) * 1e6)
+            prev = t
+        self._prev_time = prev
+        self._drained = count
+
+    def recent_cps(self, now=None):
+        """Actions per second over the last RECENT_WINDOW seconds of samples still in the ring."""
+        count = self.count
+        available = min(count, self.capacity)
+        if available < 2:
+            return 0.0
+        mask = self._mask
+        last = self.times[(count - 1) & mask]
+        first = last
+        n = 1
+        for k in range(2, available + 1):
+            t = self.times[(count - k) & mask]
+            if last - t > RECENT_WINDOW:
+                break
+            first = t
+            n = k
+        return (n - 1) / (last - first) if last > first else 0.0
+
+    def snapshot(self):
+        """Drain pending samples and return count, current CPS, jitter/lateness percentiles (ms) and late/dropped counts."""
+        with self._lock:
+            self._drain()
+            jitter = self.period_jitter
+            lateness = self.lateness_hist
+            return {
+                "count": self.count,
+                "current_cps": self.recent_cps(),
+                "jitter_p50_ms": jitter.percentile(50) / 1000,
+                "jitter_p90_ms": jitter.percentile(90) / 1000,
+                "jitter_p99_ms": jitter.percentile(99) / 1000,
+                "jitter_max_ms": jitter.max_value / 1000,
+                "lateness_p99_ms": lateness.percentile(99) / 1000,
+                "late": self.late,
+                "dropped": self.dropped,
+            }
@@ -0,0 +1,318 @@
+# templates.py
+# Template matching for the template trigger (see triggers.TemplateTrigger): grayscale image pyramids,
+# coarse-to-fine normalised cross-correlation, and a small PNG reader/writer for template files.
+# Needs NumPy. Luma is approximated by the green channel, which carries most of the luminance and is
+# at the same index in BGR(A) captures and RGB(A) files, so no colour conversion pass is needed.
+
+import hashlib
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Pyramid depth: each level halves the size; the coarsest template keeps at least MIN_TEMPLATE_SIDE px
+MAX_LEVELS = 4
+MIN_TEMPLATE_SIDE = 12
+# Coarse candidates refined per frame, and how far (px) refinement searches around each at every level
+CANDIDATES = 3
+REFINE_RADIUS = 2
+# Coarse matches must score at least threshold - COARSE_SLACK to be refined
+COARSE_SLACK = 0.25
+# Preprocessed templates kept in memory
+TEMPLATE_CACHE_SIZE = 32
+
+_EPS = 1e-6
+
+
+# --- PNG files ---
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+def _unfilter(raw, height, stride, bpp):
+    """Undo PNG row filters. raw holds height rows of (1 filter byte + stride bytes)."""
+    rows = np.frombuffer(raw, dtype=np.uint8).reshape(height, stride + 1)
+    out = np.zeros((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.int32)
+    for y in range(height):
+        kind = rows[y, 0]
+        line = rows[y, 1:].astype(np.int32)
+        if kind == 1:       # Sub: cumulative per channel
+            line = np.cumsum(line.reshape(-1, bpp), axis=0).reshape(-1) & 0xFF
+        elif kind == 2:     # Up
+            line = (line + prev) & 0xFF
+        elif kind in (3, 4):
+            for x in range(0, stride, bpp):
+                left = line[x - bpp:x] if x else np.zeros(bpp, dtype=np.int32)
+                up = prev[x:x + bpp]
+                if kind == 3:   # Average
+                    line[x:x + bpp] = (line[x:x + bpp] + ((left + up) >> 1)) & 0xFF
+                else:           # Paeth
+                    upleft = prev[x - bpp:x] if x else np.zeros(bpp, dtype=np.int32)
+                    p = left + up - upleft
+                    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - upleft)
+                    pred = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+                    line[x:x + bpp] = (line[x:x + bpp] + pred) & 0xFF
+        elif kind != 0:
+            raise ValueError(f"Unknown PNG filter type {kind}")
+        out[y] = line
+        prev = line
+    return out
+
+
+def read_png(path):
+    """Read an 8-bit, non-interlaced PNG into an (h, w, channels) uint8 array (RGB/RGBA/gray order)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(_PNG_SIGNATURE):
+        raise ValueError(f"{path} is not a PNG file")
+    pos = len(_PNG_SIGNATURE)
+    header = None
+    idat = []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise ValueError(f"{path}: missing PNG header")
+    width, height, depth, colour_type, _, _, interlace = header
+    if depth != 8 or colour_type not in _PNG_CHANNELS or interlace:
+        raise ValueError(f"{path}: only 8-bit non-interlaced gray/RGB(A) PNGs are supported")
+    channels = _PNG_CHANNELS[colour_type]
+    raw = zlib.decompress(b"".join(idat))
+    pixels = _unfilter(raw, height, width * channels, channels)
+    return pixels.reshape(height, width, channels)
+
+
+def write_png(path, pixels):
+    """Write an (h, w, 4) RGBA or (h, w, 3) RGB uint8 array as a PNG file."""
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    height, width, channels = pixels.shape
+    colour_type = {3: 2, 4: 6}[channels]
+    raw = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(height, -1)
+
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+    with open(path, "wb") as f:
+        f.write(_PNG_SIGNATURE)
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, colour_type, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def luma(pixels):
+    """Grayscale view of an image: 2-D arrays as-is, otherwise the green channel."""
+    pixels = np.asarray(pixels)
+    if pixels.ndim == 2:
+        return pixels
+    return pixels[:, :, 1] if pixels.shape[2] >= 3 else pixels[:, :, 0]
+
+
+def _half(src, out):
+    """
+    2x2 box sum of src (trimmed to even size) into out. Levels are kept as sums rather than means:
+    NCC ignores intensity scale, and four levels of sums of uint8 still fit in uint16.
+    """
+    h, w = out.shape
+    np.add(src[0:2 * h:2, 0:2 * w:2], src[1:2 * h:2, 0:2 * w:2], out=out, dtype=out.dtype)
+    out += src[0:2 * h:2, 1:2 * w:2]
+    out += src[1:2 * h:2, 1:2 * w:2]
+    return out
+
+
+def _fast_length(n):
+    """Smallest m >= n with no prime factor above 5 (quick FFT sizes)."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def pyramid_depth(template_shape, region_shape, max_levels=MAX_LEVELS):
+    """Number of pyramid levels (1 = full resolution only) usable for this template and region."""
+    th, tw = template_shape
+    rh, rw = region_shape
+    levels = 1
+    while (levels < max_levels and min(th, tw) >> levels >= MIN_TEMPLATE_SIDE
+           and rh >> levels >= th >> levels and rw >> levels >= tw >> levels):
+        levels += 1
+    return levels
+
+
+class TemplatePyramid:
+    """A preprocessed template: zero-mean float32 pyramid levels and their norms (level 0 = full size)."""
+
+    def __init__(self, pixels, max_levels=MAX_LEVELS):
+        gray = luma(pixels).astype(np.float32)
+        if gray.shape[0] < 2 or gray.shape[1] < 2:
+            raise ValueError("Template must be at least 2x2 pixels")
+        self.height, self.width = gray.shape
+        self.levels = []
+        self.norms = []
+        level = gray
+        for k in range(max_levels):
+            if k:
+                if min(level.shape) // 2 < 2:
+                    break
+                level = _half(level, np.empty((level.shape[0] // 2, level.shape[1] // 2), dtype=np.float32))
+            zero_mean = level - level.mean()
+            self.levels.append(zero_mean)
+            self.norms.append(float(np.sqrt((zero_mean * zero_mean).sum())))
+        self._fft = {}      # (level, frame shape) -> rfft2 of the zero-mean template, for coarse matching
+
+    def fft(self, level, shape):
+        key = (level, shape)
+        spectrum = self._fft.get(key)
+        if spectrum is None:
+            spectrum = self._fft[key] = np.conj(np.fft.rfft2(self.levels[level], s=shape))
+        return spectrum
+
+
+_template_cache = OrderedDict()
+
+
+def load_template(source, max_levels=MAX_LEVELS):
+    """
+    TemplatePyramid for source: a .png or .npy path, or an image array. Cached (LRU) by path and
+    modification time, or by content for arrays, so repeated loads cost a dict lookup.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        stat = os.stat(path)
+        key = ("file", os.path.abspath(path), stat.st_mtime_ns, stat.st_size, max_levels)
+    else:
+        array = np.ascontiguousarray(source)
+        key = ("array", array.shape, array.dtype.str, hashlib.blake2b(array.tobytes(), digest_size=16).digest(),
+               max_levels)
+    pyramid = _template_cache.get(key)
+    if pyramid is not None:
+        _template_cache.move_to_end(key)
+        return pyramid
+    if key[0] == "file":
+        pixels = np.load(path) if path.lower().endswith(".npy") else read_png(path)
+    else:
+        pixels = array
+    pyramid = TemplatePyramid(pixels, max_levels)
+    _template_cache[key] = pyramid
+    while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+        _template_cache.popitem(last=False)
+    return pyramid
+
+
+class PyramidMatcher:
+    """
+    Matches one TemplatePyramid against frames of a fixed size. Pyramid buffers are allocated once and
+    reused for every frame; only the coarsest level is searched exhaustively (FFT correlation), finer
+    levels just refine the best candidates within REFINE_RADIUS.
+    """
+
+    def __init__(self, template, frame_shape, threshold):
+        self.template = template
+        self.threshold = threshold
+        self.depth = min(pyramid_depth((template.height, template.width), frame_shape), len(template.levels))
+        self._buffers = []
+        h, w = frame_shape
+        for _ in range(1, self.depth):
+            h, w = h // 2, w // 2
+            self._buffers.append(np.empty((h, w), dtype=np.uint16))
+        # Coarse level work buffers: zero-padded integral images of the level and of its square
+        self._ii = np.zeros((h + 1, w + 1), dtype=np.float64)
+        self._ii2 = np.zeros((h + 1, w + 1), dtype=np.float64)
+        self._fft_shape = (_fast_length(h), _fast_length(w))
+
+    def match(self, gray):
+        """Best match in the 2-D frame gray: ((x, y) of the template's top-left, score), or (None, score)."""
+        levels = [gray]
+        for buf in self._buffers:
+            levels.append(_half(levels[-1], buf))
+
+        top = self.depth - 1
+        scores = self._ncc_map(levels[top], top)
+        if scores.size == 0:
+            return None, 0.0
+        coarse_min = self.threshold - COARSE_SLACK
+        th, tw = self.template.levels[top].shape
+        best, best_score = None, -1.0
+        for _ in range(CANDIDATES):
+            y, x = np.unravel_index(int(scores.argmax()), scores.shape)
+            score = float(scores[y, x])
+            if score < coarse_min:
+                break
+            # Suppress this peak's neighbourhood so the next candidate is a different location
+            scores[max(0, y - th // 2):y + th // 2 + 1, max(0, x - tw // 2):x + tw // 2 + 1] = -1.0
+            x, y = int(x), int(y)
+            for k in range(top - 1, -1, -1):
+                (x, y), score = self._refine(levels[k], k, 2 * x, 2 * y)
+            if score > best_score:
+                best, best_score = (x, y), score
+        if best is None or best_score < self.threshold:
+            return None, max(best_score, 0.0)
+        return best, best_score
+
+    def _ncc_map(self, image, level):
+        """Normalised cross-correlation of the template at every valid position of image."""
+        tmpl = self.template.levels[level]
+        th, tw = tmpl.shape
+        h, w = image.shape
+        if h < th or w < tw:
+            return np.empty((0, 0), dtype=np.float32)
+        shape = self._fft_shape
+        corr = np.fft.irfft2(np.fft.rfft2(image, s=shape) * self.template.fft(level, shape), s=shape)
+        corr = corr[:h - th + 1, :w - tw + 1]
+        # Window sums and sums of squares from the integral images
+        ii, ii2 = self._ii, self._ii2
+        inner, inner2 = ii[1:, 1:], ii2[1:, 1:]
+        np.cumsum(image, axis=0, dtype=np.float64, out=inner)
+        np.cumsum(inner, axis=1, out=inner)
+        np.square(image, out=inner2, dtype=np.float64)
+        np.cumsum(inner2, axis=0, out=inner2)
+        np.cumsum(inner2, axis=1, out=inner2)
+        s1 = ii[th:, tw:] - ii[:-th, tw:]
+        s1 -= ii[th:, :-tw]
+        s1 += ii[:-th, :-tw]
+        var = ii2[th:, tw:] - ii2[:-th, tw:]
+        var -= ii2[th:, :-tw]
+        var += ii2[:-th, :-tw]
+        s1 *= s1
+        s1 *= 1.0 / (th * tw)
+        var -= s1
+        # Floor the variance at one level unit per pixel: flat windows score ~0 instead of dividing by ~0
+        np.maximum(var, th * tw, out=var)
+        np.sqrt(var, out=var)
+        var *= self.template.norms[level]
+        corr /= var
+        return corr
+
+    def _refine(self, image, level, x, y):
+        """Best NCC position within REFINE_RADIUS of (x, y) at this level: ((x, y), score)."""
+        tmpl = self.template.levels[level]
+        th, tw = tmpl.shape
+        h, w = image.shape
+        r = REFINE_RADIUS
+        x0, y0 = max(0, x - r), max(0, y - r)
+        x1, y1 = min(w - tw, x + r), min(h - th, y + r)
+        if x1 < x0 or y1 < y0:
+            return (min(max(x, 0), max(w - tw, 0)), min(max(y, 0), max(h - th, 0))), 0.0
+        patch = image[y0:y1 + th, x0:x1 + tw].astype(np.float32)
+        windows = np.lib.stride_tricks.sliding_window_view(patch, (th, tw))
+        means = windows.mean(axis=(2, 3), keepdims=True)
+        centred = windows - means
+        corr = np.tensordot(centred, tmpl, axes=((2, 3), (0, 1)))
+        norms = np.sqrt((centred * centred).sum(axis=(2, 3)))
+        scores = corr / (norms * self.template.norms[level] + _EPS)
+        dy, dx = np.unravel_index(int(scores.argmax()), scores.shape)
+        return (x0 + int(dx), y0 + int(dy)), float(scores[dy, dx])
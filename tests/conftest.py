@@ -0,0 +1,5 @@
+# The modules live at the repository root and import each other as top-level modules
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
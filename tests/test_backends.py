@@ -0,0 +1,61 @@
+import pytest
+
+from backends import (NullBackend, RecordingBackend, get_backend, OP_MOVE, OP_PRESS_BUTTON,
+                      OP_RELEASE_BUTTON, OP_SCROLL)
+from actions import compile_action_plan
+from benchmark import format_results, run_case
+from engine import ClickerEngine
+
+
+def test_get_backend():
+    assert isinstance(get_backend("null"), NullBackend)
+    recording = RecordingBackend()
+    assert get_backend(recording) is recording
+    with pytest.raises(ValueError, match="Unknown input backend"):
+        get_backend("telepathy")
+
+
+def test_recording_backend():
+    backend = RecordingBackend()
+    assert backend.position() is None
+    backend.move(3, 4)
+    backend.press_button("left")
+    backend.release_button("left")
+    backend.scroll(0, -1)
+    assert backend.position() == (3, 4)
+    assert [(op, args) for _, op, args in backend.events] == [
+        (OP_MOVE, (3, 4)), (OP_PRESS_BUTTON, "left"), (OP_RELEASE_BUTTON, "left"), (OP_SCROLL, (0, -1))]
+    stamps = backend.timestamps()
+    assert stamps == sorted(stamps)
+    assert len(backend.timestamps(OP_PRESS_BUTTON)) == 1
+    backend.clear()
+    assert backend.events == []
+
+
+def test_benchmark_case():
+    result = run_case(2, "deadline", 0.1)
+    assert result["clicks"] > 10
+    assert result["requested_cps"] == 500.0
+    assert 0 < result["mean_period_ms"] < 10
+    table = format_results([result])
+    assert "deadline" in table.splitlines()[2]
+
+
+def test_default_backend_is_only_built_when_needed():
+    # "pynput" may be missing here; an unknown name fails the same way, on the engine thread
+    engine = ClickerEngine("no-such-backend")
+    plan = compile_action_plan(1, "Mouse: Left", "repeat", 3, hold_time=0)
+    job = engine.submit(plan, backend="null")
+    assert job.wait(5)
+    assert job.actions == 3 and job.error is None
+
+    failed = engine.submit(plan)
+    assert failed.wait(5)
+    assert failed.actions == 0
+    assert isinstance(failed.error, ValueError)
+
+    # The worker thread survives the failure
+    job = engine.submit(plan, backend="null")
+    assert job.wait(5)
+    assert job.actions == 3
+    engine.shutdown(1)
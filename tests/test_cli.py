@@ -0,0 +1,114 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from preset_library import PresetLibrary
+
+CLICK = {"hotkey": "Mouse: Left", "interval_ms": 5, "repeat_mode": "repeat", "repeat_count": 3, "hold_time": 0}
+
+
+@pytest.fixture(autouse=True)
+def no_signal_handlers(monkeypatch):
+    # _run_job installs SIGINT/SIGTERM handlers; keep pytest's own
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    library = PresetLibrary(str(tmp_path / "presets.db"))
+    monkeypatch.setattr(cli, "get_library", lambda: library)
+    yield library
+    library.close()
+
+
+def _write(path, preset):
+    path.write_text(json.dumps(preset))
+    return str(path)
+
+
+def _json_lines(out):
+    return [json.loads(line) for line in out.splitlines()]
+
+
+def test_run_preset_file(tmp_path, capsys):
+    path = _write(tmp_path / "preset.json", CLICK)
+    assert cli.main(["run", path, "--backend", "null", "--json"]) == 0
+    final = _json_lines(capsys.readouterr().out)[-1]
+    assert final["final"] is True
+    assert final["actions"] == 3
+
+
+def test_run_for_a_duration(tmp_path, capsys):
+    path = _write(tmp_path / "preset.json", dict(CLICK, repeat_mode="until_stopped"))
+    assert cli.main(["run", path, "--backend", "null", "--duration", "0.1", "--json"]) == 0
+    final = _json_lines(capsys.readouterr().out)[-1]
+    assert final["final"] is True
+    assert final["actions"] > 3
+
+
+def test_run_from_library(library, capsys):
+    library.save("Fast", CLICK)
+    assert cli.main(["run", "fast", "--library", "--backend", "null"]) == 0
+    assert capsys.readouterr().out.startswith("Finished: 3 actions")
+    assert cli.main(["run", "slow", "--library", "--backend", "null"]) == 2
+    assert "No preset named 'slow'" in capsys.readouterr().err
+
+
+def test_run_bad_preset(tmp_path, capsys):
+    assert cli.main(["run", str(tmp_path / "missing.json"), "--backend", "null"]) == 2
+    assert "Cannot load preset" in capsys.readouterr().err
+    path = tmp_path / "list.json"
+    path.write_text("[]")
+    assert cli.main(["run", str(path), "--backend", "null"]) == 2
+
+
+def test_unknown_backend(tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["run", _write(tmp_path / "preset.json", CLICK), "--backend", "nope"])
+    assert exc.value.code == 2
+
+
+def test_script_check_and_run(tmp_path, capsys):
+    path = tmp_path / "farm.txt"
+    path.write_text("loop 2\n    click left 10 20\n    wait 1\nend\n")
+    assert cli.main(["script", str(path), "--check"]) == 0
+    assert "OK" in capsys.readouterr().out
+    assert cli.main(["script", str(path), "--backend", "null", "--json"]) == 0
+    assert _json_lines(capsys.readouterr().out)[-1]["final"] is True
+
+    path.write_text("loop 2\n    click left 10 20\n")
+    assert cli.main(["script", str(path), "--check"]) == 2
+    assert "Cannot load script" in capsys.readouterr().err
+
+
+def test_presets_commands(library, tmp_path, capsys):
+    path = _write(tmp_path / "Fast.json", CLICK)
+    assert cli.main(["presets", "import", path, "--tags", "farm"]) == 0
+    assert "Imported" in capsys.readouterr().out
+
+    assert cli.main(["presets", "list", "--json"]) == 0
+    rows = _json_lines(capsys.readouterr().out)
+    assert [row["tags"] for row in rows] == [["farm"]]
+    name = rows[0]["name"]
+
+    exported = tmp_path / "out.json"
+    assert cli.main(["presets", "export", name, str(exported)]) == 0
+    assert json.loads(exported.read_text()) == CLICK
+
+    assert cli.main(["presets", "delete", name]) == 0
+    assert cli.main(["presets", "delete", name]) == 2
+    assert cli.main(["presets", "import", str(tmp_path / "missing.json")]) == 1
+
+
+def test_does_not_import_tkinter(tmp_path):
+    path = _write(tmp_path / "preset.json", CLICK)
+    code = (f"import sys, cli; assert cli.main(['run', {path!r}, '--backend', 'null']) == 0; "
+            "assert 'tkinter' not in sys.modules, 'tkinter imported'")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,147 @@
+import os
+import socket
+import time
+
+import pytest
+
+from backends import RecordingBackend, OP_PRESS_BUTTON
+from engine import ClickerEngine
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+CLICK = {"hotkey": "Mouse: Left", "interval_ms": 1, "hold_time": 0}
+
+
+@pytest.fixture
+def engine():
+    engine = ClickerEngine(RecordingBackend())
+    yield engine
+    engine.shutdown(1)
+
+
+@pytest.fixture
+def server(engine, tmp_path):
+    from control import ControlServer
+    server = ControlServer(engine, str(tmp_path / "control.sock")).start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(server):
+    from control import ControlClient
+    client = ControlClient(server.path, timeout=5)
+    yield client
+    client.close()
+
+
+def _presses(engine, button="left"):
+    return [args for _, op, args in engine.backend.events if op == OP_PRESS_BUTTON and args == button]
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_socket_is_owner_only(server):
+    assert os.stat(server.path).st_mode & 0o777 == 0o600
+
+
+def test_ping(client):
+    assert client.request({"id": 7, "cmd": "ping"}) == {"id": 7, "ok": True}
+
+
+def test_start_update_stop(engine, client):
+    reply = client.request({"id": 1, "cmd": "start", "preset": CLICK})
+    assert reply["ok"] and reply["id"] == 1
+    job_id = reply["job"]
+    _wait_for(lambda: _presses(engine))
+
+    assert client.request({"cmd": "update", "job": job_id, "hotkey": "Mouse: Right"})["ok"]
+    _wait_for(lambda: _presses(engine, "right"))
+
+    stats = client.request({"cmd": "stats", "job": job_id})
+    assert stats["running"] and stats["stats"]["count"] > 0
+
+    assert client.request({"cmd": "stop", "job": job_id}) == {"ok": True, "stopped": [job_id]}
+    _wait_for(lambda: not engine.jobs())
+    jobs = client.request({"cmd": "jobs"})["jobs"]
+    assert [(j["job"], j["state"]) for j in jobs] == [(job_id, "done")]
+
+
+def test_load_then_start(engine, client):
+    preset = dict(CLICK, repeat_mode="repeat", repeat_count=3)
+    assert client.request({"cmd": "load", "preset": preset})["preset"] == preset
+    job_id = client.request({"cmd": "start"})["job"]
+    _wait_for(lambda: not engine.jobs())
+    assert client.request({"cmd": "stats", "job": job_id})["stats"]["count"] == 3
+
+
+def test_batch_and_pipelining(client):
+    replies = client.request([{"id": 1, "cmd": "ping"}, {"id": 2, "cmd": "jobs"}])
+    assert replies == [{"id": 1, "ok": True}, {"id": 2, "ok": True, "jobs": []}]
+    for i in range(3):
+        client.send({"id": i, "cmd": "ping"})
+    assert [client.receive()["id"] for _ in range(3)] == [0, 1, 2]
+
+
+def test_errors(client):
+    client.sock.sendall(b"{not json\n")
+    assert "Invalid JSON" in client.receive()["error"]
+    assert client.request([1])[0]["error"] == "Commands are JSON objects"
+    assert "Unknown command" in client.request({"id": 1, "cmd": "jump"})["error"]
+    assert client.request({"cmd": "stats", "job": 99}) == {"ok": False, "error": "Not found: job 99"}
+    assert not client.request({"cmd": "start", "preset": {"interval_ms": "soon"}})["ok"]
+    assert not client.request({"cmd": "start"})["ok"]
+    # The connection stays usable after errors
+    assert client.request({"cmd": "ping"})["ok"]
+
+
+def test_stats_stream(engine, client):
+    job_id = client.request({"cmd": "start", "preset": CLICK})["job"]
+    reply = client.request({"id": "s", "cmd": "stats", "job": job_id, "every": 0.05})
+    assert reply["ok"]
+    events = client.events()
+    event = next(events)
+    assert event["id"] == "s" and event["event"] == "stats" and not event["final"]
+    client.request({"cmd": "stop", "job": job_id})
+    while not event["final"]:
+        event = next(events)
+    assert event["stats"]["count"] > 0
+
+
+def test_stale_socket_is_replaced(engine, tmp_path):
+    from control import ControlServer, ControlClient
+    path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = ControlServer(engine, path).start()
+    try:
+        client = ControlClient(path, timeout=5)
+        assert client.request({"cmd": "ping"})["ok"]
+        client.close()
+        with pytest.raises(OSError, match="already listening"):
+            ControlServer(engine, path).start()
+    finally:
+        server.close()
+
+
+def test_other_files_are_not_removed(engine, tmp_path):
+    from control import ControlServer
+    path = tmp_path / "settings.json"
+    path.write_text("{}")
+    with pytest.raises(OSError, match="not a socket"):
+        ControlServer(engine, str(path)).start()
+    assert path.read_text() == "{}"
+
+
+def test_update_replaces_interval_form(engine, client):
+    job_id = client.request({"cmd": "start", "preset": dict(CLICK, interval_ms=1000)})["job"]
+    _wait_for(lambda: _presses(engine))
+    client.request({"cmd": "update", "job": job_id, "interval": {"milliseconds": "1"}})
+    _wait_for(lambda: len(_presses(engine)) > 5)
+    client.request({"cmd": "stop", "job": job_id})
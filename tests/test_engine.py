@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from actions import compile_action_plan
+from backends import RecordingBackend, OP_MOVE, OP_PRESS_BUTTON, OP_RELEASE_BUTTON
+from engine import ClickerEngine, ClickJob, JOB_DONE
+
+
+def _engine():
+    return ClickerEngine(RecordingBackend())
+
+
+def _ops(backend, *ops):
+    return [(op, args) for _, op, args in backend.events if op in ops]
+
+
+def test_click_job_repeat_count():
+    engine = _engine()
+    finished = []
+    plan = compile_action_plan(1, "Mouse: Left", "repeat", 5, hold_time=0)
+    job = engine.submit_job(ClickJob(plan, on_finish=lambda: finished.append(True)))
+    assert job.wait(5)
+    assert job.state == JOB_DONE
+    assert job.actions == 5
+    assert finished == [True]
+    assert _ops(engine.backend, OP_PRESS_BUTTON) == [(OP_PRESS_BUTTON, "left")] * 5
+    assert len(_ops(engine.backend, OP_RELEASE_BUTTON)) == 5
+    engine.shutdown(1)
+
+
+def test_click_job_moves_to_position():
+    engine = _engine()
+    plan = compile_action_plan(1, "Mouse: Right", "repeat", 2, pos_mode="pick", x=30, y=40, hold_time=0)
+    job = engine.submit_job(ClickJob(plan))
+    assert job.wait(5)
+    assert _ops(engine.backend, OP_MOVE)[0] == (OP_MOVE, (30, 40))
+    assert _ops(engine.backend, OP_PRESS_BUTTON) == [(OP_PRESS_BUTTON, "right")] * 2
+    engine.shutdown(1)
+
+
+def test_click_job_stop():
+    engine = _engine()
+    job = engine.submit_job(ClickJob(compile_action_plan(1, "Mouse: Left", hold_time=0)))
+    time.sleep(0.05)
+    assert job.running
+    job.stop()
+    assert job.wait(5)
+    assert job.state == JOB_DONE
+    presses = len(_ops(engine.backend, OP_PRESS_BUTTON))
+    assert presses > 0
+    assert len(_ops(engine.backend, OP_RELEASE_BUTTON)) == presses
+    assert engine.jobs() == []
+    engine.shutdown(1)
+
+
+def test_click_job_stop_releases_held_button():
+    engine = _engine()
+    job = engine.submit_job(ClickJob(compile_action_plan(1, "Mouse: Left", hold_mode="hold")))
+    time.sleep(0.05)
+    job.stop()
+    assert job.wait(5)
+    assert _ops(engine.backend, OP_PRESS_BUTTON, OP_RELEASE_BUTTON) == [
+        (OP_PRESS_BUTTON, "left"), (OP_RELEASE_BUTTON, "left")]
+    engine.shutdown(1)
+
+
+def test_jobs_run_concurrently():
+    engine = _engine()
+    left = engine.submit_job(ClickJob(compile_action_plan(2, "Mouse: Left", "repeat", 10, hold_time=0)))
+    right = engine.submit_job(ClickJob(compile_action_plan(3, "Mouse: Right", "repeat", 10, hold_time=0)))
+    assert left.wait(5) and right.wait(5)
+    buttons = [args for _, args in _ops(engine.backend, OP_PRESS_BUTTON)]
+    assert buttons.count("left") == buttons.count("right") == 10
+    # Interleaved on the one worker thread, not run one after the other
+    assert buttons[:10] != ["left"] * 10
+    engine.shutdown(1)
+
+
+def test_submit_wakes_the_worker_for_an_earlier_job():
+    engine = _engine()
+    slow = engine.submit_job(ClickJob(compile_action_plan(10000, "Mouse: Left", hold_time=0)))
+    time.sleep(0.02)
+    started = time.perf_counter()
+    fast = engine.submit_job(ClickJob(compile_action_plan(1, "Mouse: Right", "repeat", 1, hold_time=0)))
+    assert fast.wait(5)
+    assert time.perf_counter() - started < 1
+    assert slow.running
+    engine.stop_all()
+    assert slow.wait(5)
+    engine.shutdown(1)
+
+
+def test_stop_all_and_shutdown():
+    engine = _engine()
+    jobs = [engine.submit_job(ClickJob(compile_action_plan(1, "Mouse: Left", hold_time=0))) for _ in range(3)]
+    time.sleep(0.02)
+    assert len(engine.jobs()) == 3
+    engine.stop_all()
+    for job in jobs:
+        assert job.wait(5)
+    engine.shutdown(1)
+    with pytest.raises(RuntimeError):
+        engine.submit_job(ClickJob(compile_action_plan(1, "Mouse: Left")))
+
+
+def test_stop_is_idempotent():
+    engine = _engine()
+    finished = []
+    job = engine.submit_job(ClickJob(compile_action_plan(1, "Mouse: Left", hold_time=0),
+                                     on_finish=lambda: finished.append(True)))
+    job.stop()
+    job.stop()
+    assert job.wait(5)
+    job.stop()
+    assert finished == [True]
+    engine.shutdown(1)
+
+
+def test_named_backend_is_shared_between_jobs():
+    engine = ClickerEngine("null")
+    plan = compile_action_plan(1, "Mouse: Left", "repeat", 1, hold_time=0)
+    jobs = [engine.submit_job(ClickJob(plan), "recording") for _ in range(3)]
+    for job in jobs:
+        assert job.wait(5)
+    assert len({id(job.backend) for job in jobs}) == 1
+    assert len(_ops(jobs[0].backend, OP_PRESS_BUTTON)) == 3
+    engine.shutdown(1)
+
+
+def test_only_deadline_mode_jobs_spin():
+    from macro import Macro, ReplayJob
+    from script import ScriptJob, compile_script
+    from sequence import SequenceJob, compile_sequence
+    assert not ClickJob(compile_action_plan(1)).precise
+    assert ClickJob(compile_action_plan(1, timing="deadline")).precise
+    assert not SequenceJob(compile_sequence([(1, 2)])).precise
+    assert SequenceJob(compile_sequence([(1, 2)]), timing="deadline").precise
+    assert not ReplayJob(Macro()).precise
+    assert not ScriptJob(compile_script("click")).precise
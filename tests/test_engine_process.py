@@ -0,0 +1,50 @@
+import os
+import signal
+
+import pytest
+
+from actions import compile_action_plan
+from engine_process import ProcessEngine, _SLOT_SIZE
+
+CLICK = compile_action_plan(1, "Mouse: Left", hold_time=0)
+
+
+@pytest.fixture
+def engine():
+    engine = ProcessEngine("null")
+    yield engine
+    engine.shutdown(2)
+
+
+def test_job_runs_in_child(engine):
+    job = engine.submit(compile_action_plan(1, "Mouse: Left", "repeat", 20, hold_time=0))
+    assert job.wait(10)
+    assert job.actions == 20
+    assert engine.jobs() == []
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_dead_child_finishes_jobs_and_is_replaced(engine):
+    finished = []
+    job = engine.submit(CLICK, on_finish=lambda: finished.append(True))
+    child = engine._process
+    os.kill(child.pid, signal.SIGKILL)
+    assert job.wait(10)
+    assert finished == [True]
+    assert engine.jobs() == []
+
+    job = engine.submit(compile_action_plan(1, "Mouse: Left", "repeat", 5, hold_time=0))
+    assert engine._process is not child
+    assert job.wait(10)
+    assert job.actions == 5
+
+
+def test_read_gives_up_on_a_slot_left_mid_write(engine):
+    job = engine.submit(CLICK)
+    job.stop()
+    assert job.wait(10)
+    engine.shutdown(2)
+    # A slot whose writer died with the sequence lock held
+    engine._stats = memoryview(bytearray(_SLOT_SIZE * 8)).cast("d")
+    engine._stats[0] = 1
+    assert len(engine._read(0)) == _SLOT_SIZE
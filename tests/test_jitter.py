@@ -0,0 +1,60 @@
+import pytest
+
+import jitter
+from actions import DIST_LOGNORMAL, DIST_NORMAL, DIST_UNIFORM, POSITION_DISTS, parse_jitter
+from jitter import JitterBuffer, interval_sampler, offset_sampler
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "random"])
+def use_numpy(request, monkeypatch):
+    if request.param and not jitter._HAS_NUMPY:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(jitter, "_HAS_NUMPY", request.param)
+    return request.param
+
+
+def _take(buffer, n):
+    return [buffer.next() for _ in range(n)]
+
+
+def test_uniform_interval_bounds(use_numpy):
+    values = interval_sampler(0.1, (DIST_UNIFORM, 20))(0, 1000)
+    assert len(values) == 1000
+    assert all(0.08 <= v <= 0.12 for v in values)
+    assert len(set(values)) > 1
+
+
+def test_intervals_never_negative(use_numpy):
+    for dist in (DIST_UNIFORM, DIST_NORMAL):
+        assert min(interval_sampler(0.001, (dist, 50))(0, 1000)) == 0.0
+    assert min(interval_sampler(0.05, (DIST_LOGNORMAL, 1.0))(0, 1000)) > 0
+
+
+def test_offsets_are_integers(use_numpy):
+    values = offset_sampler((DIST_UNIFORM, 3))(0, 1000)
+    assert all(isinstance(v, int) and -3 <= v <= 3 for v in values)
+
+
+def test_seeded_buffer_is_reproducible(use_numpy):
+    # Crossing several batch boundaries: values must not depend on when the refiller ran
+    draw = interval_sampler(0.1, (DIST_NORMAL, 10), seed=42)
+    first = _take(JitterBuffer(draw, size=16), 100)
+    second = _take(JitterBuffer(draw, size=16), 100)
+    assert first == second
+    assert first == [v for batch in range(7) for v in draw(batch, 16)][:100]
+
+
+def test_streams_and_seeds_differ(use_numpy):
+    spec = (DIST_UNIFORM, 5)
+    assert offset_sampler(spec, seed=1)(0, 50) != offset_sampler(spec, seed=2)(0, 50)
+    assert offset_sampler(spec, seed=1)(0, 50) != offset_sampler(spec, seed=1)(1, 50)
+
+
+def test_parse_jitter():
+    assert parse_jitter(None) is None
+    assert parse_jitter({"dist": DIST_NORMAL, "amount": 5}) == (DIST_NORMAL, 5.0)
+    assert parse_jitter((DIST_UNIFORM, 0)) is None
+    with pytest.raises(ValueError):
+        parse_jitter((DIST_LOGNORMAL, 1), POSITION_DISTS)
+    with pytest.raises(ValueError):
+        parse_jitter((DIST_UNIFORM, -1))
@@ -0,0 +1,64 @@
+import time
+
+from actions import compile_action_plan
+from backends import RecordingBackend, OP_MOVE, OP_PRESS_BUTTON, OP_PRESS_KEY
+from engine import ClickerEngine, ClickJob
+
+
+def _ops(backend, *ops):
+    return [(op, args) for _, op, args in backend.events if op in ops]
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def _start(plan):
+    engine = ClickerEngine(RecordingBackend())
+    return engine, engine.submit_job(ClickJob(plan))
+
+
+def test_update_action():
+    engine, job = _start(compile_action_plan(1, "Mouse: Left", hold_time=0))
+    _wait_for(lambda: _ops(engine.backend, OP_PRESS_BUTTON))
+    job.update(compile_action_plan(1, "Mouse: Right", hold_time=0))
+    _wait_for(lambda: _ops(engine.backend, OP_PRESS_BUTTON)[-1:] == [(OP_PRESS_BUTTON, "right")])
+    job.update(compile_action_plan(1, "Key: Ctrl + c", hold_time=0))
+    _wait_for(lambda: _ops(engine.backend, OP_PRESS_KEY))
+    job.stop()
+    assert job.wait(5)
+    buttons = [args for _, args in _ops(engine.backend, OP_PRESS_BUTTON)]
+    assert buttons[0] == "left"
+    # Once switched, the job never goes back to the old plan
+    assert "left" not in buttons[buttons.index("right"):]
+    assert _ops(engine.backend, OP_PRESS_KEY)[:2] == [(OP_PRESS_KEY, "ctrl"), (OP_PRESS_KEY, "c")]
+    engine.shutdown(1)
+
+
+def test_update_interval_keeps_the_job():
+    engine, job = _start(compile_action_plan(200, "Mouse: Left", hold_time=0, timing="deadline"))
+    _wait_for(lambda: _ops(engine.backend, OP_PRESS_BUTTON))
+    job_id = job.id
+    # The new interval applies from the next press, so the pending 200 ms wait still runs out first
+    job.update(compile_action_plan(2, "Mouse: Left", hold_time=0, timing="deadline"))
+    _wait_for(lambda: len(_ops(engine.backend, OP_PRESS_BUTTON)) >= 20)
+    job.stop()
+    assert job.wait(5)
+    assert job.id == job_id and job.interval == 0.002
+    assert job.timer.interval == 0.002
+    engine.shutdown(1)
+
+
+def test_update_position_and_timing():
+    engine, job = _start(compile_action_plan(1, "Mouse: Left", hold_time=0))
+    _wait_for(lambda: _ops(engine.backend, OP_PRESS_BUTTON))
+    assert job.timer is None
+    job.update(compile_action_plan(1, "Mouse: Left", pos_mode="pick", x=7, y=8, hold_time=0, timing="deadline"))
+    _wait_for(lambda: (OP_MOVE, (7, 8)) in _ops(engine.backend, OP_MOVE))
+    assert job.timer is not None and job.precise
+    job.stop()
+    assert job.wait(5)
+    engine.shutdown(1)
@@ -0,0 +1,56 @@
+import pytest
+
+from backends import RecordingBackend
+from engine import ClickerEngine
+from macro import Macro, ReplayJob, EV_SCROLL
+from macro_file import MacroFile, MacroFormatError, FileReplayJob, save_macro
+from test_replay import EXPECTED, _macro, _replay
+
+
+def test_macro_file_round_trip(tmp_path):
+    macro = _macro()
+    path = str(tmp_path / "macro.acm")
+    save_macro(path, macro)
+    with MacroFile(path) as macro_file:
+        assert len(macro_file) == len(macro)
+        assert macro_file.duration == macro.duration
+        loaded = macro_file.to_macro()
+        assert list(loaded.events()) == list(macro.events())
+        assert _replay(FileReplayJob(macro_file, speed=10.0)) == EXPECTED
+
+
+def test_file_replay_repeats(tmp_path):
+    path = str(tmp_path / "macro.acm")
+    save_macro(path, _macro())
+    with MacroFile(path) as macro_file:
+        job = FileReplayJob(macro_file, speed=10.0, repeat=3)
+        assert _replay(job) == EXPECTED * 3
+        assert job.loops == 3
+
+
+def test_zero_length_file_loops_until_stopped(tmp_path):
+    # What preset_to_macro() produces for a scroll or 0 ms preset, meant to be looped
+    macro = Macro()
+    macro.append(0, EV_SCROLL, 0, 1)
+    path = str(tmp_path / "scroll.acm")
+    save_macro(path, macro)
+    backend = RecordingBackend()
+    engine = ClickerEngine(backend)
+    with MacroFile(path) as macro_file:
+        job = engine.submit_job(FileReplayJob(macro_file, repeat=None))
+        other = engine.submit_job(ReplayJob(_macro(), speed=10.0))
+        assert other.wait(5)
+        job.stop()
+        assert job.wait(5)
+        assert job.loops > 1
+    engine.shutdown(1)
+
+
+def test_bad_files(tmp_path):
+    empty = tmp_path / "empty.acm"
+    empty.write_bytes(b"")
+    other = tmp_path / "other.acm"
+    other.write_bytes(b"not a macro file at all, just some text")
+    for path in (empty, other):
+        with pytest.raises(MacroFormatError):
+            MacroFile(str(path))
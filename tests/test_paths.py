@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+import paths
+from backends import RecordingBackend, OP_MOVE
+from paths import PATH_RATE, PathStream, build_path, move_duration
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request, monkeypatch):
+    if request.param and not paths._HAS_NUMPY:
+        pytest.skip("NumPy is not installed")
+    monkeypatch.setattr(paths, "_HAS_NUMPY", request.param)
+    paths._profile.cache_clear()
+    paths._base_path.cache_clear()
+    yield
+    paths._profile.cache_clear()
+    paths._base_path.cache_clear()
+
+
+def test_path_ends_exactly(use_numpy):
+    xs, ys, ts = build_path((13, 27), (811, 402), rng=random.Random(1))
+    assert (xs[0], ys[0]) == (13, 27)
+    assert (xs[-1], ys[-1]) == (811, 402)
+    assert all(isinstance(v, int) for v in xs + ys)
+    assert ts[0] == 0
+    assert ts == sorted(ts)
+    assert len(ts) == int(ts[-1] * PATH_RATE) + 1
+
+
+def test_duration_and_short_moves(use_numpy):
+    _, _, ts = build_path((0, 0), (400, 0), jitter=0, rng=random.Random(1), duration=0.5)
+    assert ts[-1] == pytest.approx(0.5)
+    assert move_duration(0) == pytest.approx(0.08)
+    assert move_duration(1000) > move_duration(100)
+    assert build_path((100, 100), (101, 101)) is None
+
+
+def test_paths_are_cached_per_quantised_ends(use_numpy):
+    rng = random.Random(2)
+    build_path((0, 0), (500, 300), rng=rng)
+    misses = paths.path_cache_info().misses
+    for _ in range(20):
+        build_path((1, 2), (501, 299), rng=rng)
+    # Nearby ends share the cached curves; at most one miss per variant
+    assert paths.path_cache_info().misses - misses <= paths.PATH_VARIANTS
+
+
+def test_stream_skips_overtaken_points():
+    path = ([0, 10, 20, 30], [0, 0, 0, 0], [0.0, 0.01, 0.02, 0.03])
+    backend = RecordingBackend()
+    stream = PathStream(path, start=5.0)
+    assert stream.end == pytest.approx(5.03)
+    assert stream.advance(backend, 5.0) == pytest.approx(5.01)
+    # Late by more than one point: only the newest due point is sent
+    assert stream.advance(backend, 5.025) == pytest.approx(5.03)
+    assert stream.advance(backend, 5.03) is None
+    assert [args for _, op, args in backend.events if op == OP_MOVE] == [(0, 0), (20, 0), (30, 0)]
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+from engine import ClickJob
+from preset_library import PresetLibrary
+from sequence import SequenceJob
+
+CLICK = {"hotkey": "Mouse: Left", "interval_ms": 50, "repeat_mode": "repeat", "repeat_count": 3}
+SEQUENCE = {"sequence": [{"x": 1, "y": 2}, {"x": 3, "y": 4}]}
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = PresetLibrary(str(tmp_path / "presets.db"))
+    yield library
+    library.close()
+
+
+def test_save_and_get(library):
+    library.save("Fast", CLICK, tags="farm, quick")
+    assert "fast" in library
+    assert library.get("FAST") == CLICK
+    assert len(library) == 1
+    assert library.search()[0]["tags"] == ["farm", "quick"]
+
+
+def test_get_returns_a_copy(library):
+    library.save("fast", CLICK)
+    preset = library.get("fast")
+    preset["interval_ms"] = 1
+    assert library.get("fast")["interval_ms"] == 50
+
+
+def test_save_replaces_same_name(library):
+    library.save("fast", CLICK)
+    library.save("FAST", dict(CLICK, interval_ms=10))
+    assert library.names() == ["FAST"]
+    assert library.get("fast")["interval_ms"] == 10
+
+
+def test_names_fold_case_beyond_ascii(library):
+    library.save("Straße", CLICK)
+    assert "STRASSE" in library
+    assert library.get("strasse") == CLICK
+
+
+def test_invalid_preset_is_not_stored(library):
+    with pytest.raises(ValueError):
+        library.save("bad", {"interval_ms": "soon"})
+    with pytest.raises(ValueError):
+        library.save(" ", CLICK)
+    assert len(library) == 0
+
+
+def test_missing_preset(library):
+    with pytest.raises(KeyError):
+        library.get("nope")
+    assert not library.delete("nope")
+
+
+def test_job(library):
+    library.save("click", CLICK)
+    library.save("sequence", SEQUENCE)
+    job = library.job("click")
+    assert isinstance(job, ClickJob)
+    assert job.plan.repeat_times == 3
+    assert isinstance(library.job("sequence"), SequenceJob)
+
+
+def test_recently_used_first(library):
+    for name in ("a", "b", "c"):
+        library.save(name, CLICK)
+    library.get("b")
+    library.get("c", touch=False)
+    library.job("a")
+    rows = library.search()
+    assert [r["name"] for r in rows] == ["a", "b", "c"]
+    assert [r["use_count"] for r in rows] == [1, 1, 0]
+
+
+def test_search_and_tags(library):
+    library.save("farm_50%", CLICK, tags=["farm"])
+    library.save("farm fast", CLICK, tags=["farm", "fast"])
+    library.save("other", CLICK)
+    assert sorted(library.names("farm")) == ["farm fast", "farm_50%"]
+    assert library.names("50%") == ["farm_50%"]
+    assert library.names("m_") == ["farm_50%"]
+    assert library.names(tag="fast") == ["farm fast"]
+    assert library.all_tags() == ["farm", "fast"]
+    library.set_tags("other", ["fast"])
+    assert sorted(library.names(tag="FAST")) == ["farm fast", "other"]
+
+
+def test_rename_and_delete(library):
+    library.save("a", CLICK)
+    library.save("b", CLICK)
+    library.rename("a", "c")
+    assert library.names() == ["b", "c"]
+    with pytest.raises(ValueError):
+        library.rename("c", "B")
+    with pytest.raises(KeyError):
+        library.rename("a", "d")
+    assert library.delete("C")
+    assert library.names() == ["b"]
+
+
+def test_import_export(library, tmp_path):
+    path = tmp_path / "Farm.json"
+    path.write_text(json.dumps(CLICK))
+    assert library.import_file(str(path)) == "Farm"
+    out = tmp_path / "out.json"
+    library.export_file("farm", str(out))
+    assert json.loads(out.read_text()) == CLICK
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "presets.db")
+    library = PresetLibrary(path)
+    library.save("a", CLICK)
+    library.get("a")
+    library.close()
+    library = PresetLibrary(path)
+    assert library.get("A", touch=False) == CLICK
+    assert library.search()[0]["use_count"] == 1
+    library.close()
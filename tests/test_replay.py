@@ -0,0 +1,65 @@
+import pytest
+
+from backends import RecordingBackend, OP_MOVE, OP_PRESS_BUTTON, OP_RELEASE_BUTTON, OP_SCROLL, OP_PRESS_KEY, OP_RELEASE_KEY
+from engine import ClickerEngine
+from macro import Macro, ReplayJob, EV_MOVE, EV_BUTTON_DOWN, EV_BUTTON_UP, EV_SCROLL, EV_KEY_DOWN, EV_KEY_UP
+
+MS = 1_000_000
+
+EXPECTED = [
+    (OP_MOVE, (10, 20)),
+    (OP_PRESS_BUTTON, "left"),
+    (OP_RELEASE_BUTTON, "left"),
+    (OP_MOVE, (-5, 300)),
+    (OP_SCROLL, (0, -2)),
+    (OP_PRESS_KEY, "a"),
+    (OP_RELEASE_KEY, "a"),
+]
+
+
+def _macro():
+    macro = Macro()
+    macro.append(0, EV_MOVE, 10, 20)
+    macro.append(1 * MS, EV_BUTTON_DOWN, 10, 20, "left")
+    macro.append(2 * MS, EV_BUTTON_UP, 10, 20, "left")
+    macro.append(3 * MS, EV_MOVE, -5, 300)
+    macro.append(4 * MS, EV_SCROLL, 0, -2)
+    macro.append(5 * MS, EV_KEY_DOWN, name="a")
+    macro.append(6 * MS, EV_KEY_UP, name="a")
+    return macro
+
+
+def _replay(job):
+    backend = RecordingBackend()
+    engine = ClickerEngine(backend)
+    engine.submit_job(job)
+    assert job.wait(5)
+    engine.shutdown(1)
+    return [(op, args) for _, op, args in backend.events]
+
+
+def test_replay_job():
+    job = ReplayJob(_macro(), speed=2.0, repeat=2)
+    assert _replay(job) == EXPECTED * 2
+    assert job.loops == 2
+    assert job.actions == len(EXPECTED) * 2
+
+
+def test_replay_speed_is_checked():
+    with pytest.raises(ValueError):
+        ReplayJob(_macro(), speed=20.0)
+
+
+def test_zero_length_macro_loops_until_stopped():
+    macro = Macro()
+    macro.append(0, EV_MOVE, 1, 1)
+    backend = RecordingBackend()
+    engine = ClickerEngine(backend)
+    job = engine.submit_job(ReplayJob(macro, repeat=None))
+    other = engine.submit_job(ReplayJob(_macro(), speed=10.0))
+    # A pass that takes no time must not keep the worker from other jobs or from stop()
+    assert other.wait(5)
+    job.stop()
+    assert job.wait(5)
+    assert job.loops > 1
+    engine.shutdown(1)
@@ -0,0 +1,70 @@
+import pytest
+
+from backends import RecordingBackend, OP_MOVE, OP_PRESS_BUTTON, OP_RELEASE_BUTTON, OP_PRESS_KEY, OP_RELEASE_KEY
+from engine import ClickerEngine
+from script import ScriptError, ScriptJob, compile_script
+
+SCRIPT = """
+# comment line
+sub save
+    key ctrl+s hold 1
+end
+
+loop 2
+    click right 100 200 hold 1   # trailing comment
+    wait 1
+end
+call save
+"""
+
+
+def _run(script, repeat=1):
+    backend = RecordingBackend()
+    engine = ClickerEngine(backend)
+    job = engine.submit_job(ScriptJob(script, repeat))
+    assert job.wait(5)
+    engine.shutdown(1)
+    return [(op, args) for _, op, args in backend.events]
+
+
+def test_compile_and_run():
+    assert _run(compile_script(SCRIPT)) == [
+        (OP_MOVE, (100, 200)), (OP_PRESS_BUTTON, "right"), (OP_RELEASE_BUTTON, "right"),
+        (OP_MOVE, (100, 200)), (OP_PRESS_BUTTON, "right"), (OP_RELEASE_BUTTON, "right"),
+        (OP_PRESS_KEY, "ctrl"), (OP_PRESS_KEY, "s"), (OP_RELEASE_KEY, "s"), (OP_RELEASE_KEY, "ctrl"),
+    ]
+
+
+def test_if_pixel_colour_and_comment():
+    script = compile_script("if pixel 1 2 #2ECC40 5  # green\n  click\nend  # done")
+    assert script.probes == [(1, 2, (0x2e, 0xcc, 0x40), 5)]
+
+
+def test_repeat():
+    events = _run(compile_script("click left 1 1\n"), repeat=3)
+    assert events.count((OP_PRESS_BUTTON, "left")) == 3
+
+
+def test_compiled_scripts_are_cached():
+    assert compile_script(SCRIPT) is compile_script(SCRIPT)
+
+
+@pytest.mark.parametrize("text, line, message", [
+    ("jump 1 2", 1, "unknown command"),
+    ("click left 1", 1, "usage: click"),
+    ("click left 1 2\nwait soon", 2, "milliseconds"),
+    ("loop 3\n  click", 1, "loop has no end"),
+    ("end", 1, "end without"),
+    ("else", 1, "else without if"),
+    ("call missing", 1, "undefined subroutine"),
+    ("sub a\n  call a\nend\ncall a", 2, "recursive call"),
+    ("loop 0\n  click\nend", 1, "at least 1"),
+    ("if pixel 1 2 red 3\n  click\nend", 1, "invalid colour"),
+    ("if pixel 1 2 #zzzzzz 3\n  click\nend", 1, "invalid colour"),
+    ("if pixel 1 2 #12345\n  click\nend", 1, "invalid colour"),
+    ("click sideways", 1, "unknown button"),
+])
+def test_errors(text, line, message):
+    with pytest.raises(ScriptError, match=message) as info:
+        compile_script(text)
+    assert info.value.line == line
@@ -0,0 +1,43 @@
+import pytest
+
+from backends import RecordingBackend, OP_MOVE, OP_PRESS_BUTTON
+from engine import ClickerEngine
+from sequence import SequenceJob, compile_sequence
+
+
+def _engine():
+    return ClickerEngine(RecordingBackend())
+
+
+def _ops(backend, *ops):
+    return [(op, args) for _, op, args in backend.events if op in ops]
+
+
+def test_sequence_job():
+    engine = _engine()
+    points = [
+        {"x": 1, "y": 2, "action": "Mouse: Left", "hold_ms": 0, "delay_ms": 1},
+        (3, 4, "Mouse: Right", 0, 1),
+    ]
+    job = engine.submit_job(SequenceJob(compile_sequence(points), repeat=2))
+    assert job.wait(5)
+    assert job.loops == 2
+    assert _ops(engine.backend, OP_MOVE, OP_PRESS_BUTTON) == [
+        (OP_MOVE, (1, 2)), (OP_PRESS_BUTTON, "left"),
+        (OP_MOVE, (3, 4)), (OP_PRESS_BUTTON, "right"),
+    ] * 2
+    engine.shutdown(1)
+
+
+def test_compile_sequence_rejects_bad_point():
+    with pytest.raises(ValueError, match="point 0"):
+        compile_sequence([{"x": 1}])
+
+
+def test_compile_sequence_defaults():
+    seq = compile_sequence([(1, 2), {"x": 3, "y": 4, "action": "Key: a", "delay_ms": 20}], hold_ms=10)
+    assert len(seq) == 2
+    assert list(seq.hold) == [0.01, 0.01]
+    assert list(seq.delay) == [0.1, 0.02]
+    assert seq.cycle_time == pytest.approx(0.14)
+    assert [p["action"] for p in seq.points()] == ["Mouse: Left", "Key: a"]
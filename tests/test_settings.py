@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+import pytest
+
+from Autoclicker import SettingsPersister, _atomic_write
+
+
+def _persister(tmp_path, delay=0.05, max_delay=1.0):
+    path = str(tmp_path / "last_settings.json")
+    return path, SettingsPersister(lambda: path, delay=delay, max_delay=max_delay)
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_burst_of_saves_is_one_write(tmp_path):
+    path, persister = _persister(tmp_path)
+    for i in range(50):
+        persister.save({"count": i})
+    assert not os.path.exists(path)
+    _wait_for(lambda: persister.writes)
+    time.sleep(0.1)
+    assert persister.writes == 1
+    with open(path) as f:
+        assert json.load(f) == {"count": 49}
+
+
+def test_steady_saves_are_written_by_max_delay(tmp_path):
+    path, persister = _persister(tmp_path, delay=0.1, max_delay=0.2)
+    started = time.monotonic()
+    while not persister.writes:
+        assert time.monotonic() - started < 2
+        persister.save({"at": time.monotonic()})
+        time.sleep(0.01)
+    assert time.monotonic() - started < 0.5
+
+
+def test_flush_and_unchanged_content(tmp_path):
+    path, persister = _persister(tmp_path, delay=10, max_delay=10)
+    persister.save({"a": 1})
+    persister.flush()
+    with open(path) as f:
+        assert json.load(f) == {"a": 1}
+    persister.save({"a": 1})
+    persister.flush()
+    assert (persister.writes, persister.skipped) == (1, 1)
+    persister.flush()
+    assert persister.writes == 1
+
+
+def test_existing_content_is_not_rewritten(tmp_path):
+    path, persister = _persister(tmp_path)
+    with open(path, "w") as f:
+        f.write(json.dumps({"a": 1}, indent=4))
+    persister.save({"a": 1})
+    persister.flush()
+    assert (persister.writes, persister.skipped) == (0, 1)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_atomic_write_keeps_permissions(tmp_path):
+    path = str(tmp_path / "settings.json")
+    with open(path, "w") as f:
+        f.write("{}")
+    os.chmod(path, 0o640)
+    _atomic_write(path, '{"a": 1}')
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    with open(path) as f:
+        assert f.read() == '{"a": 1}'
+    assert os.listdir(str(tmp_path)) == ["settings.json"]
+
+    os.chmod(str(tmp_path), 0o750)
+    new = str(tmp_path / "new.json")
+    _atomic_write(new, "{}")
+    assert os.stat(new).st_mode & 0o777 == 0o640
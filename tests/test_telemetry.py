@@ -0,0 +1,53 @@
+import pytest
+
+from telemetry import LogHistogram, Telemetry
+
+
+def test_histogram_buckets_round_trip():
+    # Exact below 128 us, within about 1.5 % above
+    for value in (0, 1, 127, 128, 1000, 12345, 10 ** 7):
+        estimate = LogHistogram.bucket_value(LogHistogram.bucket(value))
+        assert estimate == pytest.approx(value, rel=0.016, abs=0.5)
+
+
+def test_histogram_percentiles():
+    hist = LogHistogram()
+    assert hist.percentile(99) == 0.0
+    for value in range(1, 101):
+        hist.add(value)
+    assert hist.percentile(50) == 50
+    assert hist.percentile(99) == 99
+    assert hist.percentile(100) == 100
+    hist.reset()
+    assert hist.total == 0
+
+
+def test_snapshot_jitter_and_lateness():
+    telemetry = Telemetry(interval=0.01, capacity=16)
+    # Periods of 10, 12 and 10 ms; the third action starts 3 ms late
+    for t, late in ((0.0, 0.0), (0.010, 0.0), (0.022, 0.003), (0.032, 0.0)):
+        telemetry.record(100 + t, late)
+    stats = telemetry.snapshot()
+    assert stats["count"] == 4
+    assert stats["late"] == 1
+    assert stats["jitter_max_ms"] == pytest.approx(2, rel=0.02)
+    assert stats["lateness_p99_ms"] == pytest.approx(3, rel=0.02)
+    assert stats["current_cps"] == pytest.approx(3 / 0.032)
+    assert stats["dropped"] == 0
+
+
+def test_reader_falling_behind_drops_samples():
+    telemetry = Telemetry(interval=0.001, capacity=8)
+    for n in range(20):
+        telemetry.record(n * 0.001, 0.0)
+    stats = telemetry.snapshot()
+    assert stats["count"] == 20
+    assert stats["dropped"] == 12
+    # Later reads pick up where the last one stopped
+    telemetry.record(0.020, 0.0)
+    assert telemetry.snapshot()["dropped"] == 12
+
+
+def test_capacity_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        Telemetry(capacity=100)
@@ -0,0 +1,70 @@
+import pytest
+
+from timing import (DeadlineTimer, MAX_CATCH_UP, MISSED_CATCH_UP, MISSED_SKIP,
+                    perf_counter, rate_stats, wait_until)
+
+
+def test_deadlines_stay_on_the_grid():
+    timer = DeadlineTimer(0.01)
+    timer.start(100.0)
+    # Each deadline is start + n * interval, however late the action finished
+    deadlines = [timer.advance(now) for now in (100.004, 100.019, 100.021, 100.0305)]
+    assert deadlines == pytest.approx([100.01, 100.02, 100.03, 100.04])
+    assert timer.ticks == 4
+    assert timer.missed == 0
+
+
+def test_skip_drops_missed_ticks():
+    timer = DeadlineTimer(0.01, MISSED_SKIP)
+    timer.start(100.0)
+    # 35 ms late for the first tick: ticks at 20 and 30 ms are dropped, 40 ms is next
+    assert timer.advance(100.045) == pytest.approx(100.04)
+    assert timer.missed == 3
+    assert timer.advance(100.046) == pytest.approx(100.05)
+
+
+def test_catch_up_fires_missed_ticks_up_to_the_limit():
+    timer = DeadlineTimer(0.01, MISSED_CATCH_UP)
+    timer.start(100.0)
+    # Three ticks behind: all of them come due back to back
+    assert timer.advance(100.045) == pytest.approx(100.01)
+    assert timer.missed == 0
+
+    timer.start(100.0)
+    behind = MAX_CATCH_UP + 5
+    timer.advance(100.01 + behind * 0.01 + 0.005)
+    assert timer.missed == behind - MAX_CATCH_UP
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        DeadlineTimer(0.01, "whenever")
+
+
+def test_wait_until_reaches_the_deadline():
+    deadline = perf_counter() + 0.02
+    assert wait_until(deadline)
+    assert perf_counter() >= deadline
+
+
+def test_wait_until_stops_early():
+    start = perf_counter()
+    assert not wait_until(start + 10, keep_running=lambda: False)
+    assert perf_counter() - start < 1
+
+
+def test_timer_wait_does_not_drift():
+    timer = DeadlineTimer(0.005)
+    timer.start()
+    for _ in range(20):
+        assert timer.wait()
+    # 20 ticks at 5 ms end at start + 100 ms, not later by the time spent per tick
+    assert perf_counter() - timer.started == pytest.approx(0.1, abs=0.02)
+
+
+def test_rate_stats():
+    stats = rate_stats(11, 0.0, 1.0, 0.1, missed=2)
+    assert stats["requested_cps"] == pytest.approx(10)
+    assert stats["achieved_cps"] == pytest.approx(10)
+    assert stats["missed"] == 2
+    assert rate_stats(1, 0.0, None, 0)["achieved_cps"] == 0.0
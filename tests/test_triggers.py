@@ -0,0 +1,156 @@
+import time
+
+import pytest
+
+import triggers
+from actions import compile_action_plan
+from backends import RecordingBackend, OP_MOVE, OP_PRESS_BUTTON
+from capture import RegionCapture
+from engine import ClickerEngine
+from triggers import PixelTrigger, TemplateTrigger, TriggerClickJob, make_trigger
+
+np = triggers.np   # None without NumPy; template tests are skipped then
+
+GREEN = (0x2e, 0xcc, 0x40)
+
+needs_numpy = pytest.mark.skipif(not triggers._HAS_NUMPY, reason="NumPy is not installed")
+
+
+class FakeCapture(RegionCapture):
+    """In-memory BGRX frame; tests paint pixels into it between checks."""
+
+    name = "fake"
+
+    def __init__(self, region):
+        super().__init__(region)
+        self._frame = bytearray(self.stride * self.height)
+        self._view = memoryview(self._frame)
+        self.grabs = 0
+        self.closed = False
+
+    def paint(self, px, py, colour):
+        r, g, b = colour
+        i = py * self.stride + px * 4
+        self._frame[i:i + 3] = bytes((b, g, r))
+
+    def grab(self):
+        self.grabs += 1
+        return self._view
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def matcher(request, monkeypatch):
+    if request.param and not triggers._HAS_NUMPY:
+        pytest.skip("NumPy is not installed")
+    monkeypatch.setattr(triggers, "_HAS_NUMPY", request.param)
+
+
+def test_pixel_trigger_matches(matcher):
+    capture = FakeCapture((100, 200, 8, 4))
+    trigger = PixelTrigger((100, 200, 8, 4), "#2ecc40", capture=capture)
+    assert trigger.check() is None
+    capture.paint(5, 2, GREEN)
+    assert trigger.check() == (105, 202)
+    # An identical frame reuses the previous answer
+    assert trigger.check() == (105, 202)
+    assert trigger.unchanged == 1
+    assert trigger.checks == 3
+
+
+def test_pixel_trigger_tolerance_and_min_pixels(matcher):
+    capture = FakeCapture((0, 0, 4, 4))
+    trigger = PixelTrigger((0, 0, 4, 4), GREEN, tolerance=4, min_pixels=2, capture=capture)
+    capture.paint(1, 0, (0x30, 0xca, 0x44))
+    assert trigger.check() is None
+    capture.paint(3, 3, (0x2e, 0xcc, 0x40))
+    assert trigger.check() == (1, 0)
+    capture.paint(1, 0, (0x40, 0xcc, 0x40))
+    assert trigger.check() is None
+
+
+def test_make_trigger():
+    trigger = make_trigger({"type": "pixel", "region": [1, 2], "color": "00ff00", "poll_hz": 100})
+    assert trigger.region == (1, 2, 1, 1)
+    assert trigger.colour == (0, 255, 0)
+    assert trigger.poll_interval == pytest.approx(0.01)
+    for spec in ({"type": "pixel", "region": [0, 0], "colour": "#zzzzzz"},
+                 {"type": "sound"},
+                 {"region": [0, 0], "colour": "#000000", "poll_hz": 0},
+                 {"region": [0, 0], "colour": "#000000", "size": 3}):
+        with pytest.raises(ValueError):
+            make_trigger(spec)
+
+
+def test_trigger_click_job(matcher):
+    capture = FakeCapture((50, 60, 4, 4))
+    trigger = PixelTrigger((50, 60, 4, 4), GREEN, poll_hz=1000, at_match=True, capture=capture)
+    backend = RecordingBackend()
+    engine = ClickerEngine(backend)
+    plan = compile_action_plan(1, "Mouse: Left", "repeat", 3, hold_time=0)
+    job = engine.submit_job(TriggerClickJob(plan, trigger))
+    time.sleep(0.03)
+    # Nothing on screen yet: the job only polls
+    assert backend.events == []
+    assert trigger.checks > 1
+    capture.paint(2, 1, GREEN)
+    assert job.wait(5)
+    engine.shutdown(1)
+    events = [(op, args) for _, op, args in backend.events]
+    assert events.count((OP_PRESS_BUTTON, "left")) == 3
+    assert events[0] == (OP_MOVE, (52, 61))
+    assert capture.closed
+
+
+def _texture(seed, height, width):
+    """Random grey blocks of 4x4 pixels, coarse enough to survive the pyramid's downsampling."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (height // 4, width // 4), dtype=np.uint8)
+    return np.kron(blocks, np.ones((4, 4), dtype=np.uint8))
+
+
+def _paint_image(capture, x, y, grey):
+    frame = np.frombuffer(capture._frame, dtype=np.uint8).reshape(capture.height, capture.stride)
+    h, w = grey.shape
+    pixels = frame[:, :capture.width * 4].reshape(capture.height, capture.width, 4)
+    pixels[y:y + h, x:x + w, :3] = grey[:, :, None]
+
+
+@needs_numpy
+def test_template_trigger_finds_the_template():
+    region = (100, 200, 96, 64)
+    capture = FakeCapture(region)
+    _paint_image(capture, 0, 0, _texture(1, 64, 96))
+    template = _texture(2, 24, 24)
+    trigger = TemplateTrigger(region, template, threshold=0.9, capture=capture)
+    assert trigger.check() is None
+    assert trigger.score < 0.9
+    _paint_image(capture, 40, 20, template)
+    # Centre of the match, in screen coordinates
+    assert trigger.check() == (100 + 40 + 12, 200 + 20 + 12)
+    assert trigger.score > 0.99
+
+
+@needs_numpy
+def test_template_trigger_from_png(tmp_path):
+    from templates import write_png
+    template = _texture(3, 16, 16)
+    path = str(tmp_path / "icon.png")
+    write_png(path, np.repeat(template[:, :, None], 3, axis=2))
+    capture = FakeCapture((0, 0, 64, 64))
+    _paint_image(capture, 0, 0, _texture(4, 64, 64))
+    _paint_image(capture, 8, 36, template)
+    trigger = make_trigger({"type": "template", "region": [0, 0, 64, 64], "template": path, "capture": capture})
+    assert isinstance(trigger, TemplateTrigger)
+    assert trigger.check() == (16, 44)
+
+
+@needs_numpy
+def test_template_trigger_rejects_bad_specs(tmp_path):
+    for spec in ({"type": "template", "region": [0, 0, 8, 8], "template": _texture(5, 16, 16)},
+                 {"type": "template", "region": [0, 0, 32, 32], "template": _texture(5, 16, 16), "threshold": 0},
+                 {"type": "template", "region": [0, 0, 32, 32], "template": str(tmp_path / "missing.png")}):
+        with pytest.raises(ValueError):
+            make_trigger(spec)
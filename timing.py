@@ -0,0 +1,128 @@
+# timing.py
+# Deadline-based timing helpers for the click loop (drift-free scheduling)
+
+import sys
+import time
+
+perf_counter = time.perf_counter
+
+# Time left before a deadline at which we stop sleeping and spin on perf_counter().
+# time.sleep() typically overshoots by ~0.1-1 ms; older Windows builds round up to a full scheduler tick.
+SPIN_THRESHOLD = 0.002 if sys.platform == "win32" else 0.001
+
+# Longest single sleep while waiting, so a stop request is noticed even with very long intervals
+MAX_SLEEP_CHUNK = 0.1
+
+# How early a thread blocked on a Condition/Event wakes before its deadline. Lock timeouts on Windows
+# follow the ~15.6 ms system tick, so wake early there and finish with wait_until(). Only precise
+# (deadline mode) engine jobs use it; interval mode jobs wake on the Condition and skip the spin.
+WAKE_MARGIN = 0.016 if sys.platform == "win32" else 0.0
+
+# What to do with ticks that were missed because an action ran late
+MISSED_SKIP = "skip"          # drop missed ticks and stay on the original grid
+MISSED_CATCH_UP = "catch_up"  # fire missed ticks back to back until caught up
+MISSED_POLICIES = (MISSED_SKIP, MISSED_CATCH_UP)
+
+# Upper bound on ticks fired back to back under MISSED_CATCH_UP; anything beyond is skipped
+MAX_CATCH_UP = 10
+
+
+def wait_until(deadline, keep_running=None, spin_threshold=SPIN_THRESHOLD):
+    """
+    Block until perf_counter() reaches deadline.
+    Sleeps coarsely until spin_threshold before the deadline, then spins for the final sub-millisecond.
+    Returns False early if keep_running() becomes false while sleeping, True otherwise.
+    """
+    while True:
+        remaining = deadline - perf_counter()
+        if remaining <= spin_threshold:
+            break
+        if keep_running is not None and not keep_running():
+            return False
+        time.sleep(min(remaining - spin_threshold, MAX_SLEEP_CHUNK))
+
+    while perf_counter() < deadline:
+        pass
+    return True
+
+
+class DeadlineTimer:
+    """
+    Periodic timer that targets absolute perf_counter() deadlines (start + n * interval),
+    so the period does not drift with the time spent performing each action.
+    """
+
+    def __init__(self, interval, missed_policy=MISSED_SKIP, spin_threshold=SPIN_THRESHOLD):
+        if missed_policy not in MISSED_POLICIES:
+            raise ValueError(f"Unknown missed tick policy: {missed_policy!r}")
+        self.interval = max(0.0, interval)
+        self.missed_policy = missed_policy
+        self.spin_threshold = spin_threshold
+        self.started = None
+        self.next_deadline = None
+        self.ticks = 0
+        self.missed = 0
+
+    def start(self, now=None):
+        """Start the grid at now (defaults to perf_counter()); the first tick is due immediately."""
+        self.started = perf_counter() if now is None else now
+        self.next_deadline = self.started
+        self.ticks = 0
+        self.missed = 0
+
+    def advance(self, now=None):
+        """
+        Move to the next tick and return its deadline without blocking.
+        If we are already more than one interval behind, missed ticks are handled by missed_policy;
+        a tick that is late by less than one interval is returned as-is (due immediately).
+        """
+        if self.started is None:
+            self.start(now)
+        interval = self.interval
+        self.next_deadline += interval
+        self.ticks += 1
+        now = perf_counter() if now is None else now
+
+        if now > self.next_deadline and interval > 0:
+            behind = int((now - self.next_deadline) / interval)
+            if self.missed_policy == MISSED_SKIP:
+                skipped = behind
+            else:
+                skipped = max(0, behind - MAX_CATCH_UP)
+            if skipped:
+                self.missed += skipped
+                self.next_deadline += skipped * interval
+        return self.next_deadline
+
+    def wait(self, keep_running=None):
+        """
+        Block until the next tick is due. Returns False if keep_running() turned false while waiting.
+        Late ticks fire immediately; ticks late by more than one interval are handled by missed_policy.
+        """
+        deadline = self.advance()
+        if deadline <= perf_counter():
+            return keep_running is None or keep_running()
+        return wait_until(deadline, keep_running, self.spin_threshold)
+
+    def stats(self, actions=None, last=None):
+        """Return requested vs achieved rate for the ticks (or the given number of actions) so far."""
+        return rate_stats(self.ticks + 1 if actions is None else actions,
+                          self.started, last, self.interval, self.missed)
+
+
+def rate_stats(actions, started, last, interval, missed=0):
+    """
+    Summarise a run: actions performed between started and last (perf_counter() values)
+    against the requested interval in seconds.
+    """
+    elapsed = (last - started) if (started is not None and last is not None) else 0.0
+    requested = 1.0 / interval if interval > 0 else 0.0
+    # n actions span n - 1 periods
+    achieved = (actions - 1) / elapsed if actions > 1 and elapsed > 0 else 0.0
+    return {
+        "actions": actions,
+        "elapsed": elapsed,
+        "requested_cps": requested,
+        "achieved_cps": achieved,
+        "missed": missed,
+    }
@@ -0,0 +1,288 @@
+# triggers.py
+# Screen triggers: click only while (or when) something is visible on screen, a colour (PixelTrigger)
+# or an image (TemplateTrigger). A trigger watches a capture region (see capture.py) and TriggerClickJob
+# polls it on the engine thread between clicks.
+
+try:
+    from .engine import ClickJob, _PHASE_PRESS, PHASE_POLL
+    from .timing import perf_counter
+except ImportError:
+    from engine import ClickJob, _PHASE_PRESS, PHASE_POLL
+    from timing import perf_counter
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    np = None
+    _HAS_NUMPY = False
+
+# Checks per second while the trigger does not match
+DEFAULT_POLL_HZ = 60
+MAX_POLL_HZ = 1000
+
+
+def parse_colour(colour):
+    """"#rrggbb", "rrggbb" or (r, g, b) -> (r, g, b). Raises ValueError."""
+    if isinstance(colour, str):
+        text = colour.strip().lstrip("#")
+        if len(text) != 6:
+            raise ValueError(f"Invalid colour: {colour!r}")
+        try:
+            return tuple(int(text[i:i + 2], 16) for i in (0, 2, 4))
+        except ValueError:
+            raise ValueError(f"Invalid colour: {colour!r}")
+    try:
+        r, g, b = (int(v) for v in colour)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid colour: {colour!r}")
+    if not all(0 <= v <= 255 for v in (r, g, b)):
+        raise ValueError(f"Invalid colour: {colour!r}")
+    return (r, g, b)
+
+
+def _region(region):
+    """(x, y) -> a one pixel region; (x, y, width, height) is returned as ints."""
+    values = tuple(int(v) for v in region)
+    if len(values) == 2:
+        return values + (1, 1)
+    if len(values) != 4 or values[2] <= 0 or values[3] <= 0:
+        raise ValueError(f"Invalid region: {region!r}")
+    return values
+
+
+class Trigger:
+    """
+    Base class. check() captures once and returns the screen (x, y) of the match, or None.
+    at_match: click at the match instead of the job's fixed position.
+    edge: one action per appearance (the trigger must stop matching before it fires again),
+    rather than clicking at the job's interval for as long as it matches.
+    Captures are opened on first check(), i.e. on the engine thread that polls them.
+    """
+
+    def __init__(self, region, poll_hz=DEFAULT_POLL_HZ, at_match=False, edge=False, capture=None):
+        self.region = _region(region)
+        poll_hz = float(poll_hz)
+        if not 0 < poll_hz <= MAX_POLL_HZ:
+            raise ValueError(f"poll_hz must be in (0, {MAX_POLL_HZ}]")
+        self.poll_interval = 1.0 / poll_hz
+        self.at_match = bool(at_match)
+        self.edge = bool(edge)
+        self.checks = 0
+        self.unchanged = 0       # checks answered from the previous frame (change detection)
+        self._capture_backend = capture
+        self._capture = None
+        self._previous = None    # copy of the last frame
+        self._result = None
+
+    def _open(self):
+        try:
+            from .capture import open_capture
+        except ImportError:
+            from capture import open_capture
+        self._capture = open_capture(self.region, self._capture_backend)
+        return self._capture
+
+    def check(self):
+        """
+        Capture the region and match it. A frame identical to the previous one (one memcmp) reuses
+        the previous answer, so an unchanging screen never reaches _match().
+        """
+        capture = self._capture or self._open()
+        frame = capture.grab()
+        self.checks += 1
+        previous = self._previous
+        if previous is not None and previous == frame:
+            self.unchanged += 1
+            return self._result
+        if previous is None or len(previous) != len(frame):
+            self._previous = bytearray(frame)
+        else:
+            self._previous[:] = frame
+        self._result = self._match(capture, frame)
+        return self._result
+
+    def _match(self, capture, frame):
+        """Screen (x, y) of the match in this frame, or None."""
+        raise NotImplementedError
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
+
+class PixelTrigger(Trigger):
+    """
+    Matches when at least min_pixels pixels of the region are within tolerance (per channel, 0-255)
+    of colour.
+    """
+
+    def __init__(self, region, colour, tolerance=0, min_pixels=1, poll_hz=DEFAULT_POLL_HZ,
+                 at_match=False, edge=False, capture=None):
+        super().__init__(region, poll_hz, at_match, edge, capture)
+        self.colour = parse_colour(colour)
+        self.tolerance = max(0, int(tolerance))
+        self.min_pixels = max(1, int(min_pixels))
+        self._diff = None
+
+    def _match(self, capture, frame):
+        return self._match_numpy(capture) if _HAS_NUMPY else self._match_python(capture, frame)
+
+    def _match_numpy(self, capture):
+        bgr = capture.array()[:, :, :3]
+        if self._diff is None:
+            r, g, b = self.colour
+            self._target = np.array((b, g, r), dtype=np.int16)
+            self._diff = np.empty(bgr.shape, dtype=np.int16)
+        diff = self._diff
+        np.subtract(bgr, self._target, out=diff, dtype=np.int16)
+        np.abs(diff, out=diff)
+        mask = diff.max(axis=2) <= self.tolerance
+        if self.min_pixels == 1:
+            if not mask.any():
+                return None
+        elif np.count_nonzero(mask) < self.min_pixels:
+            return None
+        py, px = divmod(int(mask.argmax()), capture.width)
+        return (self.region[0] + px, self.region[1] + py)
+
+    def _match_python(self, capture, frame):
+        r, g, b = self.colour
+        tol = self.tolerance
+        found = 0
+        first = None
+        stride = capture.stride
+        for py in range(capture.height):
+            row = py * stride
+            for px in range(capture.width):
+                i = row + px * 4
+                if (abs(frame[i] - b) <= tol and abs(frame[i + 1] - g) <= tol
+                        and abs(frame[i + 2] - r) <= tol):
+                    if first is None:
+                        first = (self.region[0] + px, self.region[1] + py)
+                    found += 1
+                    if found >= self.min_pixels:
+                        return first
+        return None
+
+
+class TemplateTrigger(Trigger):
+    """
+    Matches when the template image (a .png/.npy path or an image array) appears in the region with a
+    normalised correlation of at least threshold (0-1). Returns the centre of the match, and by default
+    clicks there (at_match). The template is preprocessed once into a cached grayscale pyramid (see
+    templates.load_template); frames are matched coarse-to-fine in reused buffers. Needs NumPy.
+    """
+
+    def __init__(self, region, template, threshold=0.9, poll_hz=DEFAULT_POLL_HZ, at_match=True,
+                 edge=False, capture=None):
+        if not _HAS_NUMPY:
+            raise ValueError("Template triggers need NumPy")
+        super().__init__(region, poll_hz, at_match, edge, capture)
+        try:
+            from .templates import load_template
+        except ImportError:
+            from templates import load_template
+        self.threshold = float(threshold)
+        if not 0 < self.threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        try:
+            self.template = load_template(template)
+        except OSError as e:
+            raise ValueError(f"Cannot load template {template!r}: {e}")
+        width, height = self.region[2:]
+        if self.template.width > width or self.template.height > height:
+            raise ValueError("Template is larger than the search region")
+        self.score = 0.0        # score of the last matched frame
+        self._matcher = None
+
+    def _match(self, capture, frame):
+        if self._matcher is None:
+            try:
+                from .templates import PyramidMatcher
+            except ImportError:
+                from templates import PyramidMatcher
+            self._matcher = PyramidMatcher(self.template, (capture.height, capture.width), self.threshold)
+        found, self.score = self._matcher.match(capture.array()[:, :, 1])
+        if found is None:
+            return None
+        return (self.region[0] + found[0] + self.template.width // 2,
+                self.region[1] + found[1] + self.template.height // 2)
+
+
+TRIGGER_TYPES = {
+    "pixel": PixelTrigger,
+    "template": TemplateTrigger,
+}
+
+
+def make_trigger(spec):
+    """
+    Build a trigger from a preset's "trigger" dict: {"type": "pixel", "region": [x, y, w, h],
+    "colour": "#00ff00", "tolerance": 10, "poll_hz": 200, "at_match": false, "edge": false}, or
+    {"type": "template", "region": [...], "template": "icon.png", "threshold": 0.9, ...}.
+    Raises ValueError for an invalid spec.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Invalid trigger: {spec!r}")
+    options = dict(spec)
+    kind = options.pop("type", "pixel")
+    cls = TRIGGER_TYPES.get(kind)
+    if cls is None:
+        raise ValueError(f"Unknown trigger type: {kind!r}")
+    if "color" in options:
+        options["colour"] = options.pop("color")
+    try:
+        return cls(**options)
+    except TypeError as e:
+        raise ValueError(f"Invalid {kind} trigger: {e}")
+
+
+class TriggerClickJob(ClickJob):
+    """
+    ClickJob gated by a Trigger: before every press the trigger is checked; while it does not match the
+    job polls it every trigger.poll_interval instead of clicking. With trigger.at_match the click goes to
+    the matched point. The trigger's capture is closed when the job finishes.
+    """
+
+    def __init__(self, plan, trigger, on_finish=None, backend=None):
+        super().__init__(plan, on_finish, backend)
+        self.trigger = trigger
+        self._base = plan            # plan without the match position applied
+        self._armed = True           # edge mode: the trigger has been clear since the last action
+        self._hit = None
+        self._hit_plan = None
+
+    def _step(self, phase, deadline):
+        if phase != _PHASE_PRESS and phase != PHASE_POLL:
+            return super()._step(phase, deadline)
+        if self._next_plan is not self._base:
+            self._base = self._next_plan
+            self._hit = None
+            self._apply_plan(self._base)
+
+        trigger = self.trigger
+        try:
+            hit = trigger.check()
+        except Exception as e:
+            print(f"Trigger check failed: {e}")
+            return None
+        if hit is None or (trigger.edge and not self._armed):
+            if hit is None:
+                self._armed = True
+            return (perf_counter() + trigger.poll_interval, PHASE_POLL)
+        self._armed = False
+
+        if trigger.at_match:
+            if hit != self._hit:
+                self._hit = hit
+                self._hit_plan = self._base._replace(position=hit)
+            self.plan = self._hit_plan
+        else:
+            self.plan = self._base
+        return self._step_action(_PHASE_PRESS, deadline)
+
+    def _release_held(self):
+        super()._release_held()
+        self.trigger.close()